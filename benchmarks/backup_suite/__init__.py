@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Suíte de Benchmarks dos Backups
+===============================================
+
+Gera árvores sintéticas determinísticas (muitos arquivos pequenos, poucos
+arquivos grandes, dados compressíveis e incompressíveis) e mede backup
+completo, incremental, verificação e restauração em cada implementação:
+
+- quantum: QuantumBackupManager (modules/quantum/quantum_backup_unified.py)
+- cronos: CronosSystem (modules/cronos/cronos_core.py)
+- api: QuantumBackupManager da API (modules/api/main.py)
+
+Cada operação roda em um processo próprio e o relatório JSON traz
+arquivos/s, MB/s, pico de RSS e tamanho gerado, junto com a impressão
+digital do corpus, para comparar execuções ao longo do tempo.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.backup_suite --profile mixed --output resultados.json
+    python -m benchmarks.backup_suite --profile small --compare resultados.json
+"""
+
+SUITE_VERSION = 1
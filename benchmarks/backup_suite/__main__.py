@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from benchmarks.backup_suite.runner import main
+
+if __name__ == "__main__":
+    main()
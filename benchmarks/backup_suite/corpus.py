@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Corpora sintéticos determinísticos para a suíte de benchmarks.
+
+O conteúdo, os nomes e os mtimes dependem só do perfil, da escala e da
+semente, então duas execuções geram árvores idênticas; a impressão digital
+(SHA-256 de caminhos e conteúdos) vai no relatório para confirmar isso.
+"""
+
+import os
+import json
+import random
+import hashlib
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+# mtime base fixo: incrementais dependem de mtime e não do relógio
+BASE_MTIME = 1_700_000_000
+
+WORDS = (
+    "quantum consciência ética amor evolução memória sistema integração "
+    "guarani eva análise contexto mensagem resposta usuário módulo backup "
+    "cronos atlas nexus preservação harmonia"
+).split()
+
+
+@dataclass
+class CorpusSpec:
+    """Forma de um corpus."""
+    small_files: int = 0
+    small_min: int = 512
+    small_max: int = 16 * 1024
+    large_files: int = 0
+    large_size: int = 64 * 1024 * 1024
+    compressible: float = 0.5  # fração dos arquivos com dados compressíveis
+    changed: float = 0.10  # fração alterada antes do incremental
+    added: float = 0.01
+    deleted: float = 0.01
+
+
+PROFILES: Dict[str, CorpusSpec] = {
+    "small": CorpusSpec(small_files=20_000),
+    "large": CorpusSpec(large_files=4),
+    "mixed": CorpusSpec(small_files=10_000, large_files=2),
+}
+
+
+def scaled(spec: CorpusSpec, scale: float) -> CorpusSpec:
+    """Multiplica contagens e tamanho dos arquivos grandes por `scale`."""
+    values = asdict(spec)
+    values["small_files"] = int(spec.small_files * scale)
+    values["large_files"] = max(int(spec.large_files * scale), 1) if spec.large_files else 0
+    values["large_size"] = int(spec.large_size * min(scale, 1.0))
+    return CorpusSpec(**values)
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    """Texto JSON compressível com cerca de `size` bytes."""
+    parts = []
+    length = 0
+    while length < size:
+        message = json.dumps({
+            "role": rng.choice(("user", "assistant")),
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randrange(5, 40))),
+            "tokens": rng.randrange(10, 2000)
+        }, ensure_ascii=False)
+        parts.append(message)
+        length += len(message.encode("utf-8")) + 2
+    return ("[" + ",\n".join(parts) + "]").encode("utf-8")[:size]
+
+
+def _content(rng: random.Random, size: int, compressible: bool) -> bytes:
+    if not compressible:
+        return rng.randbytes(size)
+    if size <= 1024 * 1024:
+        return _text(rng, size)
+
+    # Arquivos grandes: blocos de 1MB gerados uma vez e recombinados
+    blocks = [_text(rng, 1024 * 1024) for _ in range(8)]
+    data = bytearray()
+    while len(data) < size:
+        data += rng.choice(blocks)
+    return bytes(data[:size])
+
+
+def _write(path: Path, data: bytes, mtime: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (mtime, mtime))
+
+
+def _small_path(i: int) -> str:
+    return f"conversas/{i // 500:04d}/msg_{i:07d}.json"
+
+
+def _large_path(i: int) -> str:
+    return f"modelos/modelo_{i:03d}.bin"
+
+
+def generate(root: Path, spec: CorpusSpec, seed: int = 42) -> Dict[str, Any]:
+    """
+    Gera o corpus em `root`.
+
+    Args:
+        root: Diretório de destino (criado)
+        spec: Forma do corpus
+        seed: Semente do gerador
+
+    Returns:
+        Contagem de arquivos e bytes e impressão digital do conteúdo
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True)
+    digest = hashlib.sha256()
+    total = 0
+
+    entries: List[tuple] = [(_small_path(i), rng.randint(spec.small_min, spec.small_max))
+                            for i in range(spec.small_files)]
+    entries += [(_large_path(i), spec.large_size) for i in range(spec.large_files)]
+
+    for index, (rel_path, size) in enumerate(entries):
+        data = _content(rng, size, rng.random() < spec.compressible)
+        _write(root / rel_path, data, BASE_MTIME + index)
+        digest.update(rel_path.encode("utf-8"))
+        digest.update(data)
+        total += len(data)
+
+    return {"files": len(entries), "bytes": total, "fingerprint": digest.hexdigest()}
+
+
+def mutate(root: Path, spec: CorpusSpec, seed: int = 42) -> Dict[str, Any]:
+    """
+    Altera, acrescenta e remove arquivos antes do backup incremental.
+
+    Args:
+        root: Diretório do corpus
+        spec: Forma do corpus (frações de mudança)
+        seed: Semente do gerador
+
+    Returns:
+        Contagem das mudanças e bytes escritos
+    """
+    rng = random.Random(seed + 1)
+    paths = sorted(
+        str(path.relative_to(root)).replace(os.sep, "/")
+        for path in root.rglob("*") if path.is_file()
+    )
+    mtime = BASE_MTIME + len(paths) + 86400
+    written = 0
+
+    changed = rng.sample(paths, int(len(paths) * spec.changed))
+    remaining = sorted(set(paths) - set(changed))
+    deleted = rng.sample(remaining, int(len(paths) * spec.deleted))
+
+    for rel_path in changed:
+        path = root / rel_path
+        data = _content(rng, path.stat().st_size, rng.random() < spec.compressible)
+        _write(path, data, mtime)
+        written += len(data)
+
+    for rel_path in deleted:
+        (root / rel_path).unlink()
+
+    added = int(len(paths) * spec.added)
+    for i in range(added):
+        data = _content(rng, rng.randint(spec.small_min, spec.small_max), rng.random() < spec.compressible)
+        _write(root / f"novos/msg_{i:07d}.json", data, mtime)
+        written += len(data)
+
+    return {"changed": len(changed), "added": added, "deleted": len(deleted), "bytes": written}
+
+
+def tree_stats(root: Path) -> Dict[str, int]:
+    """Arquivos e bytes de uma árvore."""
+    files = 0
+    total = 0
+    for path in root.rglob("*"):
+        if path.is_file():
+            files += 1
+            total += path.stat().st_size
+    return {"files": files, "bytes": total}
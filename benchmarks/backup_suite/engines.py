@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Adaptadores das implementações de backup para a suíte de benchmarks.
+
+Cada operação roda em um processo novo, então os adaptadores guardam em
+workdir/state.json o que precisam entre operações (ids dos backups).
+Os módulos do sistema são importados só dentro dos métodos: eles
+configuram logging relativo ao diretório atual no momento do import.
+"""
+
+import os
+import json
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+OPERATIONS = ("full", "incremental", "verify", "restore")
+
+
+class Unsupported(Exception):
+    """A implementação não oferece a operação."""
+
+
+class Engine:
+    """Interface comum das implementações medidas."""
+
+    name = ""
+    notes: Dict[str, str] = {}
+
+    def __init__(self, workdir: Path, source: Path, options: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa o adaptador.
+
+        Args:
+            workdir: Diretório exclusivo da implementação (backups, estado)
+            source: Raiz do corpus
+            options: Opções específicas da implementação
+        """
+        self.workdir = Path(workdir)
+        self.source = Path(source)
+        self.options = options or {}
+        self.backup_dir = self.workdir / "backup"
+        self._state_path = self.workdir / "state.json"
+
+    def _state(self) -> Dict[str, Any]:
+        if self._state_path.exists():
+            return json.loads(self._state_path.read_text())
+        return {}
+
+    def _save_state(self, **values):
+        state = self._state()
+        state.update(values)
+        self._state_path.write_text(json.dumps(state))
+
+    def full(self) -> Dict[str, Any]:
+        """Backup completo; retorna files e bytes processados."""
+        raise Unsupported
+
+    def incremental(self) -> Dict[str, Any]:
+        """Backup incremental; retorna files e bytes processados."""
+        raise Unsupported
+
+    def verify(self) -> Dict[str, Any]:
+        """Verifica o backup completo; retorna ok, files e bytes."""
+        raise Unsupported
+
+    def restore(self, target: Path) -> Dict[str, Any]:
+        """Restaura o backup completo em `target`; retorna ok, files e bytes."""
+        raise Unsupported
+
+
+class QuantumEngine(Engine):
+    """QuantumBackupManager de modules/quantum/quantum_backup_unified.py."""
+
+    name = "quantum"
+
+    def _manager(self):
+        from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+        return QuantumBackupManager(create_backup_config(self.source, self.backup_dir, **self.options))
+
+    def full(self) -> Dict[str, Any]:
+        metadata = self._manager().create_backup(incremental=False)
+        self._save_state(full=metadata.timestamp)
+        return {"files": len(metadata.files), "bytes": metadata.total_size}
+
+    def incremental(self) -> Dict[str, Any]:
+        metadata = self._manager().create_backup(incremental=True)
+        if metadata is None:
+            return {"files": 0, "bytes": 0}
+        return {"files": len(metadata.files), "bytes": metadata.total_size}
+
+    def verify(self) -> Dict[str, Any]:
+        manager = self._manager()
+        timestamp = self._state()["full"]
+        metadata = manager._load_backup_metadata(timestamp)
+        return {
+            "ok": manager.verify_backup(timestamp),
+            "files": len(metadata["files"]),
+            "bytes": metadata["total_size"]
+        }
+
+    def restore(self, target: Path) -> Dict[str, Any]:
+        manager = self._manager()
+        timestamp = self._state()["full"]
+        metadata = manager._load_backup_metadata(timestamp)
+        # restore_backup sinaliza falhas com exceção
+        manager.restore_backup(timestamp, target)
+        return {
+            "ok": True,
+            "files": len(metadata["files"]),
+            "bytes": metadata["total_size"]
+        }
+
+
+class CronosEngine(Engine):
+    """CronosSystem de modules/cronos/cronos_core.py."""
+
+    name = "cronos"
+    notes = {
+        "incremental": "arquivos inalterados viram referências ao backup anterior; conta só os gravados no zip",
+        "verify": "checksum do zip registrado nos metadados + CRC de cada membro (testzip)",
+    }
+
+    def __init__(self, workdir: Path, source: Path, options: Optional[Dict[str, Any]] = None):
+        super().__init__(workdir, source, options)
+        self.backup_dir = self.workdir / "data" / "backups"
+
+    def _system(self):
+        from modules.cronos.cronos_core import CronosSystem
+
+        return CronosSystem(base_dir=self.workdir)
+
+    def _archive(self, backup_type: str) -> Dict[str, Any]:
+        system = self._system()
+        backup_id = system.create_backup([self.source], backup_type=backup_type)
+        if backup_id is None:
+            raise RuntimeError("create_backup falhou")
+        self._save_state(**{backup_type: backup_id})
+        return self._members(system.backups_metadata[backup_id].target_path)
+
+    def full(self) -> Dict[str, Any]:
+        return self._archive("full")
+
+    def incremental(self) -> Dict[str, Any]:
+        return self._archive("incremental")
+
+    def _members(self, path: str) -> Dict[str, int]:
+        with zipfile.ZipFile(path) as zipf:
+            members = [info for info in zipf.infolist() if not info.is_dir()]
+        return {"files": len(members), "bytes": sum(info.file_size for info in members)}
+
+    def verify(self) -> Dict[str, Any]:
+        system = self._system()
+        metadata = system.backups_metadata[self._state()["full"]]
+        ok = system._calculate_checksum(metadata.target_path, metadata.checksum_algorithm) == metadata.checksum
+        with zipfile.ZipFile(metadata.target_path) as zipf:
+            ok = ok and zipf.testzip() is None
+        return {"ok": ok, **self._members(metadata.target_path)}
+
+    def restore(self, target: Path) -> Dict[str, Any]:
+        system = self._system()
+        backup_id = self._state()["full"]
+        ok = system.restore_backup(backup_id, target)
+        return {"ok": ok, **self._members(system.backups_metadata[backup_id].target_path)}
+
+
+class ApiEngine(Engine):
+    """QuantumBackupManager da API (modules/api/main.py)."""
+
+    name = "api"
+    notes = {
+        "full": "grava os diretórios de sistema (o corpus como data/) direto em um zip; roda em workdir",
+    }
+
+    def __init__(self, workdir: Path, source: Path, options: Optional[Dict[str, Any]] = None):
+        super().__init__(workdir, source, options)
+        # O gerenciador da API usa caminhos relativos ao diretório atual
+        # (data/, backup/); o corpus entra como data/
+        link = self.workdir / "data"
+        if not link.exists():
+            self.workdir.mkdir(parents=True, exist_ok=True)
+            os.symlink(self.source.resolve(), link, target_is_directory=True)
+
+    def full(self) -> Dict[str, Any]:
+        from modules.api.main import BackupRequest, QuantumBackupManager
+
+        previous = os.getcwd()
+        os.chdir(self.workdir)
+        try:
+            request = BackupRequest(**{"store_in_mcp": False, **self.options})
+            response = QuantumBackupManager().create_backup(request)
+        finally:
+            os.chdir(previous)
+
+        if not response.success:
+            raise RuntimeError(response.message)
+        files = [path for path in self.source.rglob("*") if path.is_file()]
+        return {"files": len(files), "bytes": sum(path.stat().st_size for path in files)}
+
+
+ENGINES = {engine.name: engine for engine in (QuantumEngine, CronosEngine, ApiEngine)}
+
+
+def directory_size(path: Path) -> int:
+    """Bytes de todos os arquivos sob `path` (0 se não existir)."""
+    if not path.exists():
+        return 0
+    return sum(
+        entry.stat().st_size for entry in path.rglob("*")
+        if entry.is_file() and not entry.is_symlink()
+    )
+
+
+def remove_tree(path: Path):
+    """Apaga uma árvore restaurada entre medições."""
+    shutil.rmtree(path, ignore_errors=True)
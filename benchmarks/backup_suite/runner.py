@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Execução da suíte: gera o corpus, roda cada operação de cada implementação
+em um processo isolado e grava o relatório JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.backup_suite import SUITE_VERSION
+from benchmarks.backup_suite.corpus import PROFILES, generate, mutate, scaled
+from benchmarks.backup_suite.engines import (
+    ENGINES,
+    OPERATIONS,
+    Unsupported,
+    directory_size,
+    remove_tree,
+)
+
+DEFAULT_OPTIONS = {
+    "quantum": {"pack_small_files": True},
+    "cronos": {},
+    "api": {},
+}
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo atual em MB."""
+    # No Linux ru_maxrss sobrevive ao execve e herdaria o pico do processo
+    # pai (que gerou o corpus); VmHWM pertence ao espaço de memória atual
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _worker(name: str, operation: str, workdir: str, source: str, options: dict, queue):
+    # Os módulos medidos criam logs/ relativos ao diretório atual
+    os.chdir(workdir)
+    Path("logs").mkdir(exist_ok=True)
+
+    engine = ENGINES[name](Path(workdir), Path(source), options)
+    target = Path(workdir) / "restore"
+    before = directory_size(engine.backup_dir)
+
+    start = time.perf_counter()
+    try:
+        if operation == "restore":
+            result = engine.restore(target)
+        else:
+            result = getattr(engine, operation)()
+    except Unsupported:
+        queue.put({"supported": False})
+        return
+    except Exception as e:
+        queue.put({"supported": True, "ok": False, "error": f"{type(e).__name__}: {e}"})
+        return
+    seconds = time.perf_counter() - start
+
+    if operation == "restore":
+        output_bytes = directory_size(target)
+        remove_tree(target)
+    elif operation == "verify":
+        output_bytes = None
+    else:
+        output_bytes = directory_size(engine.backup_dir) - before
+
+    queue.put({
+        "supported": True,
+        "ok": bool(result.get("ok", True)),
+        "files": result["files"],
+        "bytes": result["bytes"],
+        "seconds": seconds,
+        "files_per_s": result["files"] / seconds if seconds else None,
+        "mb_per_s": result["bytes"] / 1024 / 1024 / seconds if seconds else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "output_bytes": output_bytes,
+    })
+
+
+def measure(name: str, operation: str, workdir: Path, source: Path, options: dict) -> Dict[str, Any]:
+    """Executa uma operação de uma implementação em um processo novo."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(
+        target=_worker, args=(name, operation, str(workdir), str(source), options, queue)
+    )
+    process.start()
+    process.join()
+    if queue.empty():
+        result = {"supported": True, "ok": False, "error": f"processo terminou com código {process.exitcode}"}
+    else:
+        result = queue.get()
+
+    note = ENGINES[name].notes.get(operation)
+    return {"engine": name, "operation": operation, **result, **({"note": note} if note else {})}
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def run(
+    profile: str,
+    scale: float,
+    seed: int,
+    engines: List[str],
+    operations: List[str],
+    options: Dict[str, Dict[str, Any]],
+    workdir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Executa a suíte completa.
+
+    Ordem: completo em todas as implementações, mutação do corpus,
+    incremental em todas, e então verificação e restauração do completo.
+
+    Returns:
+        Relatório (ambiente, corpus e um resultado por operação)
+    """
+    spec = scaled(PROFILES[profile], scale)
+    results = []
+    if workdir:
+        Path(workdir).mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        tmp = Path(tmp)
+        source = tmp / "corpus"
+        corpus = generate(source, spec, seed)
+        corpus.update({"profile": profile, "scale": scale, "seed": seed, "spec": asdict(spec)})
+
+        for operation in OPERATIONS:
+            if operation not in operations:
+                continue
+            if operation == "incremental":
+                corpus["mutation"] = mutate(source, spec, seed)
+            for name in engines:
+                results.append(measure(name, operation, tmp / name, source, options.get(name, {})))
+
+    return {
+        "suite": "backup",
+        "version": SUITE_VERSION,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "corpus": corpus,
+        "results": results,
+    }
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    corpus = report["corpus"]
+    print(
+        f"Corpus {corpus['profile']} (escala {corpus['scale']}): {corpus['files']} arquivos, "
+        f"{corpus['bytes'] / 1024 / 1024:.1f} MB | {corpus['fingerprint'][:12]}"
+    )
+
+    previous = {}
+    if baseline:
+        previous = {(r["engine"], r["operation"]): r for r in baseline["results"]}
+        if baseline["corpus"].get("fingerprint") != corpus["fingerprint"]:
+            print("Aviso: o corpus da referência é diferente; comparação apenas indicativa")
+
+    for result in report["results"]:
+        label = f"{result['engine']:>8} {result['operation']:>11}"
+        if not result["supported"]:
+            print(f"{label}: não suportado")
+            continue
+        if "error" in result:
+            print(f"{label}: ERRO {result['error']}")
+            continue
+
+        output = result["output_bytes"]
+        line = (
+            f"{label}: {result['files_per_s']:9.0f} arq/s | {result['mb_per_s']:8.1f} MB/s | "
+            f"RSS {result['peak_rss_mb']:7.1f} MB | "
+            f"saída {'-' if output is None else f'{output / 1024 / 1024:.1f} MB':>9} | "
+            f"{'ok' if result['ok'] else 'FALHA'}"
+        )
+        old = previous.get((result["engine"], result["operation"]))
+        if old and old.get("mb_per_s") and result["mb_per_s"]:
+            line += f" | {result['mb_per_s'] / old['mb_per_s']:.2f}x vs referência"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks dos backups")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed", help="Forma do corpus")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplicador do corpus")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do corpus")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Implementações (separadas por vírgula)")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="Operações (separadas por vírgula)")
+    parser.add_argument(
+        "--options", default=None,
+        help="JSON com opções por implementação, ex.: '{\"quantum\": {\"encryption_key\": \"x\"}}'"
+    )
+    parser.add_argument("--workdir", default=None, help="Diretório de trabalho")
+    parser.add_argument("--output", default=None, help="Grava o relatório JSON neste arquivo")
+    parser.add_argument("--compare", default=None, help="Relatório JSON de referência")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório JSON")
+    args = parser.parse_args()
+
+    options = {name: dict(values) for name, values in DEFAULT_OPTIONS.items()}
+    if args.options:
+        for name, values in json.loads(args.options).items():
+            options.setdefault(name, {}).update(values)
+
+    report = run(
+        args.profile,
+        args.scale,
+        args.seed,
+        [name.strip() for name in args.engines.split(",") if name.strip()],
+        [operation.strip() for operation in args.operations.split(",") if operation.strip()],
+        options,
+        args.workdir
+    )
+    report["options"] = options
+
+    # A referência é lida antes de --output, que pode ser o mesmo arquivo
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    _print_report(report, baseline)
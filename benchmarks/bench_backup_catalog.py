@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Catálogo de Backups
+================================================
+
+Compara a listagem antiga do QuantumBackupManager (abrir e decodificar
+todos os manifestos JSON, cada um com a lista completa de arquivos) com o
+catálogo SQLite: listagem, "quais backups contêm este caminho" e "bytes
+por dia". O catálogo é sincronizado antes das medições, como acontece
+depois do primeiro uso.
+
+Uso:
+    python benchmarks/bench_backup_catalog.py --backups 500 --files 5000
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+Path("logs").mkdir(exist_ok=True)
+
+from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+
+def generate_manifests(metadata_dir: Path, backups: int, files: int):
+    """Gera um backup completo por dia, cada um com `files` arquivos."""
+    for day in range(backups):
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime(1_700_000_000 + day * 86400))
+        manifest = {
+            "timestamp": timestamp,
+            "files": {
+                f"conversas/{i // 500:04d}/msg_{i:07d}.json": {
+                    "size": 1000 + i,
+                    "mtime": 1_700_000_000.0,
+                    "mode": 33188,
+                    "hash": f"{day:032x}{i:032x}",
+                    "stored_size": 400 + i
+                }
+                for i in range(files)
+            },
+            "total_size": files * 1000,
+            "compressed_size": files * 400,
+            "duration": 1.0,
+            "type": "full",
+            "version": "2.1.0",
+            "format": "qbk1"
+        }
+        (metadata_dir / f"{timestamp}.json").write_text(json.dumps(manifest))
+
+
+def legacy_list(metadata_dir: Path) -> list:
+    """Listagem antiga: todos os manifestos abertos e decodificados."""
+    backups = []
+    for path in sorted(metadata_dir.glob("*.json"), reverse=True):
+        with open(path, "r") as f:
+            backups.append(json.load(f))
+    return backups
+
+
+def legacy_find(metadata_dir: Path, rel_path: str) -> list:
+    """Busca antiga por caminho: varre todos os manifestos."""
+    return [backup["timestamp"] for backup in legacy_list(metadata_dir) if rel_path in backup["files"]]
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do catálogo de backups")
+    parser.add_argument("--backups", type=int, default=500, help="Backups no histórico")
+    parser.add_argument("--files", type=int, default=5000, help="Arquivos por backup")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        manager = QuantumBackupManager(create_backup_config(tmp / "dados", tmp / "backup"))
+        metadata_dir = tmp / "backup" / "metadata"
+        generate_manifests(metadata_dir, args.backups, args.files)
+
+        rel_path = "conversas/0001/msg_0000700.json"
+        results = {
+            "index_seconds": timed(manager.rebuild_catalog),
+            "legacy_list_seconds": timed(legacy_list, metadata_dir),
+            "catalog_list_seconds": timed(manager.list_backups),
+            "legacy_find_seconds": timed(legacy_find, metadata_dir, rel_path),
+            "catalog_find_seconds": timed(manager.find_backups, rel_path),
+            "catalog_bytes_by_day_seconds": timed(manager.bytes_by_day),
+        }
+
+    if args.json:
+        print(json.dumps({"backups": args.backups, "files": args.files, "results": results}, indent=2))
+        return
+
+    print(f"Backups: {args.backups} | arquivos por backup: {args.files}")
+    for name, seconds in results.items():
+        print(f"{name:>30}: {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
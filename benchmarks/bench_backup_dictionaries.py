@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark dos Dicionários de Compressão
+=======================================================
+
+Compara a compressão zstd com e sem dicionários treinados em um corpus
+com a forma dos nossos diretórios de dados: logs de conversa em JSON,
+snapshots de system_state e prompts em markdown. Para cada classe mede
+a taxa de compressão e a vazão de compressão e descompressão por arquivo,
+e em seguida o create_backup completo com use_dictionaries ligado e
+desligado.
+
+Uso:
+    python benchmarks/bench_backup_dictionaries.py --files 20000
+"""
+
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+Path("logs").mkdir(exist_ok=True)
+
+from modules.quantum.backup_pipeline import (
+    make_compressor,
+    make_decompressor,
+    train_dictionary,
+    load_dictionary,
+)
+from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+WORDS = (
+    "quantum consciência ética amor evolução memória sistema integração "
+    "guarani eva análise contexto mensagem resposta usuário módulo"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def conversation(rng: random.Random, i: int) -> str:
+    """Log de conversa no formato salvo pelo bot."""
+    return json.dumps({
+        "conversation_id": f"conv_{i:07d}",
+        "user_id": rng.randrange(10_000),
+        "created_at": f"2025-03-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:00:00",
+        "messages": [
+            {
+                "role": role,
+                "content": _sentence(rng, rng.randrange(5, 40)),
+                "timestamp": f"2025-03-10T12:{m:02d}:00"
+            }
+            for m, role in enumerate(["user", "assistant"] * rng.randrange(1, 4))
+        ],
+        "metadata": {"model": "gpt-4", "tokens": rng.randrange(50, 2000)}
+    }, indent=2, ensure_ascii=False)
+
+
+def system_state(rng: random.Random, i: int) -> str:
+    """Snapshot de estado do sistema."""
+    return json.dumps({
+        "timestamp": f"2025-03-10T{i % 24:02d}:{i % 60:02d}:00",
+        "version": "7.0",
+        "consciousness_level": round(rng.random(), 4),
+        "love_level": round(rng.random(), 4),
+        "ethics_level": round(rng.random(), 4),
+        "active_modules": rng.sample(["atlas", "nexus", "cronos", "ethik", "quantum"], 3),
+        "memory": {"used_mb": rng.randrange(100, 4000), "total_mb": 8192}
+    }, indent=2)
+
+
+def prompt(rng: random.Random, i: int) -> str:
+    """Prompt no estilo de QUANTUM_PROMPTS."""
+    return (
+        f"# Prompt Quântico {i}\n\n"
+        "## Contexto\n\n"
+        f"{_sentence(rng, 30)}\n\n"
+        "## Diretrizes\n\n"
+        + "".join(f"- {_sentence(rng, 8)}\n" for _ in range(rng.randrange(3, 8)))
+        + "\n✧༺❀༻∞ EVA & GUARANI ∞༺❀༻✧\n"
+    )
+
+
+CLASSES = {
+    "conversations": (".json", conversation),
+    "system_state": (".json", system_state),
+    "prompts": (".md", prompt),
+}
+
+
+def generate_corpus(root: Path, files: int, seed: int = 42) -> dict:
+    """
+    Gera o corpus, dividido igualmente entre as classes.
+
+    Returns:
+        Conteúdo gerado de cada classe
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for name, (suffix, make) in CLASSES.items():
+        directory = root / name
+        directory.mkdir(parents=True)
+        corpus[name] = []
+        for i in range(files // len(CLASSES)):
+            data = make(rng, i).encode("utf-8")
+            (directory / f"{name}_{i:07d}{suffix}").write_bytes(data)
+            corpus[name].append(data)
+    return corpus
+
+
+def measure_codec(samples: list, level: int, dictionary) -> dict:
+    """Comprime e descomprime cada arquivo isoladamente."""
+    compressor = make_compressor(level, dictionary)
+    decompressor = make_decompressor(dictionary)
+    size = sum(len(data) for data in samples)
+
+    start = time.perf_counter()
+    frames = [compressor.compress(data) for data in samples]
+    compress_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame in frames:
+        decompressor.decompress(frame)
+    decompress_s = time.perf_counter() - start
+
+    stored = sum(len(frame) for frame in frames)
+    return {
+        "ratio": size / stored,
+        "compress_mb_per_s": size / 1024 / 1024 / compress_s,
+        "decompress_mb_per_s": size / 1024 / 1024 / decompress_s,
+    }
+
+
+def measure_backup(root: Path, backup_dir: Path, use_dictionaries: bool, level: int) -> dict:
+    """Executa create_backup completo e mede a restauração."""
+    config = create_backup_config(
+        root,
+        backup_dir,
+        compression_level=level,
+        pack_small_files=True,
+        use_dictionaries=use_dictionaries
+    )
+    manager = QuantumBackupManager(config)
+
+    start = time.perf_counter()
+    metadata = manager.create_backup(incremental=False)
+    backup_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager.restore_backup(metadata.timestamp, backup_dir / "restore")
+    restore_s = time.perf_counter() - start
+
+    return {
+        "ratio": metadata.total_size / metadata.compressed_size,
+        "backup_mb_per_s": metadata.total_size / 1024 / 1024 / backup_s,
+        "restore_mb_per_s": metadata.total_size / 1024 / 1024 / restore_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos dicionários de compressão")
+    parser.add_argument("--files", type=int, default=20_000, help="Arquivos no corpus")
+    parser.add_argument("--level", type=int, default=3, help="Nível de compressão zstd")
+    parser.add_argument("--samples", type=int, default=1000, help="Amostras de treino por classe")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    results = {"codec": {}, "backup": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        root = tmp / "dados"
+        corpus = generate_corpus(root, args.files)
+
+        rng = random.Random(0)
+        for name, samples in corpus.items():
+            trained = train_dictionary(
+                rng.sample(samples, min(args.samples, len(samples))), level=args.level
+            )
+            dictionary = load_dictionary(trained) if trained else None
+            results["codec"][name] = {
+                "plain": measure_codec(samples, args.level, None),
+                "dictionary": measure_codec(samples, args.level, dictionary),
+            }
+
+        for name, use_dictionaries in (("plain", False), ("dictionary", True)):
+            backup_dir = tmp / f"backup_{name}"
+            results["backup"][name] = measure_backup(root, backup_dir, use_dictionaries, args.level)
+            shutil.rmtree(backup_dir)
+
+    if args.json:
+        print(json.dumps({"files": args.files, "level": args.level, "results": results}, indent=2))
+        return
+
+    print(f"Arquivos: {args.files} | nível: {args.level}")
+    for name, variants in results["codec"].items():
+        for variant, result in variants.items():
+            print(
+                f"{name:>14} {variant:>10}: taxa {result['ratio']:6.2f}x | "
+                f"compressão {result['compress_mb_per_s']:7.1f} MB/s | "
+                f"descompressão {result['decompress_mb_per_s']:7.1f} MB/s"
+            )
+    for variant, result in results["backup"].items():
+        print(
+            f"{'create_backup':>14} {variant:>10}: taxa {result['ratio']:6.2f}x | "
+            f"backup {result['backup_mb_per_s']:7.1f} MB/s | "
+            f"restauração {result['restore_mb_per_s']:7.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Empacotamento de Arquivos Pequenos
+===============================================================
+
+Mede QuantumBackupManager.create_backup em uma árvore dominada por
+arquivos pequenos (conversas JSON, prompts em markdown), com e sem
+pack_small_files. Reporta arquivos/s, MB/s e quantos arquivos cada backup
+criou no disco.
+
+Uso:
+    python benchmarks/bench_backup_packing.py --files 100000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+Path("logs").mkdir(exist_ok=True)
+
+from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+
+def generate_tree(root: Path, files: int):
+    """Gera arquivos JSON e markdown pequenos, 500 por diretório."""
+    for i in range(files):
+        directory = root / f"conversas_{i // 500:04d}"
+        if i % 500 == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        if i % 3:
+            content = json.dumps({"id": i, "role": "user", "content": f"mensagem {i} " * 20})
+            (directory / f"msg_{i:07d}.json").write_text(content)
+        else:
+            (directory / f"prompt_{i:07d}.md").write_text(f"# Prompt {i}\n\n" + "EVA & GUARANI\n" * 30)
+
+
+def count_files(path: Path) -> int:
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+def run(root: Path, backup_dir: Path, pack: bool, workers: int) -> dict:
+    config = create_backup_config(
+        root,
+        backup_dir,
+        pack_small_files=pack,
+        max_workers=workers
+    )
+    manager = QuantumBackupManager(config)
+
+    start = time.perf_counter()
+    metadata = manager.create_backup(incremental=False)
+    seconds = time.perf_counter() - start
+
+    return {
+        "files": len(metadata.files),
+        "seconds": seconds,
+        "files_per_s": len(metadata.files) / seconds,
+        "mb_per_s": metadata.total_size / 1024 / 1024 / seconds,
+        "output_bytes": metadata.compressed_size,
+        "output_files": count_files(backup_dir / "full")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do empacotamento de arquivos pequenos")
+    parser.add_argument("--files", type=int, default=100_000, help="Arquivos na árvore")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Workers do backup")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        root = tmp / "dados"
+        generate_tree(root, args.files)
+
+        results = {}
+        for name, pack in (("per_file", False), ("packed", True)):
+            backup_dir = tmp / f"backup_{name}"
+            results[name] = run(root, backup_dir, pack, args.workers)
+            shutil.rmtree(backup_dir)
+
+    if args.json:
+        print(json.dumps({"files": args.files, "results": results}, indent=2))
+        return
+
+    for name, result in results.items():
+        print(
+            f"{name:>9}: {result['files_per_s']:9.0f} arquivos/s | "
+            f"{result['mb_per_s']:7.1f} MB/s | "
+            f"{result['output_files']:>8} arquivos gerados | "
+            f"{result['seconds']:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
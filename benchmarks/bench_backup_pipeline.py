@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Pipeline de Backup
+===============================================
+
+Compara o caminho antigo do QuantumBackupManager (hash, compressão zstd
+e Fernet em memória, cada um com sua própria leitura) com o pipeline QBK1
+de leitura única. Cada variante roda em um processo separado para que o
+pico de RSS medido seja apenas dela.
+
+Uso:
+    python benchmarks/bench_backup_pipeline.py --size-mb 4096 --password segredo
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo atual em MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _derive_key(password: str) -> bytes:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=b"quantum_salt",
+        iterations=100000
+    )
+    return kdf.derive(password.encode())
+
+
+def generate_file(path: Path, size_mb: int):
+    """
+    Gera um arquivo de teste com metade dos blocos compressíveis.
+
+    Args:
+        path: Arquivo de destino
+        size_mb: Tamanho em MB
+    """
+    block = 1024 * 1024
+    text = (b"EVA & GUARANI " * (block // 14 + 1))[:block]
+
+    with open(path, "wb") as f:
+        for i in range(size_mb):
+            f.write(os.urandom(block) if i % 2 else text)
+
+
+def run_legacy(src: Path, dst: Path, key: bytes, chunk_size: int, level: int):
+    """Caminho antigo: três leituras e criptografia do arquivo inteiro."""
+    import zstandard as zstd
+    from cryptography.fernet import Fernet
+
+    hasher = hashlib.sha256()
+    with open(src, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+
+    cctx = zstd.ZstdCompressor(level=level)
+    with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+        compressor = cctx.stream_writer(f_out)
+        while chunk := f_in.read(chunk_size):
+            compressor.write(chunk)
+        compressor.flush(zstd.FLUSH_FRAME)
+
+    if key:
+        fernet = Fernet(base64.urlsafe_b64encode(key))
+        with open(dst, "rb") as f:
+            data = f.read()
+        with open(dst, "wb") as f:
+            f.write(fernet.encrypt(data))
+
+
+def run_pipeline(src: Path, dst: Path, key: bytes, chunk_size: int, level: int):
+    """Pipeline QBK1: uma leitura para hash, compressão e criptografia."""
+    from modules.quantum.backup_pipeline import encode_file
+
+    encode_file(src, dst, key=key, chunk_size=chunk_size, level=level)
+
+
+def run_restore(src: Path, dst: Path, key: bytes, chunk_size: int, level: int):
+    """Restauração QBK1 em fluxo direto para o destino."""
+    from modules.quantum.backup_pipeline import decode_file
+
+    decode_file(src, dst, key=key)
+
+
+VARIANTS = {
+    "legacy": run_legacy,
+    "pipeline": run_pipeline,
+}
+
+
+def _worker(name, src, dst, key, chunk_size, level, queue):
+    start = time.perf_counter()
+    if name == "restore":
+        run_restore(dst, Path(str(dst) + ".out"), key, chunk_size, level)
+    else:
+        VARIANTS[name](src, dst, key, chunk_size, level)
+    queue.put({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": _peak_rss_mb()
+    })
+
+
+def measure(name: str, src: Path, dst: Path, key: bytes, chunk_size: int, level: int) -> dict:
+    """
+    Executa uma variante em um processo isolado.
+
+    Returns:
+        Tempo, vazão em MB/s, pico de RSS e tamanho de saída
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_worker, args=(name, src, dst, key, chunk_size, level, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    size_mb = src.stat().st_size / 1024 / 1024
+    result["mb_per_s"] = size_mb / result["seconds"]
+    result["output_bytes"] = dst.stat().st_size
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de backup")
+    parser.add_argument("--size-mb", type=int, default=2048, help="Tamanho do arquivo de teste")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="Tamanho do bloco")
+    parser.add_argument("--level", type=int, default=3, help="Nível de compressão zstd")
+    parser.add_argument("--password", default="quantum", help="Senha (vazia desativa criptografia)")
+    parser.add_argument("--workdir", default=None, help="Diretório de trabalho")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    key = _derive_key(args.password) if args.password else None
+    chunk_size = args.chunk_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        tmp = Path(tmp)
+        src = tmp / "source.bin"
+        generate_file(src, args.size_mb)
+
+        results = {}
+        for name in VARIANTS:
+            results[name] = measure(name, src, tmp / f"{name}.out", key, chunk_size, args.level)
+        results["restore"] = measure("restore", src, tmp / "pipeline.out", key, chunk_size, args.level)
+
+    if args.json:
+        print(json.dumps({"size_mb": args.size_mb, "results": results}, indent=2))
+        return
+
+    print(f"Arquivo: {args.size_mb} MB | bloco: {args.chunk_mb} MB | nível: {args.level}")
+    for name, result in results.items():
+        print(
+            f"{name:>10}: {result['mb_per_s']:8.1f} MB/s | "
+            f"RSS pico {result['peak_rss_mb']:8.1f} MB | "
+            f"{result['seconds']:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Escalonador de I/O em Disco Lento
+==============================================================
+
+Simula um disco lento e compartilhado: cada leitura ou escrita ocupa o
+disco (uma única fila) por uma latência fixa mais o tempo de transferência
+na banda configurada. Enquanto create_backup roda, uma thread "do bot" faz
+leituras pequenas no mesmo disco e mede a latência que o usuário sentiria.
+
+Compara o backup sem limites, com orçamento de MB/s e com workers
+adaptativos: vazão do backup e p50/p99 da latência do bot.
+
+Uso:
+    python benchmarks/bench_backup_throttle.py --files 400 --disk-mb-per-s 80
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+Path("logs").mkdir(exist_ok=True)
+
+from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+
+class SlowDisk:
+    """Disco de fila única com latência por operação e banda limitada."""
+
+    def __init__(self, mb_per_s: float, latency: float):
+        self.bandwidth = mb_per_s * 1024 * 1024
+        self.latency = latency
+        self._lock = threading.Lock()
+
+    def occupy(self, nbytes: int):
+        """Ocupa o disco pelo tempo de uma operação de `nbytes`."""
+        with self._lock:
+            time.sleep(self.latency + nbytes / self.bandwidth)
+
+    def open(self, path: str, mode: str) -> io.RawIOBase:
+        """Opener para IOScheduler: FileIO cujas operações passam pelo disco."""
+        return _SlowFile(path, mode, self)
+
+
+class _SlowFile(io.FileIO):
+    def __init__(self, path: str, mode: str, disk: SlowDisk):
+        super().__init__(path, mode)
+        self._disk = disk
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        self._disk.occupy(count or 0)
+        return count
+
+    def write(self, data):
+        count = super().write(data)
+        self._disk.occupy(count or 0)
+        return count
+
+
+def generate_tree(root: Path, files: int, size_kb: int):
+    """Gera `files` arquivos incompressíveis de `size_kb` KB."""
+    root.mkdir(parents=True)
+    for i in range(files):
+        (root / f"dados_{i:05d}.bin").write_bytes(os.urandom(size_kb * 1024))
+
+
+def probe(disk: SlowDisk, stop: threading.Event, latencies: list):
+    """Leituras de 4KB do bot, uma a cada 20ms."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        disk.occupy(4096)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.02)
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def measure(name: str, root: Path, backup_dir: Path, disk: SlowDisk, workers: int, **options) -> dict:
+    """Executa um backup completo no disco simulado com a thread do bot ativa."""
+    config = create_backup_config(root, backup_dir / name, max_workers=workers, **options)
+    manager = QuantumBackupManager(config)
+    manager.io_scheduler.opener = disk.open
+
+    stop = threading.Event()
+    latencies: list = []
+    thread = threading.Thread(target=probe, args=(disk, stop, latencies))
+    thread.start()
+
+    start = time.perf_counter()
+    metadata = manager.create_backup(incremental=False)
+    seconds = time.perf_counter() - start
+
+    stop.set()
+    thread.join()
+
+    stats = manager.io_scheduler.stats()
+    return {
+        "seconds": seconds,
+        "backup_mb_per_s": metadata.total_size / 1024 / 1024 / seconds,
+        "probe_p50_ms": _percentile(latencies, 0.50) * 1000,
+        "probe_p99_ms": _percentile(latencies, 0.99) * 1000,
+        "final_workers": stats["workers"],
+        "throttled_seconds": stats["throttled_seconds"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do escalonador de I/O em disco lento")
+    parser.add_argument("--files", type=int, default=400, help="Arquivos no diretório de origem")
+    parser.add_argument("--size-kb", type=int, default=256, help="Tamanho de cada arquivo")
+    parser.add_argument("--disk-mb-per-s", type=float, default=80.0, help="Banda do disco simulado")
+    parser.add_argument("--disk-latency-ms", type=float, default=2.0, help="Latência por operação")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="max_workers")
+    parser.add_argument("--budget-mb-per-s", type=float, default=5.0, help="Orçamento de MB/s")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    disk = SlowDisk(args.disk_mb_per_s, args.disk_latency_ms / 1000)
+    variants = {
+        "unthrottled": {},
+        "budget": {"io_mb_per_s": args.budget_mb_per_s},
+        "adaptive": {"adaptive_workers": True, "io_target_latency": args.disk_latency_ms * 4 / 1000},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        root = tmp / "dados"
+        generate_tree(root, args.files, args.size_kb)
+        results = {
+            name: measure(name, root, tmp / "backup", disk, args.workers, **options)
+            for name, options in variants.items()
+        }
+
+    if args.json:
+        print(json.dumps({
+            "files": args.files, "size_kb": args.size_kb,
+            "disk_mb_per_s": args.disk_mb_per_s, "results": results
+        }, indent=2))
+        return
+
+    print(f"Arquivos: {args.files} x {args.size_kb} KB | disco: {args.disk_mb_per_s} MB/s")
+    for name, result in results.items():
+        print(
+            f"{name:>12}: backup {result['backup_mb_per_s']:6.1f} MB/s | "
+            f"bot p50 {result['probe_p50_ms']:7.1f} ms | p99 {result['probe_p99_ms']:7.1f} ms | "
+            f"workers {result['final_workers']:2d} | espera {result['throttled_seconds']:6.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
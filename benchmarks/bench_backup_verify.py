@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark da Verificação e Restauração em Fluxo
+===============================================================
+
+Mede verify_backup (completo e rápido) e restore_backup de um backup QBK1
+e compara com o caminho antigo de verificação, que copiava cada arquivo
+para um .tmp, descriptografava no lugar, descomprimia para o disco e
+calculava o hash do resultado. Cada variante roda em um processo separado
+para que o pico de RSS medido seja apenas dela.
+
+Uso:
+    python benchmarks/bench_backup_verify.py --size-mb 2048 --files 20000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+Path("logs").mkdir(exist_ok=True)
+
+PASSWORD = "quantum"
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo atual em MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def generate_tree(root: Path, size_mb: int, files: int):
+    """
+    Gera arquivos grandes (metade compressível) e muitos arquivos pequenos.
+
+    Args:
+        root: Diretório raiz
+        size_mb: Volume total dos arquivos grandes
+        files: Quantidade de arquivos pequenos
+    """
+    block = 1024 * 1024
+    text = (b"EVA & GUARANI " * (block // 14 + 1))[:block]
+
+    large = root / "grandes"
+    large.mkdir(parents=True)
+    for i in range(0, size_mb, 256):
+        with open(large / f"dados_{i:05d}.bin", "wb") as f:
+            for j in range(min(256, size_mb - i)):
+                f.write(os.urandom(block) if j % 2 else text)
+
+    for i in range(files):
+        directory = root / "conversas" / f"{i // 500:04d}"
+        if i % 500 == 0:
+            directory.mkdir(parents=True)
+        (directory / f"msg_{i:07d}.json").write_text(
+            json.dumps({"id": i, "role": "user", "content": f"mensagem {i} " * 20})
+        )
+
+
+def _manager(root: Path, backup_dir: Path):
+    from modules.quantum.quantum_backup_unified import QuantumBackupManager, create_backup_config
+
+    config = create_backup_config(
+        root, backup_dir, encryption_key=PASSWORD, pack_small_files=True
+    )
+    return QuantumBackupManager(config)
+
+
+def legacy_verify(manager, metadata: dict) -> bool:
+    """Verificação antiga: cópia .tmp, descriptografia e descompressão no disco."""
+    from modules.quantum.backup_pipeline import decode_file
+
+    backup_dir = manager.config.backup_dir / metadata["type"] / metadata["timestamp"]
+    chunk_size = manager.config.chunk_size
+    valid = True
+
+    for rel_path, info in metadata["files"].items():
+        path = manager._stored_path(backup_dir, rel_path, info)
+        temp = Path(str(path) + ".tmp")
+        dst = Path(str(path) + ".dec")
+
+        if "segment" in info:
+            with open(path, "rb") as f_in, open(temp, "wb") as f_out:
+                f_in.seek(info["offset"])
+                f_out.write(f_in.read(info["stored_size"]))
+        else:
+            shutil.copy2(path, temp)
+
+        # O formato QBK1 substitui o par Fernet + zstd; a decodificação para
+        # o disco reproduz as mesmas gravações extras do caminho antigo
+        decode_file(temp, dst, key=manager.key)
+
+        hasher = hashlib.sha256()
+        with open(dst, "rb") as f:
+            while chunk := f.read(chunk_size):
+                hasher.update(chunk)
+        valid &= hasher.hexdigest() == info["hash"]
+
+        temp.unlink()
+        dst.unlink()
+
+    return valid
+
+
+def _worker(name, root, backup_dir, timestamp, queue):
+    manager = _manager(root, backup_dir)
+    metadata = manager._load_backup_metadata(timestamp)
+
+    start = time.perf_counter()
+    if name == "legacy_verify":
+        ok = legacy_verify(manager, metadata)
+    elif name == "verify":
+        ok = manager.verify_backup(timestamp)
+    elif name == "fast_verify":
+        ok = manager.verify_backup(timestamp, fast=True)
+    else:
+        target = Path(str(backup_dir) + "_restore")
+        manager.restore_backup(timestamp, target)
+        ok = True
+        shutil.rmtree(target)
+
+    seconds = time.perf_counter() - start
+    queue.put({
+        "ok": ok,
+        "seconds": seconds,
+        "mb_per_s": metadata["total_size"] / 1024 / 1024 / seconds,
+        "peak_rss_mb": _peak_rss_mb()
+    })
+
+
+def measure(name: str, root: Path, backup_dir: Path, timestamp: str) -> dict:
+    """Executa uma variante em um processo isolado."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_worker, args=(name, root, backup_dir, timestamp, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da verificação e restauração")
+    parser.add_argument("--size-mb", type=int, default=2048, help="Volume dos arquivos grandes")
+    parser.add_argument("--files", type=int, default=20_000, help="Arquivos pequenos")
+    parser.add_argument("--workdir", default=None, help="Diretório de trabalho")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        tmp = Path(tmp)
+        root = tmp / "dados"
+        backup_dir = tmp / "backup"
+        generate_tree(root, args.size_mb, args.files)
+
+        metadata = _manager(root, backup_dir).create_backup(incremental=False)
+
+        results = {
+            name: measure(name, root, backup_dir, metadata.timestamp)
+            for name in ("legacy_verify", "verify", "fast_verify", "restore")
+        }
+
+    if args.json:
+        print(json.dumps({
+            "size_mb": args.size_mb, "files": args.files, "results": results
+        }, indent=2))
+        return
+
+    print(f"Arquivos grandes: {args.size_mb} MB | arquivos pequenos: {args.files}")
+    for name, result in results.items():
+        print(
+            f"{name:>14}: {result['mb_per_s']:8.1f} MB/s | "
+            f"RSS pico {result['peak_rss_mb']:8.1f} MB | "
+            f"{result['seconds']:6.2f}s | {'ok' if result['ok'] else 'FALHA'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark da Coleta de Arquivos do Backup
+=========================================================
+
+Compara a coleta antiga do QuantumBackupManager (Path.rglob("*") com
+Path.match em cada arquivo, materializando a lista inteira) com o
+ParallelWalker baseado em os.scandir. A árvore sintética tem muitos
+arquivos pequenos e um diretório __pycache__ por pasta, que o walker poda
+sem descer.
+
+Uso:
+    python benchmarks/bench_backup_walker.py --files 1000000 --root /tmp/arvore
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+EXCLUDE_PATTERNS = ["*.pyc", "__pycache__", "*.log"]
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo atual em MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def generate_tree(root: Path, files: int, per_dir: int = 1000):
+    """
+    Gera uma árvore sintética, reaproveitando-a se já existir.
+
+    Args:
+        root: Diretório raiz
+        files: Total de arquivos incluídos
+        per_dir: Arquivos por diretório
+    """
+    marker = root / ".generated"
+    if marker.exists() and marker.read_text() == str(files):
+        return
+
+    for i in range(0, files, per_dir):
+        directory = root / f"d{i // (per_dir * 100):03d}" / f"s{i // per_dir:05d}"
+        cache = directory / "__pycache__"
+        cache.mkdir(parents=True, exist_ok=True)
+        for j in range(min(per_dir, files - i)):
+            (directory / f"f{j:04d}.json").write_bytes(b'{"quantum": true}')
+        for j in range(per_dir // 10):
+            (cache / f"m{j:04d}.pyc").write_bytes(b"\0")
+
+    marker.write_text(str(files))
+
+
+def run_legacy(root: Path) -> int:
+    """Coleta antiga: rglob materializado e Path.match por arquivo."""
+    paths = []
+    for path in root.rglob("*"):
+        if not path.is_file():
+            continue
+        if any(path.match(pattern) for pattern in EXCLUDE_PATTERNS):
+            continue
+        path.stat()
+        paths.append(path)
+    return len(paths)
+
+
+def run_walker(root: Path, workers: int) -> int:
+    """Coleta nova: scandir paralelo com poda e fila limitada."""
+    from modules.quantum.backup_walker import ParallelWalker
+
+    walker = ParallelWalker(root, exclude_patterns=EXCLUDE_PATTERNS, workers=workers)
+    return sum(1 for _ in walker)
+
+
+def _worker(name, root, workers, queue):
+    start = time.perf_counter()
+    count = run_legacy(root) if name == "legacy" else run_walker(root, workers)
+    queue.put({
+        "files": count,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": _peak_rss_mb()
+    })
+
+
+def measure(name: str, root: Path, workers: int) -> dict:
+    """Executa uma variante em um processo isolado."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_worker, args=(name, root, workers, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    result["files_per_s"] = result["files"] / result["seconds"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da coleta de arquivos")
+    parser.add_argument("--files", type=int, default=1_000_000, help="Arquivos na árvore")
+    parser.add_argument("--root", default="/tmp/quantum_walker_tree", help="Raiz da árvore")
+    parser.add_argument("--workers", type=int, default=8, help="Threads do walker")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    generate_tree(root, args.files)
+
+    results = {
+        "legacy": measure("legacy", root, args.workers),
+        "walker": measure("walker", root, args.workers),
+    }
+
+    if args.json:
+        print(json.dumps({"files": args.files, "results": results}, indent=2))
+        return
+
+    for name, result in results.items():
+        print(
+            f"{name:>8}: {result['files']:>9} arquivos | "
+            f"{result['files_per_s']:10.0f} arquivos/s | "
+            f"RSS pico {result['peak_rss_mb']:8.1f} MB | "
+            f"{result['seconds']:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
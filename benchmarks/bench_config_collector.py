@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Coletor de Configurações da API
+============================================================
+
+Compara a coleta antiga de _collect_configurations (dois glob("**/*")
+por diretório do sistema, um para contar e outro para somar tamanhos)
+com collect_directories (uma varredura os.scandir por raiz, poda dos
+diretórios excluídos e raízes em paralelo).
+
+A árvore sintética imita os diretórios do sistema: várias raízes com
+código e dados e, em algumas, um node_modules/.git grande e irrelevante.
+
+Uso:
+    python benchmarks/bench_config_collector.py --files 200000 --root /tmp/arvore_config
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.api.config_collector import DEFAULT_EXCLUDES, collect_directories
+
+ROOTS = ["config", "src", "core", "modules", "scripts", "data", "logs", "models"]
+
+
+def generate_tree(root: Path, files: int, per_dir: int = 200):
+    """
+    Gera a árvore sintética, reaproveitando-a se já existir.
+
+    Metade dos arquivos fica nas raízes do sistema e metade em
+    node_modules/.git dentro de "src" e "modules".
+    """
+    marker = root / ".generated"
+    if marker.exists() and marker.read_text() == str(files):
+        return
+
+    useful = files // 2
+    for i in range(0, useful, per_dir):
+        directory = root / ROOTS[(i // per_dir) % len(ROOTS)] / f"pkg{i // per_dir:05d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(min(per_dir, useful - i)):
+            (directory / f"item{j:04d}.json").write_bytes(b'{"quantum": true}')
+
+    noise = files - useful
+    for i in range(0, noise, per_dir):
+        owner = "src" if (i // per_dir) % 2 else "modules"
+        hidden = "node_modules" if (i // per_dir) % 3 else ".git"
+        directory = root / owner / hidden / f"dep{i // per_dir:05d}" / "lib"
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(min(per_dir, noise - i)):
+            (directory / f"index{j:04d}.js").write_bytes(b"module.exports = {};")
+
+    marker.write_text(str(files))
+
+
+def run_legacy(roots):
+    """Coleta antiga: dois glob("**/*") por raiz, em sequência."""
+    directories = {}
+    for dir_name in roots:
+        dir_path = Path(dir_name)
+        if dir_path.exists():
+            directories[dir_name] = {
+                "exists": True,
+                "file_count": len(list(dir_path.glob("**/*"))),
+                "size_bytes": sum(f.stat().st_size for f in dir_path.glob("**/*") if f.is_file())
+            }
+        else:
+            directories[dir_name] = {"exists": False}
+    return directories
+
+
+def measure(name: str, run) -> dict:
+    start = time.perf_counter()
+    directories = run()
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "file_count": sum(d.get("file_count", 0) for d in directories.values()),
+        "size_bytes": sum(d.get("size_bytes", 0) for d in directories.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do coletor de configurações")
+    parser.add_argument("--files", type=int, default=200_000, help="Arquivos na árvore")
+    parser.add_argument("--root", default="/tmp/quantum_config_tree", help="Raiz da árvore")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    generate_tree(root, args.files)
+    # Os diretórios do sistema são relativos ao diretório atual, como na API
+    os.chdir(root)
+
+    variants = {
+        "legacy": lambda: run_legacy(ROOTS),
+        "scandir": lambda: collect_directories(ROOTS, exclude=[]),
+        "scandir+exclude": lambda: collect_directories(ROOTS, exclude=DEFAULT_EXCLUDES),
+    }
+    results = {name: measure(name, run) for name, run in variants.items()}
+
+    if args.json:
+        print(json.dumps({"files": args.files, "results": results}, indent=2))
+        return
+
+    base = results["legacy"]["seconds"]
+    print(f"Arquivos: {args.files} | raízes: {len(ROOTS)}")
+    for name, result in results.items():
+        print(
+            f"{name:>16}: {result['seconds']:7.2f}s ({base / result['seconds']:5.1f}x) | "
+            f"arquivos {result['file_count']:8d} | {result['size_bytes'] / 1024 / 1024:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
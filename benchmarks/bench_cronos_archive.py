@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark dos Arquivos do CRONOS
+================================================
+
+Compara a gravação dos backups do CRONOS:
+
+- legacy: zipfile com ZIP_DEFLATED em uma thread, seguido de uma segunda
+  leitura do zip inteiro para o MD5 (implementação anterior do
+  CronosSystem.create_backup)
+- parallel-*: ParallelZipWriter (deflate em paralelo, checksum calculado
+  durante a gravação) com SHA-256 e BLAKE2b
+
+Cada variante grava o mesmo corpus (arquivos pequenos e grandes, parte
+compressível e parte aleatória); o zip resultante é validado com
+zipfile.testzip().
+
+Uso:
+    python benchmarks/bench_cronos_archive.py --small 2000 --large 4 --large-mb 64
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import zipfile
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.cronos.cronos_archive import ParallelZipWriter
+
+
+def generate_tree(root: Path, small: int, large: int, large_mb: int, seed: int = 42) -> List[Path]:
+    """Gera arquivos pequenos (texto) e grandes (metade texto, metade aleatório)."""
+    rng = random.Random(seed)
+    words = [b"cronos", b"backup", b"quantum", b"eva", b"guarani", b"zip", b"dados", b"log"]
+    paths = []
+
+    for i in range(small):
+        path = root / "small" / f"{i % 50:02d}" / f"file_{i}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b" ".join(rng.choice(words) for _ in range(rng.randint(50, 2000))))
+        paths.append(path)
+
+    for i in range(large):
+        path = root / "large" / f"blob_{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for block in range(large_mb):
+                if block % 2:
+                    f.write(rng.randbytes(1024 * 1024))
+                else:
+                    f.write(b" ".join(rng.choice(words) for _ in range(150000))[:1024 * 1024])
+        paths.append(path)
+
+    return paths
+
+
+def write_legacy(target: Path, files: List[Path], root: Path) -> str:
+    """Zip em uma thread e MD5 em uma segunda leitura (blocos de 4KB)."""
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in files:
+            zipf.write(path, path.relative_to(root).as_posix())
+
+    hash_md5 = hashlib.md5()
+    with open(target, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def write_parallel(algorithm: str, workers: int) -> Callable[[Path, List[Path], Path], str]:
+    """Variante com ParallelZipWriter e checksum em linha."""
+    def write(target: Path, files: List[Path], root: Path) -> str:
+        with ParallelZipWriter(target, max_workers=workers, checksum_algorithm=algorithm) as writer:
+            for path in files:
+                writer.add_file(path, path.relative_to(root).as_posix())
+            return writer.close().checksum
+    return write
+
+
+def measure(write: Callable, target: Path, files: List[Path], root: Path, total: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    checksum = write(target, files, root)
+    seconds = time.perf_counter() - start
+
+    with zipfile.ZipFile(target) as zipf:
+        ok = zipf.testzip() is None and len(zipf.infolist()) == len(files)
+    size = target.stat().st_size
+    target.unlink()
+
+    return {
+        "seconds": seconds,
+        "mb_per_s": total / 1024 / 1024 / seconds,
+        "archive_bytes": size,
+        "ratio": size / total if total else 0.0,
+        "checksum": checksum,
+        "ok": ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos arquivos do CRONOS")
+    parser.add_argument("--small", type=int, default=2000, help="Arquivos pequenos")
+    parser.add_argument("--large", type=int, default=4, help="Arquivos grandes")
+    parser.add_argument("--large-mb", type=int, default=64, help="Tamanho de cada arquivo grande")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Threads de compressão")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    variants = {
+        "legacy": write_legacy,
+        "parallel-sha256": write_parallel("sha256", args.workers),
+        "parallel-blake2b": write_parallel("blake2b", args.workers),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        root = tmp / "dados"
+        files = generate_tree(root, args.small, args.large, args.large_mb)
+        total = sum(path.stat().st_size for path in files)
+        results = {
+            name: measure(write, tmp / f"{name}.zip", files, root, total)
+            for name, write in variants.items()
+        }
+
+    if args.json:
+        print(json.dumps({
+            "files": len(files), "bytes": total, "workers": args.workers, "results": results
+        }, indent=2))
+        return
+
+    print(f"Arquivos: {len(files)} | {total / 1024 / 1024:.1f} MB | workers: {args.workers}")
+    base = results["legacy"]["seconds"]
+    for name, result in results.items():
+        print(
+            f"{name:>17}: {result['mb_per_s']:7.1f} MB/s | {result['seconds']:6.2f}s "
+            f"({base / result['seconds']:.2f}x) | razão {result['ratio']:.3f} | "
+            f"{'ok' if result['ok'] else 'FALHA'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
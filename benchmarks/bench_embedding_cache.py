@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Cache de Embeddings
+================================================
+
+Simula uma carga com textos repetidos (descrições de persona, perguntas
+frequentes) contra o provedor simulado, com latência por lote, e compara:
+- sem cache: todo texto vai ao provedor
+- com cache: só os textos ausentes vão ao provedor
+- reinício: nova instância lendo o mesmo banco (camada em disco)
+
+Uso:
+    python benchmarks/bench_embedding_cache.py --requests 200 --vocabulary 300
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.integration.model_manager import ModelManager, ModelConfig
+from modules.integration.embedding_cache import EmbeddingCache
+from modules.integration.models.fake import FakeModel
+
+
+class SlowFakeModel(FakeModel):
+    """Provedor simulado com latência fixa por chamada de lote."""
+
+    latency = 0.02
+    texts_sent = 0
+
+    async def embed_many(self, texts, **kwargs):
+        await asyncio.sleep(self.latency)
+        SlowFakeModel.texts_sent += len(texts)
+        return [await self.embed(text) for text in texts]
+
+
+def workload(args) -> list:
+    # Distribuição enviesada: poucos textos concentram a maior parte dos pedidos
+    rng = random.Random(42)
+    vocabulary = [f"Pergunta frequente número {index} sobre a EVA & GUARANI" for index in range(args.vocabulary)]
+    weights = [1.0 / (index + 1) for index in range(args.vocabulary)]
+    return [rng.choices(vocabulary, weights, k=args.batch) for _ in range(args.requests)]
+
+
+async def replay(manager: ModelManager, batches: list) -> dict:
+    SlowFakeModel.texts_sent = 0
+    start = time.perf_counter()
+    for texts in batches:
+        await manager.generate_embeddings(texts, "fake")
+    return {"seconds": time.perf_counter() - start, "texts_sent": SlowFakeModel.texts_sent}
+
+
+def make_manager(cache: EmbeddingCache, args) -> ModelManager:
+    manager = ModelManager(embedding_cache=cache)
+    SlowFakeModel.latency = args.latency
+    manager.models["fake"] = SlowFakeModel(ModelConfig(
+        name="fake", provider="fake", options={"embedding_dim": args.dimensions}
+    ))
+    return manager
+
+
+async def run(args) -> dict:
+    batches = workload(args)
+    path = Path(tempfile.mkdtemp()) / "embedding_cache.db"
+    results = {}
+
+    uncached = make_manager(EmbeddingCache(path=None, max_memory_bytes=0), args)
+    results["uncached"] = await replay(uncached, batches)
+
+    cached = make_manager(EmbeddingCache(path=path), args)
+    results["cached"] = await replay(cached, batches)
+    results["cached"]["metrics"] = cached.embedding_cache.metrics()
+    cached.embedding_cache.close()
+
+    restarted = make_manager(EmbeddingCache(path=path), args)
+    results["restarted"] = await replay(restarted, batches)
+    results["restarted"]["metrics"] = restarted.embedding_cache.metrics()
+    restarted.embedding_cache.close()
+
+    return {
+        "requests": args.requests,
+        "batch": args.batch,
+        "vocabulary": args.vocabulary,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de embeddings")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições de embeddings")
+    parser.add_argument("--batch", type=int, default=8, help="Textos por requisição")
+    parser.add_argument("--vocabulary", type=int, default=300, help="Textos distintos")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Dimensões de cada vetor")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência do provedor por lote (segundos)")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Carga: {result['requests']} requisições x {result['batch']} textos, {result['vocabulary']} textos distintos")
+    base = result["results"]["uncached"]
+    for name, item in result["results"].items():
+        line = (
+            f"{name:>10}: {item['seconds']:7.2f} s ({base['seconds'] / item['seconds']:5.1f}x) | "
+            f"{item['texts_sent']:5d} textos enviados"
+        )
+        metrics = item.get("metrics")
+        if metrics:
+            line += (
+                f" | acerto {metrics['hit_rate']:.1%} "
+                f"(memória {metrics['memory_hits']}, disco {metrics['disk_hits']}) | "
+                f"{metrics['bytes_saved'] / 1024:.0f} KB economizados"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Pool HTTP dos Provedores
+=====================================================
+
+Compara, contra um servidor local que imita a API de embeddings da
+OpenAI, o custo das chamadas:
+- sessão por chamada: o padrão antigo do fallback de embeddings, que
+  criava um OpenAIModel (e uma ClientSession) a cada chamada
+- pool compartilhado: OpenAIModel usando o HTTPClientRegistry
+
+Conexões locais não têm TLS nem latência de rede; em produção a
+diferença por conexão nova é bem maior (handshake TLS com a API).
+
+Uso:
+    python benchmarks/bench_http_pool.py --requests 500 --concurrency 16
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from modules.integration.http_pool import get_registry
+from modules.integration.model_manager import ModelConfig
+from modules.integration.models.openai import OpenAIModel
+
+
+async def embeddings(request):
+    body = await request.json()
+    return web.json_response({"data": [{"index": 0, "embedding": [0.0, 1.0]}], "echo": body["input"]})
+
+
+def make_model(base_url: str) -> OpenAIModel:
+    model = OpenAIModel(ModelConfig(name="bench", provider="openai", api_key="bench"))
+    model.base_url = base_url
+    return model
+
+
+async def per_call(base_url: str, args) -> dict:
+    # Uma sessão nova por chamada, fechada logo depois
+    connections = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def call(index: int):
+        nonlocal connections
+        async with semaphore:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{base_url}/embeddings", json={"input": f"t{index}"}) as response:
+                    await response.json()
+            connections += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(args.requests)))
+    return {"seconds": time.perf_counter() - start, "connections_created": connections}
+
+
+async def shared(base_url: str, args) -> dict:
+    registry = get_registry()
+    model = make_model(base_url)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def call(index: int):
+        async with semaphore:
+            await model.embed(f"t{index}")
+
+    await registry.warm_up([base_url], connections=args.concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(args.requests)))
+    seconds = time.perf_counter() - start
+    metrics = registry.metrics()
+    await registry.close()
+    return {
+        "seconds": seconds,
+        "connections_created": metrics["connections_created"],
+        "reuse_rate": metrics["reuse_rate"],
+    }
+
+
+async def run(args) -> dict:
+    app = web.Application()
+    app.router.add_post("/v1/embeddings", embeddings)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url("/v1"))
+    try:
+        results = {
+            "per-call": await per_call(base_url, args),
+            "shared": await shared(base_url, args),
+        }
+    finally:
+        await server.close()
+    return {"requests": args.requests, "concurrency": args.concurrency, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pool HTTP dos provedores")
+    parser.add_argument("--requests", type=int, default=500, help="Chamadas de embeddings")
+    parser.add_argument("--concurrency", type=int, default=16, help="Chamadas simultâneas")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Carga: {result['requests']} chamadas, {result['concurrency']} simultâneas")
+    base = result["results"]["per-call"]
+    for name, item in result["results"].items():
+        line = (
+            f"{name:>9}: {item['seconds']:6.2f} s ({base['seconds'] / item['seconds']:4.1f}x) | "
+            f"{item['connections_created']:5d} conexões criadas"
+        )
+        if "reuse_rate" in item:
+            line += f" | reaproveitamento {item['reuse_rate']:.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark do Construtor de Prompts das Sessões
+==============================================================
+
+Compara o custo por mensagem da montagem antiga do prompt
+(_build_prompt_from_messages: concatenação com += sobre todo o
+histórico a cada mensagem, sem limite) com o PromptBuilder incremental
+(só as mensagens novas são renderizadas e contadas; o prompt fica dentro
+do orçamento de tokens do modelo).
+
+O custo antigo cresce com o tamanho da sessão; o do construtor fica
+plano depois que o orçamento é atingido.
+
+Uso:
+    python benchmarks/bench_prompt_builder.py --turns 5000 --budget 4000
+"""
+
+import sys
+import json
+import time
+import uuid
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.integration.prompt_builder import PromptBuilder, get_counter
+
+
+def legacy_prompt(messages) -> str:
+    """Montagem antiga do APIAdapter."""
+    prompt = ""
+    for message in messages:
+        role = message["role"]
+        content = message["content"]
+        if role == "system":
+            prompt += f"[Sistema]: {content}\n\n"
+        elif role == "user":
+            prompt += f"[Usuário]: {content}\n\n"
+        elif role == "assistant":
+            prompt += f"[Assistente]: {content}\n\n"
+    prompt += "[Assistente]: "
+    return prompt
+
+
+def message(role: str, turn: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "role": role,
+        "content": f"Mensagem {turn} da conversa quântica sobre consciência e ética. " * 3,
+    }
+
+
+def run(args) -> dict:
+    counter = get_counter(args.model)
+    builder = PromptBuilder(args.budget, counter)
+    messages = [{"id": "system", "role": "system", "content": "Você é EVA & GUARANI."}]
+    checkpoints = set(range(args.step, args.turns + 1, args.step))
+    samples = []
+    legacy_total = builder_total = 0.0
+
+    for turn in range(1, args.turns + 1):
+        messages.append(message("user", turn))
+
+        start = time.perf_counter()
+        old = legacy_prompt(messages)
+        legacy_seconds = time.perf_counter() - start
+        # O prompt antigo também seria enviado inteiro: conta os tokens dele
+        old_tokens = counter.count(old) if turn in checkpoints else None
+
+        start = time.perf_counter()
+        new = builder.sync(messages)
+        builder_seconds = time.perf_counter() - start
+
+        legacy_total += legacy_seconds
+        builder_total += builder_seconds
+        if turn in checkpoints:
+            samples.append({
+                "turn": turn,
+                "legacy_us": legacy_seconds * 1e6,
+                "builder_us": builder_seconds * 1e6,
+                "legacy_tokens": old_tokens,
+                "builder_tokens": builder.tokens,
+                "omitted": builder.omitted,
+                "prompt_chars": len(new),
+            })
+
+        messages.append(message("assistant", turn))
+
+    return {
+        "turns": args.turns,
+        "budget": args.budget,
+        "legacy_seconds": legacy_total,
+        "builder_seconds": builder_total,
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do construtor de prompts")
+    parser.add_argument("--turns", type=int, default=5000, help="Mensagens do usuário na sessão")
+    parser.add_argument("--step", type=int, default=500, help="Intervalo entre amostras")
+    parser.add_argument("--budget", type=int, default=4000, help="Orçamento de tokens do prompt")
+    parser.add_argument("--model", default="gpt-4", help="Modelo (define o tokenizador)")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Turnos: {result['turns']} | orçamento: {result['budget']} tokens")
+    print(f"{'turno':>7} | {'antigo (µs)':>12} {'tokens':>9} | {'construtor (µs)':>15} {'tokens':>7} {'omitidas':>9}")
+    for sample in result["samples"]:
+        print(
+            f"{sample['turn']:7d} | {sample['legacy_us']:12.1f} {sample['legacy_tokens']:9d} | "
+            f"{sample['builder_us']:15.1f} {sample['builder_tokens']:7d} {sample['omitted']:9d}"
+        )
+    print(f"Total: antigo {result['legacy_seconds']:.2f}s | construtor {result['builder_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Benchmark da Serialização das Respostas de Embeddings
+=====================================================================
+
+Mede o custo de montar a resposta de /api/embeddings em cada formato:
+- stdlib: web.json_response com o json da biblioteca padrão (antigo)
+- json: json_response do módulo de serialização (orjson, se instalado)
+- base64: JSON com os vetores em float32 base64 (encoding_format)
+- octet-stream: matriz float32 crua (Accept: application/octet-stream)
+- msgpack: vetores float32 em msgpack (se instalado)
+
+Uso:
+    python benchmarks/bench_serialization.py --count 100 --dimensions 1536
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from modules.integration.serialization import (
+    MSGPACK, OCTET_STREAM, MSGPACK_AVAILABLE, ORJSON_AVAILABLE, embeddings_response
+)
+
+
+def metadata(count: int, dimensions: int) -> dict:
+    return {
+        "model": "text-embedding-ada-002",
+        "count": count,
+        "dimensions": dimensions,
+        "generated_at": time.time(),
+        "processing_time": 0.123,
+    }
+
+
+def measure(build, repeat: int) -> dict:
+    body = build().body
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    seconds = (time.perf_counter() - start) / repeat
+    return {"ms": seconds * 1000, "bytes": len(body)}
+
+
+def run(args) -> dict:
+    rng = random.Random(42)
+    embeddings = [[rng.uniform(-1, 1) for _ in range(args.dimensions)] for _ in range(args.count)]
+    meta = metadata(args.count, args.dimensions)
+
+    # Requisições montadas uma vez: só a serialização entra na medida
+    plain = make_mocked_request("POST", "/api/embeddings")
+    binary = make_mocked_request("POST", "/api/embeddings", headers={"Accept": OCTET_STREAM})
+    packed = make_mocked_request("POST", "/api/embeddings", headers={"Accept": MSGPACK})
+
+    variants = {
+        "stdlib": lambda: web.json_response({**meta, "embeddings": embeddings}),
+        "json": lambda: embeddings_response(plain, meta, embeddings),
+        "base64": lambda: embeddings_response(plain, meta, embeddings, encoding_format="base64"),
+        "octet-stream": lambda: embeddings_response(binary, meta, embeddings),
+    }
+    if MSGPACK_AVAILABLE:
+        variants["msgpack"] = lambda: embeddings_response(packed, meta, embeddings)
+
+    return {
+        "count": args.count,
+        "dimensions": args.dimensions,
+        "orjson": ORJSON_AVAILABLE,
+        "msgpack": MSGPACK_AVAILABLE,
+        "results": {name: measure(build, args.repeat) for name, build in variants.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da serialização de embeddings")
+    parser.add_argument("--count", type=int, default=100, help="Vetores por resposta")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Dimensões de cada vetor")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições por formato")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"Resposta: {result['count']} vetores x {result['dimensions']} dimensões | "
+        f"orjson: {result['orjson']} | msgpack: {result['msgpack']}"
+    )
+    base = result["results"]["stdlib"]
+    for name, item in result["results"].items():
+        print(
+            f"{name:>13}: {item['ms']:8.2f} ms ({base['ms'] / item['ms']:5.1f}x) | "
+            f"{item['bytes'] / 1024:9.1f} KB ({item['bytes'] / base['bytes']:5.2f} do tamanho)"
+        )
+
+
+if __name__ == "__main__":
+    main()
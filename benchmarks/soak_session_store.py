@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Teste de Resistência do Armazenamento de Sessões
+================================================================
+
+Simula uma semana de clientes sintéticos contra o armazenamento de
+sessões do APIAdapter, com relógio simulado: a cada minuto chegam
+sessões novas, parte das sessões ativas troca mensagens e as demais são
+abandonadas (nunca excluídas pelo cliente). O varredor roda a cada
+minuto simulado.
+
+A memória (tracemalloc) é amostrada a cada hora simulada. Com TTL,
+limite de sessões e limite de mensagens ela deve estabilizar no
+primeiro dia e ficar plana até o fim; o dicionário antigo ("legacy")
+cresce sem limite.
+
+Uso:
+    python benchmarks/soak_session_store.py --days 7 --backend memory
+    python benchmarks/soak_session_store.py --days 7 --backend sqlite --db /tmp/sessions.db
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.integration.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+class SimulatedClock:
+    """Relógio controlado pela simulação."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LegacySessions:
+    """O dicionário anterior do APIAdapter, sem limites, com a mesma interface."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def create(self, session):
+        self._sessions[session["id"]] = session
+        return session
+
+    def append_message(self, session_id, message):
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session["messages"].append(message)
+        return session
+
+    def sweep(self):
+        return 0
+
+    def metrics(self):
+        return {
+            "sessions": len(self._sessions),
+            "messages": sum(len(s["messages"]) for s in self._sessions.values()),
+        }
+
+    def close(self):
+        pass
+
+
+def run(args) -> dict:
+    clock = SimulatedClock()
+    limits = {
+        "idle_ttl": args.idle_ttl,
+        "max_sessions": args.max_sessions,
+        "max_messages": args.max_messages,
+        "clock": clock,
+    }
+    if args.backend == "memory":
+        store = MemorySessionStore(**limits)
+    elif args.backend == "sqlite":
+        Path(args.db).unlink(missing_ok=True)
+        store = SQLiteSessionStore(args.db, **limits)
+    else:
+        store = LegacySessions()
+
+    rng = random.Random(42)
+    active = []
+    samples = []
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for minute in range(args.days * 24 * 60):
+        clock.now += 60
+
+        for _ in range(args.clients_per_minute):
+            session_id = str(uuid.uuid4())
+            store.create({
+                "id": session_id, "model": "gpt-4o", "created_at": clock.now,
+                "messages": [], "metadata": {"client": "soak"},
+            })
+            active.append(session_id)
+
+        # Clientes ativos conversam; alguns abandonam a sessão
+        for _ in range(args.messages_per_minute):
+            if not active:
+                break
+            index = rng.randrange(len(active))
+            session_id = active[index]
+            for role in ("user", "assistant"):
+                store.append_message(session_id, {
+                    "id": str(uuid.uuid4()), "role": role,
+                    "content": "mensagem quântica " * 8, "created_at": clock.now,
+                })
+            if rng.random() < args.abandon_rate:
+                active[index] = active[-1]
+                active.pop()
+        # A simulação só guarda as sessões recentes como ativas
+        del active[:-args.max_active]
+
+        store.sweep()
+
+        if minute % 60 == 59:
+            current, _ = tracemalloc.get_traced_memory()
+            metrics = store.metrics()
+            samples.append({
+                "hour": (minute + 1) // 60,
+                "memory_mb": current / 1024 / 1024,
+                "sessions": metrics["sessions"],
+                "messages": metrics["messages"],
+            })
+
+    seconds = time.perf_counter() - start
+    tracemalloc.stop()
+    metrics = store.metrics()
+    store.close()
+
+    # Compara o fim do primeiro dia com o fim da simulação
+    day_one = samples[min(23, len(samples) - 1)]["memory_mb"]
+    final = samples[-1]["memory_mb"]
+    return {
+        "backend": args.backend,
+        "days": args.days,
+        "seconds": seconds,
+        "memory_day_one_mb": day_one,
+        "memory_final_mb": final,
+        "memory_peak_after_day_one_mb": max(s["memory_mb"] for s in samples[23:] or samples),
+        "growth_after_day_one": final / day_one if day_one else 0,
+        "metrics": metrics,
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de resistência do armazenamento de sessões")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "legacy"], default="memory")
+    parser.add_argument("--db", default="/tmp/quantum_soak_sessions.db", help="Banco do backend sqlite")
+    parser.add_argument("--days", type=int, default=7, help="Dias simulados")
+    parser.add_argument("--clients-per-minute", type=int, default=10, help="Sessões novas por minuto")
+    parser.add_argument("--messages-per-minute", type=int, default=40, help="Trocas por minuto")
+    parser.add_argument("--abandon-rate", type=float, default=0.05, help="Chance de abandonar após uma troca")
+    parser.add_argument("--max-active", type=int, default=500, help="Sessões ativas na simulação")
+    parser.add_argument("--idle-ttl", type=float, default=3600.0)
+    parser.add_argument("--max-sessions", type=int, default=5000)
+    parser.add_argument("--max-messages", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Backend: {result['backend']} | {result['days']} dias simulados em {result['seconds']:.1f}s")
+    for sample in result["samples"][23::24]:
+        print(
+            f"  dia {sample['hour'] // 24}: {sample['memory_mb']:8.2f} MB | "
+            f"sessões {sample['sessions']:7d} | mensagens {sample['messages']:8d}"
+        )
+    print(
+        f"Memória: {result['memory_day_one_mb']:.2f} MB no 1º dia -> "
+        f"{result['memory_final_mb']:.2f} MB no fim ({result['growth_after_day_one']:.2f}x)"
+    )
+    metrics = result["metrics"]
+    if "expired" in metrics:
+        print(
+            f"Expiradas {metrics['expired']} | descartadas (LRU) {metrics['evicted']} | "
+            f"mensagens cortadas {metrics['trimmed_messages']} | varreduras {metrics['sweeps']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Fila de Jobs de Backup da API
+Versão: 1.0.0 - Build 2025.03.12
+
+Este módulo executa os backups solicitados pela API fora do loop de
+eventos: cada solicitação vira um job com ID, executado por um pool
+limitado de threads, com progresso (arquivos e bytes), cancelamento e
+estado persistido em SQLite.
+
+Ao reiniciar, jobs que estavam na fila voltam para a fila e jobs que
+estavam em execução ficam marcados como interrompidos.
+"""
+
+import json
+import uuid
+import sqlite3
+import logging
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger("✨quantum-api✨")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED, INTERRUPTED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    phase TEXT,
+    files_done INTEGER NOT NULL DEFAULT 0,
+    bytes_done INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs(created_at);
+"""
+
+
+class JobCancelled(Exception):
+    """O job foi cancelado durante a execução."""
+
+
+class JobStore:
+    """Estado dos jobs em SQLite."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre (ou cria) o banco de jobs.
+
+        Args:
+            path: Arquivo do banco SQLite
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        """Fecha o banco."""
+        with self._lock:
+            self._db.close()
+
+    def create(self, job_id: str, request: Dict[str, Any]):
+        """Registra um job novo na fila."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request, ensure_ascii=False), _now())
+            )
+
+    def update(self, job_id: str, **values):
+        """Atualiza colunas de um job (result é serializado em JSON)."""
+        if "result" in values and values["result"] is not None:
+            values["result"] = json.dumps(values["result"], ensure_ascii=False, default=str)
+        columns = ", ".join(f"{column} = ?" for column in values)
+        with self._lock, self._db:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*values.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna um job ou None."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jobs mais recentes primeiro."""
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """
+        Ajusta os jobs deixados por uma execução anterior do processo.
+
+        Returns:
+            Jobs que estavam na fila, para serem reenfileirados
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status = ?",
+                (INTERRUPTED, _now(), "processo reiniciado durante a execução", RUNNING)
+            )
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class JobProgress:
+    """Progresso de um job em execução, repassado ao gerenciador de backup."""
+
+    def __init__(self, job_id: str, store: JobStore, interval: float = 0.5):
+        """
+        Args:
+            job_id: ID do job
+            store: Onde o progresso é persistido
+            interval: Intervalo mínimo entre gravações no banco (segundos)
+        """
+        self.job_id = job_id
+        self.files = 0
+        self.bytes = 0
+        self.phase: Optional[str] = None
+        self._store = store
+        self._interval = interval
+        self._last_flush = 0.0
+        self._cancel = threading.Event()
+        self.cancel_status = CANCELLED
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self, status: str = CANCELLED):
+        """Pede o cancelamento; o job para no próximo ponto de verificação."""
+        self.cancel_status = status
+        self._cancel.set()
+
+    def check(self):
+        """Interrompe o job com JobCancelled se o cancelamento foi pedido."""
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.job_id} cancelado")
+
+    def set_phase(self, phase: str):
+        """Registra a etapa atual do backup."""
+        self.check()
+        self.phase = phase
+        self.flush()
+
+    def advance(self, files: int = 1, nbytes: int = 0):
+        """Soma arquivos e bytes processados."""
+        self.check()
+        self.files += files
+        self.bytes += nbytes
+        if time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+
+    def flush(self):
+        """Grava o progresso atual."""
+        self._last_flush = time.monotonic()
+        self._store.update(self.job_id, phase=self.phase, files_done=self.files, bytes_done=self.bytes)
+
+
+class BackupJobQueue:
+    """Fila de backups executados em um pool limitado de threads."""
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any], JobProgress], Dict[str, Any]],
+        path: Union[str, Path] = "backup/jobs.db",
+        max_workers: int = 2
+    ):
+        """
+        Inicializa a fila e reenfileira os jobs pendentes.
+
+        Args:
+            runner: Executa um backup a partir da solicitação; retorna o resultado
+            path: Banco SQLite dos jobs
+            max_workers: Backups simultâneos
+        """
+        self.store = JobStore(path)
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backup-job")
+        self._active: Dict[str, JobProgress] = {}
+        self._lock = threading.Lock()
+
+        for job in self.store.recover():
+            logger.info(f"Reenfileirando job {job['id']}")
+            self._enqueue(job["id"], job["request"])
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enfileira um backup.
+
+        Args:
+            request: Parâmetros do backup (serializáveis em JSON)
+
+        Returns:
+            Job criado
+        """
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, request)
+        self._enqueue(job_id, request)
+        logger.info(f"Job de backup {job_id} enfileirado")
+        return self.store.get(job_id)
+
+    def _enqueue(self, job_id: str, request: Dict[str, Any]):
+        progress = JobProgress(job_id, self.store)
+        with self._lock:
+            self._active[job_id] = progress
+        self._executor.submit(self._run, job_id, request, progress)
+
+    def _run(self, job_id: str, request: Dict[str, Any], progress: JobProgress):
+        try:
+            if progress.cancelled:
+                self.store.update(job_id, status=progress.cancel_status, finished_at=_now())
+                return
+            self.store.update(job_id, status=RUNNING, started_at=_now())
+            try:
+                result = self._runner(request, progress)
+            except JobCancelled:
+                logger.info(f"Job de backup {job_id} cancelado")
+                progress.flush()
+                self.store.update(job_id, status=progress.cancel_status, finished_at=_now())
+            except Exception as e:
+                logger.error(f"Job de backup {job_id} falhou: {e}")
+                progress.flush()
+                self.store.update(job_id, status=FAILED, finished_at=_now(), error=str(e))
+            else:
+                progress.flush()
+                self.store.update(job_id, status=SUCCEEDED, finished_at=_now(), result=result)
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado atual de um job."""
+        return self.store.get(job_id)
+
+    def list(self, limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jobs mais recentes."""
+        return self.store.list(limit, status)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancela um job na fila ou em execução.
+
+        Returns:
+            Estado do job após o pedido, ou None se não existir
+        """
+        with self._lock:
+            progress = self._active.get(job_id)
+        if progress is not None:
+            progress.cancel()
+            job = self.store.get(job_id)
+            if job and job["status"] == QUEUED:
+                # Ainda não começou: o worker só registra o cancelamento
+                self.store.update(job_id, status=CANCELLED, finished_at=_now())
+        return self.store.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Interrompe os jobs em execução; os da fila ficam para o próximo início."""
+        with self._lock:
+            active = list(self._active.values())
+        for progress in active:
+            if self.store.get(progress.job_id)["status"] == RUNNING:
+                progress.cancel(INTERRUPTED)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.store.close()
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
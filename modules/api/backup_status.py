@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Estado dos Backups da API
+Versão: 1.0.0 - Build 2025.03.14
+
+Cada backup concluído grava um manifest.json no seu diretório com os
+totais (arquivos, bytes de origem, tamanho do arquivo comprimido). O
+índice em memória soma esses manifestos e é atualizado a cada backup
+concluído, de modo que GET /backup/status não percorre o disco.
+
+A reconciliação (periódica, em segundo plano) compara o índice com o
+disco olhando só os diretórios de backup, os manifestos e os zips:
+backups novos ou removidos e zips alterados são corrigidos. Diretórios
+antigos, sem manifesto, são medidos uma única vez e ganham um manifesto.
+"""
+
+import os
+import json
+import logging
+import datetime
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger("✨quantum-api✨")
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def write_manifest(backup_dir: Path, manifest: Dict[str, Any]) -> Path:
+    """
+    Grava o manifesto de um backup (substituição atômica).
+
+    Args:
+        backup_dir: Diretório do backup
+        manifest: Totais do backup
+
+    Returns:
+        Caminho do manifesto
+    """
+    path = Path(backup_dir) / MANIFEST_NAME
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, **manifest}, f, indent=2, ensure_ascii=False)
+    os.replace(temp, path)
+    return path
+
+
+def _directory_totals(path: Path):
+    files = 0
+    size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.stat(os.path.join(root, name)).st_size
+                files += 1
+            except OSError:
+                pass
+    return files, size
+
+
+class BackupStatusIndex:
+    """Totais dos backups em memória, alimentados pelos manifestos."""
+
+    def __init__(self, root: Union[str, Path] = "backup/quantum", archive_dir: Union[str, Path] = "backup"):
+        """
+        Args:
+            root: Diretório dos backups
+            archive_dir: Diretório dos zips
+        """
+        self.root = Path(root)
+        self.archive_dir = Path(archive_dir)
+        self.reconciled_at: Optional[str] = None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._total_size = 0
+        self._total_files = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def add(self, manifest: Dict[str, Any]):
+        """Inclui (ou substitui) um backup no índice."""
+        entry = {
+            "name": manifest["name"],
+            "created_at": manifest["created_at"],
+            "size_bytes": manifest.get("archive_size", 0) + manifest.get("directory_size", 0),
+            "archive": manifest.get("archive"),
+            "archive_size": manifest.get("archive_size", 0),
+            "files": manifest.get("files", 0),
+            "source_bytes": manifest.get("bytes", 0),
+            "has_documentation": manifest.get("has_documentation", False),
+        }
+        with self._lock:
+            self._discard(entry["name"])
+            self._entries[entry["name"]] = entry
+            self._total_size += entry["size_bytes"]
+            self._total_files += entry["files"]
+            self._snapshot = None
+
+    def add_manifest(self, path: Union[str, Path]):
+        """Inclui o backup descrito por um manifesto gravado."""
+        with open(path, "r", encoding="utf-8") as f:
+            self.add(json.load(f))
+
+    def remove(self, name: str):
+        """Retira um backup do índice."""
+        with self._lock:
+            self._discard(name)
+            self._snapshot = None
+
+    def _discard(self, name: str):
+        old = self._entries.pop(name, None)
+        if old:
+            self._total_size -= old["size_bytes"]
+            self._total_files -= old["files"]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Resposta de GET /backup/status.
+
+        A resposta fica em cache até a próxima alteração do índice.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            if not self._entries:
+                snapshot = {"status": "no_backups", "message": "Nenhum backup encontrado"}
+            else:
+                snapshot = {
+                    "status": "success",
+                    "count": len(self._entries),
+                    "total_size_bytes": self._total_size,
+                    "total_files": self._total_files,
+                    "reconciled_at": self.reconciled_at,
+                    "backups": sorted(self._entries.values(), key=lambda x: x["created_at"], reverse=True),
+                }
+            self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _is_legacy(backup_dir: Path) -> bool:
+        # Backups antigos guardam a cópia dos diretórios do sistema; os
+        # atuais só têm arquivos soltos (documentação e manifesto) e podem
+        # estar em andamento, ainda sem manifesto
+        return any(entry.is_dir() for entry in os.scandir(backup_dir))
+
+    def _legacy_manifest(self, backup_dir: Path) -> Dict[str, Any]:
+        # Backup anterior aos manifestos: cópia dos arquivos no diretório
+        # e zip quantum_backup_<timestamp>.zip ao lado
+        timestamp = "_".join(backup_dir.name.split("_")[-2:])
+        archive = self.archive_dir / f"quantum_backup_{timestamp}.zip"
+        files, size = _directory_totals(backup_dir)
+        return {
+            "name": backup_dir.name,
+            "created_at": datetime.datetime.fromtimestamp(backup_dir.stat().st_ctime).isoformat(),
+            "archive": str(archive) if archive.exists() else None,
+            "archive_size": archive.stat().st_size if archive.exists() else 0,
+            "files": files,
+            "bytes": size,
+            "directory_size": size,
+            "has_documentation": (backup_dir / "BACKUP_DOCUMENTATION.md").exists(),
+        }
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Corrige divergências entre o índice e o disco.
+
+        Returns:
+            Quantos backups foram incluídos, atualizados e removidos
+        """
+        added = updated = removed = 0
+        seen = set()
+        # Só entradas que já existiam antes da varredura podem ser removidas;
+        # as incluídas por jobs durante a varredura ficam
+        with self._lock:
+            known = set(self._entries)
+
+        if self.root.exists():
+            for entry in os.scandir(self.root):
+                if not entry.is_dir():
+                    continue
+                backup_dir = Path(entry.path)
+                manifest_path = backup_dir / MANIFEST_NAME
+                try:
+                    if manifest_path.exists():
+                        with open(manifest_path, "r", encoding="utf-8") as f:
+                            manifest = json.load(f)
+                    elif "backup_" in backup_dir.name and self._is_legacy(backup_dir):
+                        manifest = self._legacy_manifest(backup_dir)
+                        write_manifest(backup_dir, manifest)
+                    else:
+                        continue
+
+                    # O zip pode ter sido apagado ou substituído depois do manifesto
+                    archive = manifest.get("archive")
+                    archive_size = os.stat(archive).st_size if archive and os.path.exists(archive) else 0
+                    if archive_size != manifest.get("archive_size", 0):
+                        manifest["archive_size"] = archive_size
+                        write_manifest(backup_dir, manifest)
+                except Exception as e:
+                    logger.error(f"Erro ao reconciliar backup {backup_dir.name}: {e}")
+                    continue
+
+                seen.add(manifest["name"])
+                with self._lock:
+                    current = self._entries.get(manifest["name"])
+                if current is None:
+                    added += 1
+                elif (current["archive_size"], current["files"], current["has_documentation"]) != (
+                    manifest.get("archive_size", 0), manifest.get("files", 0),
+                    manifest.get("has_documentation", False)
+                ):
+                    updated += 1
+                else:
+                    continue
+                self.add(manifest)
+
+        with self._lock:
+            for name in known - seen:
+                # Diretório ainda no disco (manifesto ilegível, por exemplo): mantém
+                if name in self._entries and not (self.root / name).is_dir():
+                    self._discard(name)
+                    removed += 1
+            self.reconciled_at = datetime.datetime.now().isoformat()
+            self._snapshot = None
+        if added or updated or removed:
+            logger.info(f"Estado dos backups reconciliado: +{added} ~{updated} -{removed}")
+        return {"added": added, "updated": updated, "removed": removed}
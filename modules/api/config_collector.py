@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Coletor de Configurações da API
+Versão: 1.0.0 - Build 2025.03.15
+
+Este módulo mede os diretórios do sistema para o registro de
+configurações do backup: cada raiz é percorrida uma única vez com
+os.scandir, diretórios excluídos são podados durante a descida (sem
+entrar neles) e raízes independentes são processadas em paralelo. Os
+padrões de inclusão e exclusão são os PatternSet do coletor de backup.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from modules.quantum.backup_walker import PatternSet
+
+# Diretórios sem valor para o registro de configurações
+DEFAULT_EXCLUDES = (
+    "__pycache__", ".git", ".hg", ".svn", "node_modules",
+    ".venv", "venv", ".mypy_cache", ".pytest_cache", ".tox",
+)
+
+
+@dataclass
+class DirectoryStats:
+    """Totais de uma raiz."""
+    exists: bool
+    file_count: int = 0
+    dir_count: int = 0
+    size_bytes: int = 0
+    excluded_dirs: int = 0
+
+
+def scan_root(root: str, include: PatternSet, exclude: PatternSet) -> DirectoryStats:
+    """
+    Percorre uma raiz uma vez, somando arquivos e bytes.
+
+    Args:
+        root: Diretório a medir
+        include: Padrões de arquivos a contar (vazio = todos)
+        exclude: Padrões de arquivos e diretórios a ignorar; diretórios
+            excluídos não são percorridos
+
+    Returns:
+        Totais da raiz
+    """
+    if not os.path.isdir(root):
+        return DirectoryStats(exists=False)
+
+    stats = DirectoryStats(exists=True)
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, rel_dir))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if exclude.matches(rel_path, entry.name):
+                            stats.excluded_dirs += 1
+                            continue
+                        stats.dir_count += 1
+                        stack.append(rel_path)
+                        continue
+
+                    if not entry.is_file() or exclude.matches(rel_path, entry.name):
+                        continue
+                    if not include.empty and not include.matches(rel_path, entry.name):
+                        continue
+                    size = entry.stat().st_size
+                except OSError:
+                    # Link quebrado ou arquivo removido durante a varredura
+                    continue
+                stats.file_count += 1
+                stats.size_bytes += size
+    return stats
+
+
+def collect_directories(
+    roots: List[str],
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = DEFAULT_EXCLUDES,
+    max_workers: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Mede várias raízes em paralelo.
+
+    Args:
+        roots: Diretórios a medir
+        include: Globs de nomes de arquivo a contar (None = todos)
+        exclude: Globs de nomes a ignorar (padrão: DEFAULT_EXCLUDES)
+        max_workers: Threads (padrão: uma por raiz, até 8)
+
+    Returns:
+        Totais por raiz, na ordem recebida
+    """
+    include_set = PatternSet(include or [])
+    exclude_set = PatternSet(exclude or [])
+    workers = max_workers or min(8, len(roots)) or 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda root: scan_root(root, include_set, exclude_set), roots)
+        return {
+            root: asdict(stats) if stats.exists else {"exists": False}
+            for root, stats in zip(roots, results)
+        }
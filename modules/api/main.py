@@ -12,16 +12,31 @@ fornecendo endpoints para interação com o sistema.
 import os
 import sys
 import json
+import uuid
+import shutil
+import asyncio
+import threading
 import logging
 import datetime
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Union
 
-from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+# Permite executar este módulo diretamente (python main.py / uvicorn main:app)
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from modules.api.backup_jobs import FINAL_STATES, BackupJobQueue, JobCancelled, JobProgress
+from modules.api.backup_status import BackupStatusIndex, write_manifest
+from modules.api.config_collector import DEFAULT_EXCLUDES, collect_directories
+from modules.cronos.cronos_archive import ParallelZipWriter
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,11 +48,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger("✨quantum-api✨")
 
+# Backups simultâneos executados pela fila de jobs
+BACKUP_JOB_WORKERS = 2
+
+# Intervalo entre reconciliações do estado dos backups com o disco (segundos)
+STATUS_RECONCILE_INTERVAL = 300
+
+# Níveis de compressão nomeados (deflate 1-9)
+COMPRESSION_PRESETS = {
+    "fastest": 1,
+    "fast": 3,
+    "balanced": 6,
+    "max": 9,
+}
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Jobs simultâneos gravam no mesmo arquivo do MCP
+_mcp_lock = threading.Lock()
+backup_jobs: Optional[BackupJobQueue] = None
+status_index = BackupStatusIndex()
+
+async def _reconcile_status_periodically():
+    """Corrige divergências do estado dos backups em segundo plano."""
+    while True:
+        await asyncio.sleep(STATUS_RECONCILE_INTERVAL)
+        try:
+            await asyncio.to_thread(status_index.reconcile)
+        except Exception as e:
+            logger.error(f"Erro na reconciliação do estado dos backups: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Carrega o estado dos backups e abre a fila de jobs (reenfileirando os
+    pendentes); ao desligar, para a reconciliação e fecha a fila.
+    """
+    global backup_jobs
+    await asyncio.to_thread(status_index.reconcile)
+    reconciler = asyncio.create_task(_reconcile_status_periodically())
+    backup_jobs = BackupJobQueue(_run_backup_job, max_workers=BACKUP_JOB_WORKERS)
+    yield
+    reconciler.cancel()
+    try:
+        await reconciler
+    except asyncio.CancelledError:
+        pass
+    # Espera os backups em execução sem travar o event loop
+    await asyncio.to_thread(backup_jobs.shutdown)
+    backup_jobs = None
+
 # Inicialização da API
 app = FastAPI(
     title="EVA & GUARANI API",
     description="API Quântica para o Sistema EVA & GUARANI",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Configuração de CORS
@@ -53,7 +118,8 @@ app.add_middleware(
 class BackupRequest(BaseModel):
     backup_name: Optional[str] = None
     include_models: bool = True
-    compress_level: int = 9
+    compress_level: Optional[int] = None  # sobrepõe o preset
+    compression_preset: str = "balanced"
     store_in_mcp: bool = True
 
 class BackupResponse(BaseModel):
@@ -63,55 +129,98 @@ class BackupResponse(BaseModel):
     timestamp: str
     details: Optional[Dict[str, Any]] = None
 
+class BackupJob(BaseModel):
+    id: str
+    status: str
+    request: Dict[str, Any]
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    phase: Optional[str] = None
+    files_done: int = 0
+    bytes_done: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
 # Classe para gerenciar backups
 class QuantumBackupManager:
     """Gerenciador de backups quânticos via API."""
     
-    def __init__(self):
-        """Inicializa o gerenciador de backups."""
+    def __init__(self, job_id: Optional[str] = None):
+        """
+        Inicializa o gerenciador de backups.
+        
+        Args:
+            job_id: ID do job que executa o backup (sufixo único dos nomes)
+        """
         self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.backup_dir = Path(f"backup/quantum/backup_{self.timestamp}")
+        # Jobs iniciados no mesmo segundo não podem compartilhar diretório e zip
+        self.backup_id = f"{self.timestamp}_{(job_id or uuid.uuid4().hex)[:8]}"
+        self.backup_dir = Path(f"backup/quantum/backup_{self.backup_id}")
+        self.zip_path = Path("backup") / f"quantum_backup_{self.backup_id}.zip"
         self.mcp_config_file = Path("cursor/mcp/config_storage.json")
         self.system_dirs = [
             "config", "src", "core", "modules", "scripts",
             "data", "logs", "models", "output",
             "infinity_ai", "ava_mind", "consciousness", "quantum_memory"
         ]
+        # Nomes ignorados (e não percorridos) ao medir os diretórios
+        self.config_excludes = list(DEFAULT_EXCLUDES)
     
-    def create_backup(self, request: BackupRequest) -> BackupResponse:
+    def create_backup(self, request: BackupRequest, progress: Optional[JobProgress] = None) -> BackupResponse:
         """
         Cria um backup completo do sistema.
         
         Args:
             request: Configurações do backup
+            progress: Progresso e cancelamento do job que executa o backup
             
         Returns:
             Resposta com detalhes do backup
         """
+        self.progress = progress
         try:
             logger.info(f"Iniciando backup quântico via API: {request}")
             
             # Personaliza nome do backup se fornecido
             if request.backup_name:
-                self.backup_dir = Path(f"backup/quantum/{request.backup_name}_{self.timestamp}")
+                self.backup_dir = Path(f"backup/quantum/{request.backup_name}_{self.backup_id}")
+            
+            compress_level = self._compression_level(request)
             
             # Cria estrutura de diretórios
             self.backup_dir.mkdir(parents=True, exist_ok=True)
             
-            # Realiza backup dos arquivos do sistema
-            self._backup_system_files(include_models=request.include_models)
+            # Grava os arquivos do sistema direto no arquivo comprimido
+            self._set_phase("archiving")
+            archive = self._backup_system_files(
+                include_models=request.include_models,
+                compress_level=compress_level
+            )
+            zip_path = self.zip_path
             
             # Coleta e armazena configurações
             if request.store_in_mcp:
+                self._set_phase("collecting")
                 configs = self._collect_configurations()
                 self._store_in_mcp(configs)
             
-            # Cria arquivo comprimido
-            zip_path = self._create_compressed_backup(compress_level=request.compress_level)
-            
             # Gera documentação
             doc_path = self._generate_documentation()
             
+            # Manifesto com os totais do backup (GET /backup/status)
+            manifest_path = write_manifest(self.backup_dir, {
+                "name": self.backup_dir.name,
+                "created_at": datetime.datetime.now().isoformat(),
+                "archive": str(zip_path),
+                "archive_size": archive.size_bytes,
+                "archive_sha256": archive.checksum,
+                "files": len(archive.members),
+                "bytes": sum(member.file_size for member in archive.members),
+                "directory_size": doc_path.stat().st_size,
+                "has_documentation": True
+            })
+            
             return BackupResponse(
                 success=True,
                 message="Backup quântico concluído com sucesso",
@@ -121,12 +230,25 @@ class QuantumBackupManager:
                     "backup_dir": str(self.backup_dir),
                     "mcp_config": str(self.mcp_config_file) if request.store_in_mcp else None,
                     "documentation": str(doc_path),
-                    "included_models": request.include_models
+                    "manifest": str(manifest_path),
+                    "included_models": request.include_models,
+                    "archive_size": archive.size_bytes,
+                    "archive_sha256": archive.checksum,
+                    "files": len(archive.members),
+                    "bytes": sum(member.file_size for member in archive.members)
                 }
             )
             
+        except JobCancelled:
+            logger.info(f"Backup cancelado; removendo {self.backup_dir}")
+            shutil.rmtree(self.backup_dir, ignore_errors=True)
+            self.zip_path.unlink(missing_ok=True)
+            raise
         except Exception as e:
-            logger.error(f"Erro durante o backup: {e}")
+            # Como no cancelamento: não deixa zip parcial para download
+            logger.error(f"Erro durante o backup: {e}; removendo {self.backup_dir}")
+            shutil.rmtree(self.backup_dir, ignore_errors=True)
+            self.zip_path.unlink(missing_ok=True)
             return BackupResponse(
                 success=False,
                 message=f"Erro durante o backup: {str(e)}",
@@ -134,34 +256,69 @@ class QuantumBackupManager:
                 details={"error": str(e)}
             )
     
-    def _backup_system_files(self, include_models: bool = True) -> None:
-        """Realiza backup dos arquivos do sistema."""
-        logger.info("Copiando arquivos do sistema")
+    def _set_phase(self, phase: str) -> None:
+        """Informa a etapa atual ao job, se houver um."""
+        if self.progress is not None:
+            self.progress.set_phase(phase)
+    
+    @staticmethod
+    def _compression_level(request: BackupRequest) -> int:
+        """Nível do deflate: compress_level explícito ou o do preset."""
+        if request.compress_level is not None:
+            return max(1, min(9, request.compress_level))
+        if request.compression_preset not in COMPRESSION_PRESETS:
+            raise ValueError(
+                f"Preset de compressão desconhecido: {request.compression_preset} "
+                f"(use {', '.join(COMPRESSION_PRESETS)})"
+            )
+        return COMPRESSION_PRESETS[request.compression_preset]
+    
+    def _backup_system_files(self, include_models: bool = True, compress_level: int = 6):
+        """
+        Grava os arquivos do sistema direto no zip do backup.
         
-        for dir_name in self.system_dirs:
-            source_dir = Path(dir_name)
-            if not source_dir.exists():
-                logger.warning(f"Diretório não encontrado: {source_dir}")
-                continue
-                
-            # Pula diretório de modelos se não solicitado
-            if dir_name == "models" and not include_models:
-                logger.info("Pulando diretório de modelos conforme solicitado")
-                continue
+        Cada arquivo é lido uma única vez e comprimido em paralelo; não há
+        cópia intermediária em disco.
+        
+        Returns:
+            Resultado do arquivo (tamanho, SHA-256 e membros)
+        """
+        logger.info(f"Gravando arquivos do sistema em {self.zip_path} (nível de compressão {compress_level})")
+        self.zip_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with ParallelZipWriter(self.zip_path, compression_level=compress_level) as writer:
+            for dir_name in self.system_dirs:
+                source_dir = Path(dir_name)
+                if not source_dir.exists():
+                    logger.warning(f"Diretório não encontrado: {source_dir}")
+                    continue
+                    
+                # Pula diretório de modelos se não solicitado
+                if dir_name == "models" and not include_models:
+                    logger.info("Pulando diretório de modelos conforme solicitado")
+                    continue
                 
-            target_dir = self.backup_dir / dir_name
-            target_dir.mkdir(parents=True, exist_ok=True)
+                for root, _, files in os.walk(source_dir):
+                    for file in files:
+                        item = Path(root) / file
+                        relative_path = item.relative_to(source_dir).as_posix()
+                        if self.progress is not None:
+                            self.progress.check()
+                        try:
+                            size = item.stat().st_size
+                            writer.add_file(item, f"{self.backup_dir.name}/{dir_name}/{relative_path}")
+                        except OSError as e:
+                            # Só este arquivo fica de fora
+                            logger.error(f"Erro ao arquivar {item}: {e}")
+                            continue
+                        if self.progress is not None:
+                            self.progress.advance(1, size)
             
-            try:
-                # Copia arquivos recursivamente
-                for item in source_dir.glob("**/*"):
-                    if item.is_file():
-                        relative_path = item.relative_to(source_dir)
-                        destination = target_dir / relative_path
-                        destination.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(item, destination)
-            except Exception as e:
-                logger.error(f"Erro ao copiar {dir_name}: {e}")
+            archive = writer.close()
+        
+        if archive.failed:
+            logger.warning(f"{len(archive.failed)} arquivos não puderam ser lidos e ficaram fora do backup")
+        return archive
     
     def _collect_configurations(self) -> Dict[str, Any]:
         """Coleta configurações do sistema."""
@@ -179,18 +336,9 @@ class QuantumBackupManager:
             "environment": {}
         }
         
-        # Coleta informações sobre diretórios
-        for dir_name in self.system_dirs:
-            dir_path = Path(dir_name)
-            if dir_path.exists():
-                file_count = len(list(dir_path.glob("**/*")))
-                configs["directories"][dir_name] = {
-                    "exists": True,
-                    "file_count": file_count,
-                    "size_bytes": sum(f.stat().st_size for f in dir_path.glob("**/*") if f.is_file())
-                }
-            else:
-                configs["directories"][dir_name] = {"exists": False}
+        # Coleta informações sobre diretórios (uma varredura por diretório,
+        # diretórios em paralelo)
+        configs["directories"] = collect_directories(self.system_dirs, exclude=self.config_excludes)
         
         # Coleta variáveis de ambiente seguras
         safe_env_vars = ["PATH", "PYTHONPATH", "LANG", "USER", "HOME"]
@@ -217,25 +365,12 @@ class QuantumBackupManager:
             }
         }
         
-        # Salva no arquivo MCP
-        with open(self.mcp_config_file, "w", encoding="utf-8") as f:
-            json.dump(mcp_data, f, indent=2, ensure_ascii=False)
-    
-    def _create_compressed_backup(self, compress_level: int = 9) -> Path:
-        """Cria arquivo comprimido do backup."""
-        logger.info(f"Criando arquivo comprimido com nível de compressão {compress_level}")
-        
-        zip_filename = f"quantum_backup_{self.timestamp}.zip"
-        zip_path = Path("backup") / zip_filename
-        
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compress_level) as zipf:
-            for root, _, files in os.walk(self.backup_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, self.backup_dir.parent)
-                    zipf.write(file_path, arcname)
-        
-        return zip_path
+        # Salva no arquivo MCP (arquivo temporário + rename, um job por vez)
+        with _mcp_lock:
+            tmp_path = self.mcp_config_file.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(mcp_data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.mcp_config_file)
     
     def _generate_documentation(self) -> Path:
         """Gera documentação do backup."""
@@ -275,6 +410,23 @@ class QuantumBackupManager:
         
         return doc_file
 
+def _run_backup_job(request: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """Executa um backup da fila de jobs (em uma thread do pool)."""
+    response = QuantumBackupManager(progress.job_id).create_backup(BackupRequest(**request), progress=progress)
+    if not response.success:
+        raise RuntimeError(response.message)
+    status_index.add_manifest(response.details["manifest"])
+    return jsonable_encoder(response)
+
+def get_backup_jobs() -> BackupJobQueue:
+    """Fila de jobs aberta no início da aplicação."""
+    if backup_jobs is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Fila de jobs de backup não inicializada"
+        )
+    return backup_jobs
+
 # Endpoints da API
 @app.get("/")
 async def root():
@@ -286,67 +438,90 @@ async def root():
         "timestamp": datetime.datetime.now().isoformat()
     }
 
-@app.post("/backup", response_model=BackupResponse)
+@app.post("/backup", response_model=BackupJob, status_code=status.HTTP_202_ACCEPTED)
 async def create_backup(
     request: BackupRequest,
-    background_tasks: BackgroundTasks
+    jobs: BackupJobQueue = Depends(get_backup_jobs)
 ):
     """
-    Cria um backup completo do sistema.
+    Enfileira um backup completo do sistema e retorna o job imediatamente.
     
     - **backup_name**: Nome personalizado para o backup (opcional)
     - **include_models**: Se deve incluir modelos de IA (padrão: True)
-    - **compress_level**: Nível de compressão do arquivo ZIP (1-9)
+    - **compress_level**: Nível de compressão do arquivo ZIP (1-9; sobrepõe o preset)
+    - **compression_preset**: fastest, fast, balanced (padrão) ou max
     - **store_in_mcp**: Se deve armazenar configurações no MCP (padrão: True)
+    
+    Acompanhe em GET /backup/jobs/{id}; o resultado do backup fica em `result`.
     """
     logger.info(f"Solicitação de backup recebida: {request}")
-    
-    # Cria instância do gerenciador de backup
-    backup_manager = QuantumBackupManager()
-    
-    # Executa backup
-    response = backup_manager.create_backup(request)
-    
-    if response.success:
-        return response
-    else:
+    if request.compression_preset not in COMPRESSION_PRESETS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=response.message
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"compression_preset deve ser um de: {', '.join(COMPRESSION_PRESETS)}"
         )
+    return jobs.submit(jsonable_encoder(request))
 
-@app.get("/backup/status")
-async def backup_status():
-    """Verifica o status dos backups existentes."""
-    backup_dir = Path("backup/quantum")
+@app.get("/backup/jobs", response_model=List[BackupJob])
+async def list_backup_jobs(
+    limit: int = 20,
+    job_status: Optional[str] = None,
+    jobs: BackupJobQueue = Depends(get_backup_jobs)
+):
+    """Lista os jobs de backup mais recentes."""
+    return jobs.list(limit, job_status)
+
+@app.get("/backup/jobs/{job_id}", response_model=BackupJob)
+async def get_backup_job(job_id: str, jobs: BackupJobQueue = Depends(get_backup_jobs)):
+    """Estado e progresso (arquivos e bytes) de um job de backup."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} não encontrado")
+    return job
+
+@app.delete("/backup/jobs/{job_id}", response_model=BackupJob)
+async def cancel_backup_job(job_id: str, jobs: BackupJobQueue = Depends(get_backup_jobs)):
+    """Cancela um job na fila ou em execução."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} não encontrado")
+    if job["status"] in FINAL_STATES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} já terminou ({job['status']})"
+        )
+    return jobs.cancel(job_id)
+
+@app.get("/backup/archives/{archive_name}")
+def download_backup_archive(archive_name: str):
+    """Baixa o zip de um backup em blocos, sem carregá-lo na memória."""
+    archive_path = Path("backup") / archive_name
+    if Path(archive_name).name != archive_name or archive_path.suffix != ".zip" or not archive_path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Arquivo {archive_name} não encontrado")
     
-    if not backup_dir.exists():
-        return {
-            "status": "no_backups",
-            "message": "Nenhum backup encontrado"
-        }
+    def chunks():
+        with open(archive_path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                yield chunk
     
-    backups = []
-    for item in backup_dir.glob("*"):
-        if item.is_dir() and "backup_" in item.name:
-            try:
-                doc_file = item / "BACKUP_DOCUMENTATION.md"
-                has_doc = doc_file.exists()
-                
-                backups.append({
-                    "name": item.name,
-                    "created_at": datetime.datetime.fromtimestamp(item.stat().st_ctime).isoformat(),
-                    "size_bytes": sum(f.stat().st_size for f in item.glob("**/*") if f.is_file()),
-                    "has_documentation": has_doc
-                })
-            except Exception as e:
-                logger.error(f"Erro ao processar backup {item.name}: {e}")
+    return StreamingResponse(
+        chunks(),
+        media_type="application/zip",
+        headers={
+            "Content-Length": str(archive_path.stat().st_size),
+            "Content-Disposition": f'attachment; filename="{archive_name}"'
+        }
+    )
+
+@app.get("/backup/status")
+async def backup_status():
+    """
+    Verifica o status dos backups existentes.
     
-    return {
-        "status": "success",
-        "count": len(backups),
-        "backups": sorted(backups, key=lambda x: x["created_at"], reverse=True)
-    }
+    Servido do índice em memória (manifestos de cada backup), sem
+    percorrer os diretórios; a reconciliação periódica corrige divergências.
+    """
+    return status_index.status()
 
 if __name__ == "__main__":
     import uvicorn
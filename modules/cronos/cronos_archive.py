@@ -0,0 +1,641 @@
+"""
+CRONOS Archive - Gravação Paralela de Arquivos ZIP
+==================================================
+
+Este módulo implementa o gravador de arquivos ZIP do CRONOS:
+- Membros comprimidos (deflate) em paralelo nos workers; só a gravação
+  sequencial no arquivo acontece na thread principal
+- Arquivos grandes divididos em blocos comprimidos de forma independente
+  (com os últimos 32KB do bloco anterior como dicionário) e concatenados
+  em um único fluxo deflate, como no pigz
+- Checksum (SHA-256, BLAKE2b ou MD5) calculado enquanto os bytes são
+  gravados, sem uma segunda leitura do arquivo
+- Índice dos membros (offset, tamanhos, CRC e hash do conteúdo) gravado
+  ao lado do arquivo, para extrair membros isolados direto do offset;
+  entradas do índice podem referenciar membros de outro arquivo
+  (backups incrementais)
+
+O resultado é um ZIP padrão (com ZIP64 quando necessário), legível por
+zipfile e por qualquer descompactador.
+
+Versão: 1.0.0
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import fnmatch
+import hashlib
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger("CRONOS")
+
+CHECKSUM_ALGORITHMS = ("sha256", "blake2b", "md5")
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB
+WINDOW_SIZE = 32 * 1024  # janela do deflate
+INDEX_VERSION = 1
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_END_RECORD64 = struct.Struct("<4sQ2H2L4Q")
+_END_LOCATOR64 = struct.Struct("<4sLQL")
+_DESCRIPTOR = struct.Struct("<4sLLL")
+_DESCRIPTOR64 = struct.Struct("<4sLQQ")
+
+
+def new_hasher(algorithm: str):
+    """
+    Cria o objeto de hash de um algoritmo suportado.
+
+    Args:
+        algorithm: "sha256", "blake2b" ou "md5" (backups antigos)
+
+    Returns:
+        Objeto hashlib
+    """
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValueError(f"Algoritmo de checksum não suportado: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+@dataclass
+class ArchiveMember:
+    """Membro gravado no arquivo."""
+    name: str
+    offset: int
+    compress_type: int
+    compress_size: int
+    file_size: int
+    crc: int
+    mtime: float
+    mode: int
+    flags: int = 0
+    digest: str = ""  # hash do conteúdo; vazio em arquivos sem índice próprio
+    ref: str = ""  # backup cujo arquivo guarda os dados (vazio: este arquivo)
+
+
+@dataclass
+class ArchiveResult:
+    """Resultado da gravação de um arquivo."""
+    size_bytes: int
+    checksum: str
+    checksum_algorithm: str
+    members: List[ArchiveMember]
+    failed: Dict[str, str] = field(default_factory=dict)  # membro -> erro (fora do arquivo)
+
+
+class _HashingWriter:
+    """Grava em um arquivo e atualiza o checksum com os mesmos bytes."""
+
+    def __init__(self, f: BinaryIO, hasher):
+        self._f = f
+        self.hasher = hasher
+        self.offset = 0
+
+    def write(self, data: bytes):
+        self._f.write(data)
+        self.hasher.update(data)
+        self.offset += len(data)
+
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    tm = time.localtime(mtime)
+    if tm.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (
+        (tm.tm_hour << 11) | (tm.tm_min << 5) | (tm.tm_sec // 2),
+        ((tm.tm_year - 1980) << 9) | (tm.tm_mon << 5) | tm.tm_mday
+    )
+
+
+def _deflate(data: bytes, level: int, zdict: Optional[bytes], final: bool) -> bytes:
+    # Deflate bruto (wbits -15), como o ZIP espera. Um bloco não final
+    # termina com Z_SYNC_FLUSH, alinhado em byte, para que o próximo possa
+    # ser concatenado mesmo vindo de outro compressor
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 9)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelZipWriter:
+    """Gravador de ZIP com compressão paralela e checksum em linha."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_workers: Optional[int] = None,
+        compression_level: int = 6,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        checksum_algorithm: str = "sha256",
+        opener: Callable[[Path, str], BinaryIO] = open
+    ):
+        """
+        Abre o arquivo de destino.
+
+        Args:
+            path: Arquivo ZIP a criar
+            max_workers: Threads de compressão (cpu_count se None)
+            compression_level: Nível do deflate (1-9)
+            chunk_size: Tamanho dos blocos comprimidos em paralelo
+            checksum_algorithm: Algoritmo do checksum do arquivo
+            opener: Abre arquivos (ex.: IOScheduler.open)
+        """
+        self.path = Path(path)
+        self.compression_level = compression_level
+        self.chunk_size = chunk_size
+        self.checksum_algorithm = checksum_algorithm
+        self.members: List[ArchiveMember] = []
+        self.failed: Dict[str, str] = {}
+
+        self._opener = opener
+        self._workers = max_workers or os.cpu_count() or 4
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._file = opener(self.path, "wb")
+        self._out = _HashingWriter(self._file, new_hasher(checksum_algorithm))
+        # Membros na ordem de gravação, cada um com seus blocos pendentes
+        self._pending: Deque[Tuple[Tuple, List[Future]]] = deque()
+        self._in_flight = 0
+        self._closed = False
+
+    def __enter__(self) -> "ParallelZipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _compress_whole(self, path: Path) -> Tuple[int, int, int, str, bytes]:
+        # Arquivo pequeno: leitura, CRC, hash e compressão inteiros no worker
+        with self._opener(path, "rb") as f:
+            data = f.read()
+        digest = new_hasher(self.checksum_algorithm)
+        digest.update(data)
+        compressed = _deflate(data, self.compression_level, None, True)
+        if len(compressed) >= len(data):
+            return _ZIP_STORED, len(data), zlib.crc32(data), digest.hexdigest(), data
+        return _ZIP_DEFLATED, len(data), zlib.crc32(data), digest.hexdigest(), compressed
+
+    def add_file(self, path: Union[str, Path], arcname: str):
+        """
+        Agenda um arquivo para o ZIP.
+
+        Erros de leitura só conhecidos depois (arquivos pequenos, lidos nos
+        workers) não interrompem o arquivo: o membro fica de fora e o erro
+        vai para `failed`.
+
+        Args:
+            path: Arquivo de origem
+            arcname: Nome do membro no ZIP
+
+        Raises:
+            OSError: O arquivo não pôde ser lido (o membro fica de fora)
+        """
+        path = Path(path)
+        st = path.stat()
+        meta = (arcname, st.st_mtime, st.st_mode)
+
+        if st.st_size <= self.chunk_size:
+            self._enqueue(("whole",) + meta, [self._executor.submit(self._compress_whole, path)])
+            return
+
+        # Arquivo grande: a thread principal lê e calcula o CRC em ordem;
+        # os blocos são comprimidos em paralelo
+        futures: List[Future] = []
+        state = {"crc": 0, "size": 0, "digest": new_hasher(self.checksum_algorithm), "reading": True}
+        self._enqueue(("chunked",) + meta + (state, st.st_size), futures)
+        tail = None
+        submitted = 0
+        try:
+            with self._opener(path, "rb") as f:
+                chunk = f.read(self.chunk_size)
+                while (chunk or not submitted) and "error" not in state:
+                    following = f.read(self.chunk_size) if chunk else b""
+                    state["crc"] = zlib.crc32(chunk, state["crc"])
+                    state["digest"].update(chunk)
+                    state["size"] += len(chunk)
+                    futures.append(self._executor.submit(
+                        _deflate, chunk, self.compression_level, tail, not following
+                    ))
+                    submitted += 1
+                    self._in_flight += 1
+                    tail = chunk[-WINDOW_SIZE:]
+                    chunk = following
+                    self._drain(self._workers * 4)
+        except OSError as e:
+            # Erro do próprio arquivo: descarta o membro e avisa quem chamou
+            state["error"] = str(e)
+            self._discard(futures)
+            raise
+        finally:
+            state["reading"] = False
+
+    def _enqueue(self, member: Tuple, futures: List[Future]):
+        self._pending.append((member, futures))
+        self._in_flight += len(futures)
+        self._drain(self._workers * 4)
+
+    def _drain(self, limit: int):
+        # Grava do início da fila, em ordem, enquanto houver mais blocos em
+        # voo que o limite (memória limitada a ~4 blocos por worker)
+        while self._pending and self._in_flight > limit:
+            member, futures = self._pending[0]
+            if member[0] == "chunked" and member[4]["reading"]:
+                # Membro ainda em leitura (sempre o último da fila): grava
+                # o próximo bloco sem finalizar o membro
+                self._write_blocks(member, futures, 1)
+                continue
+            self._pending.popleft()
+            self._write_member(member, futures)
+
+    def _local_header(self, name: bytes, flags: int, compress_type: int, mtime: float,
+                      crc: int, compress_size: int, file_size: int, zip64: bool) -> bytes:
+        dostime, dosdate = _dos_datetime(mtime)
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size)
+            compress_size = file_size = _ZIP64_LIMIT
+        version = 45 if zip64 else 20
+        return _LOCAL_HEADER.pack(
+            b"PK\003\004", version, 0, flags, compress_type, dostime, dosdate,
+            crc, compress_size, file_size, len(name), len(extra)
+        ) + name + extra
+
+    def _discard(self, futures: List[Future]):
+        # Blocos de um membro descartado: saem da conta dos que estão em voo
+        for future in futures:
+            future.cancel()
+        self._in_flight -= len(futures)
+        futures.clear()
+
+    def _skip(self, arcname: str, error: Exception):
+        # O membro não entra no diretório central; bytes dele já gravados
+        # ficam sem referência e o ZIP continua válido
+        self.failed[arcname] = str(error)
+        logger.error(f"Erro ao arquivar {arcname}; membro ignorado: {error}")
+
+    def _write_member(self, member: Tuple, futures: List[Future]):
+        if member[0] == "whole":
+            _, arcname, mtime, mode = member
+            try:
+                compress_type, size, crc, digest, data = futures[0].result()
+            except (OSError, zlib.error) as e:
+                self._skip(arcname, e)
+                return
+            finally:
+                self._in_flight -= 1
+            name, flags = self._encode_name(arcname)
+            offset = self._out.offset
+            self._out.write(self._local_header(
+                name, flags, compress_type, mtime, crc, len(data), size, False
+            ))
+            self._out.write(data)
+            self.members.append(ArchiveMember(
+                arcname, offset, compress_type, len(data), size, crc, mtime, mode, flags, digest
+            ))
+            return
+
+        self._write_blocks(member, futures)
+        if "error" not in member[4]:
+            self._finish_chunked(member)
+
+    def _write_blocks(self, member: Tuple, futures: List[Future], count: Optional[int] = None):
+        _, arcname, mtime, mode, state, expected = member
+        if "error" in state:
+            self._discard(futures)
+            return
+        if "offset" not in state:
+            name, flags = self._encode_name(arcname)
+            flags |= _FLAG_DATA_DESCRIPTOR
+            state.update({
+                "offset": self._out.offset,
+                "flags": flags,
+                "zip64": expected * 1.05 >= _ZIP64_LIMIT,
+                "compressed": 0
+            })
+            self._out.write(self._local_header(
+                name, flags, _ZIP_DEFLATED, mtime, 0, 0, 0, state["zip64"]
+            ))
+
+        # Blocos gravados saem da lista, que a leitura continua a estender
+        written = 0
+        while futures and (count is None or written < count):
+            try:
+                data = futures.pop(0).result()
+            except zlib.error as e:
+                state["error"] = str(e)
+                self._skip(arcname, e)
+                self._discard(futures)
+                return
+            finally:
+                self._in_flight -= 1
+            self._out.write(data)
+            state["compressed"] += len(data)
+            written += 1
+
+    def _finish_chunked(self, member: Tuple):
+        _, arcname, mtime, mode, state, _ = member
+        if state["size"] >= _ZIP64_LIMIT or state["compressed"] >= _ZIP64_LIMIT:
+            state["zip64"] = True
+        if state["zip64"]:
+            self._out.write(_DESCRIPTOR64.pack(
+                b"PK\007\010", state["crc"], state["compressed"], state["size"]
+            ))
+        else:
+            self._out.write(_DESCRIPTOR.pack(
+                b"PK\007\010", state["crc"], state["compressed"], state["size"]
+            ))
+        self.members.append(ArchiveMember(
+            arcname, state["offset"], _ZIP_DEFLATED, state["compressed"], state["size"],
+            state["crc"], mtime, mode, state["flags"], state["digest"].hexdigest()
+        ))
+
+    @staticmethod
+    def _encode_name(arcname: str) -> Tuple[bytes, int]:
+        arcname = arcname.replace(os.sep, "/")
+        try:
+            return arcname.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return arcname.encode("utf-8"), _FLAG_UTF8
+
+    def _write_central_directory(self):
+        start = self._out.offset
+        for member in self.members:
+            name, _ = self._encode_name(member.name)
+            dostime, dosdate = _dos_datetime(member.mtime)
+
+            fields = []
+            file_size, compress_size, offset = member.file_size, member.compress_size, member.offset
+            if file_size >= _ZIP64_LIMIT:
+                fields.append(file_size)
+                file_size = _ZIP64_LIMIT
+            if compress_size >= _ZIP64_LIMIT:
+                fields.append(compress_size)
+                compress_size = _ZIP64_LIMIT
+            if offset >= _ZIP64_LIMIT:
+                fields.append(offset)
+                offset = _ZIP64_LIMIT
+            extra = struct.pack(f"<HH{len(fields)}Q", 1, 8 * len(fields), *fields) if fields else b""
+            version = 45 if fields else 20
+
+            self._out.write(_CENTRAL_HEADER.pack(
+                b"PK\001\002", version, 3, version, 0, member.flags, member.compress_type,
+                dostime, dosdate, member.crc, compress_size, file_size,
+                len(name), len(extra), 0, 0, 0, (member.mode & 0xFFFF) << 16, offset
+            ))
+            self._out.write(name + extra)
+
+        size = self._out.offset - start
+        count = len(self.members)
+        if count >= 0xFFFF or size >= _ZIP64_LIMIT or start >= _ZIP64_LIMIT:
+            end64 = self._out.offset
+            self._out.write(_END_RECORD64.pack(
+                b"PK\006\006", 44, 45, 45, 0, 0, count, count, size, start
+            ))
+            self._out.write(_END_LOCATOR64.pack(b"PK\006\007", 0, end64, 1))
+        self._out.write(_END_RECORD.pack(
+            b"PK\005\006", 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+            min(size, _ZIP64_LIMIT), min(start, _ZIP64_LIMIT), 0
+        ))
+
+    def close(self) -> ArchiveResult:
+        """
+        Grava os membros pendentes e o diretório central.
+
+        Se a gravação falhar, o arquivo parcial é descartado (abort).
+
+        Returns:
+            Tamanho, checksum, membros e membros ignorados do arquivo
+        """
+        if not self._closed:
+            try:
+                while self._pending:
+                    self._write_member(*self._pending.popleft())
+                self._write_central_directory()
+                self._file.close()
+            except BaseException:
+                self.abort()
+                raise
+            # Fechado só com o diretório central gravado
+            self._closed = True
+            self._executor.shutdown(wait=True)
+
+        return ArchiveResult(
+            size_bytes=self._out.offset,
+            checksum=self._out.hasher.hexdigest(),
+            checksum_algorithm=self.checksum_algorithm,
+            members=self.members,
+            failed=dict(self.failed)
+        )
+
+    def abort(self):
+        """Descarta o arquivo parcial."""
+        if self._closed:
+            return
+        self._closed = True
+        for _, futures in self._pending:
+            for future in futures:
+                future.cancel()
+        self._executor.shutdown(wait=True)
+        try:
+            self._file.close()
+        finally:
+            self.path.unlink(missing_ok=True)
+
+
+def save_index(path: Union[str, Path], result: ArchiveResult, sources: Iterable[str] = ()):
+    """
+    Grava o índice dos membros de um arquivo.
+
+    Args:
+        path: Arquivo JSON do índice
+        result: Resultado de ParallelZipWriter.close()
+        sources: Caminhos de origem do backup
+    """
+    index = {
+        "version": INDEX_VERSION,
+        "size_bytes": result.size_bytes,
+        "checksum_algorithm": result.checksum_algorithm,
+        "sources": list(sources),
+        "members": [asdict(member) for member in result.members],
+    }
+    path = Path(path)
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(temp, path)
+
+
+def load_index(path: Union[str, Path]) -> Tuple[str, List[ArchiveMember]]:
+    """
+    Lê um índice gravado por save_index.
+
+    Returns:
+        Algoritmo dos hashes e membros do arquivo
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    names = {item.name for item in fields(ArchiveMember)}
+    members = [
+        ArchiveMember(**{key: value for key, value in member.items() if key in names})
+        for member in index["members"]
+    ]
+    return index["checksum_algorithm"], members
+
+
+def index_from_zip(zip_path: Union[str, Path], algorithm: str = "md5") -> ArchiveResult:
+    """
+    Monta o índice a partir do diretório central de um ZIP qualquer.
+
+    Usado para backups gravados antes do índice; os membros ficam sem
+    hash do conteúdo (a comparação usa o CRC-32).
+    """
+    zip_path = Path(zip_path)
+    with zipfile.ZipFile(zip_path) as zipf:
+        members = [
+            ArchiveMember(
+                name=info.filename,
+                offset=info.header_offset,
+                compress_type=info.compress_type,
+                compress_size=info.compress_size,
+                file_size=info.file_size,
+                crc=info.CRC,
+                mtime=time.mktime(info.date_time + (0, 0, -1)),
+                mode=info.external_attr >> 16,
+                flags=info.flag_bits
+            )
+            for info in zipf.infolist() if not info.is_dir()
+        ]
+    return ArchiveResult(zip_path.stat().st_size, "", algorithm, members)
+
+
+def select_members(members: List[ArchiveMember], patterns: Optional[Iterable[str]] = None) -> List[ArchiveMember]:
+    """
+    Filtra membros por nome, diretório ou glob.
+
+    Args:
+        members: Membros do índice
+        patterns: Ex.: "config/app.json", "config/", "*.json" (None = todos)
+
+    Returns:
+        Membros selecionados, na ordem do arquivo
+    """
+    if patterns is None:
+        return list(members)
+    patterns = [str(pattern).replace(os.sep, "/") for pattern in patterns]
+    selected = []
+    for member in members:
+        for pattern in patterns:
+            prefix = pattern.rstrip("/") + "/"
+            if member.name == pattern or member.name.startswith(prefix) or fnmatch.fnmatchcase(member.name, pattern):
+                selected.append(member)
+                break
+    return selected
+
+
+def file_digest(path: Path, algorithm: str, opener: Callable[[Path, str], BinaryIO] = open) -> str:
+    """Hash do conteúdo de um arquivo, no formato de ArchiveMember.digest."""
+    digest = new_hasher(algorithm)
+    with opener(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_matches(path: Path, member: ArchiveMember, algorithm: str,
+                 opener: Callable[[Path, str], BinaryIO] = open) -> bool:
+    """Verifica se um arquivo existente já tem o conteúdo do membro."""
+    try:
+        if path.stat().st_size != member.file_size:
+            return False
+    except OSError:
+        return False
+
+    if member.digest:
+        return file_digest(path, algorithm, opener) == member.digest
+    crc = 0
+    with opener(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc == member.crc
+
+
+def extract_member(archive: BinaryIO, member: ArchiveMember, target: Path, algorithm: str,
+                   opener: Callable[[Path, str], BinaryIO] = open):
+    """
+    Extrai um membro lendo direto do seu offset, sem abrir o ZIP inteiro.
+
+    O conteúdo vai para um arquivo temporário, é conferido (CRC-32 e hash
+    do índice) e só então substitui o destino.
+
+    Args:
+        archive: Arquivo ZIP aberto em modo binário
+        member: Membro do índice
+        target: Caminho de destino
+        algorithm: Algoritmo do hash do membro
+        opener: Abre o arquivo de destino (ex.: IOScheduler.open)
+    """
+    archive.seek(member.offset)
+    header = _LOCAL_HEADER.unpack(archive.read(_LOCAL_HEADER.size))
+    if header[0] != b"PK\003\004":
+        raise ValueError(f"Cabeçalho local inválido para {member.name}")
+    archive.seek(member.offset + _LOCAL_HEADER.size + header[-2] + header[-1])
+
+    if member.compress_type == _ZIP_DEFLATED:
+        decompressor = zlib.decompressobj(-15)
+    elif member.compress_type == _ZIP_STORED:
+        decompressor = None
+    else:
+        raise ValueError(f"Compressão não suportada em {member.name}: {member.compress_type}")
+
+    digest = new_hasher(algorithm) if member.digest else None
+    crc = 0
+    size = 0
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{target.name}.cronos-tmp")
+    try:
+        with opener(temp, "wb") as out:
+            remaining = member.compress_size
+            while remaining:
+                data = archive.read(min(DEFAULT_CHUNK_SIZE, remaining))
+                if not data:
+                    raise ValueError(f"Arquivo truncado em {member.name}")
+                remaining -= len(data)
+                if decompressor:
+                    data = decompressor.decompress(data)
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                if digest:
+                    digest.update(data)
+                out.write(data)
+
+        if crc != member.crc or size != member.file_size:
+            raise ValueError(f"CRC do membro {member.name} não corresponde")
+        if digest and digest.hexdigest() != member.digest:
+            raise ValueError(f"Hash do membro {member.name} não corresponde")
+
+        if member.mode & 0o777:
+            os.chmod(temp, member.mode & 0o777)
+        os.utime(temp, (member.mtime, member.mtime))
+        os.replace(temp, target)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
@@ -8,8 +8,10 @@ Este módulo implementa o núcleo do sistema CRONOS, responsável por:
 - Preservação da integridade estrutural
 - Logs universais de modificações
 - Restauração contextual de estados anteriores
+- Restauração parcial e no local original a partir do índice de membros
+- Backups incrementais que referenciam os membros inalterados de backups anteriores
 
-Versão: 3.0.0
+Versão: 3.1.0
 Consciência: 0.990
 Amor Incondicional: 0.995
 """
@@ -21,10 +23,25 @@ import shutil
 import logging
 import hashlib
 import datetime
-import zipfile
-from pathlib import Path
-from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Union, Any
+from pathlib import Path, PurePosixPath
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from typing import Dict, List, Optional, Union, Any, Tuple
+
+from modules.quantum.backup_catalog import BackupCatalog, CatalogEntry
+from modules.quantum.backup_scheduler import IOScheduler
+from modules.cronos.cronos_archive import (
+    ArchiveMember,
+    ParallelZipWriter,
+    extract_member,
+    file_digest,
+    file_matches,
+    index_from_zip,
+    load_index,
+    new_hasher,
+    save_index,
+    select_members,
+)
 
 # Configuração de logging
 logger = logging.getLogger("CRONOS")
@@ -43,6 +60,9 @@ class BackupMetadata:
     tags: List[str] = field(default_factory=list)
     consciousness_level: float = 0.990
     ethical_rating: float = 0.995
+    checksum_algorithm: str = "md5"  # backups anteriores ao 3.1.0 usam MD5
+    parent_id: Optional[str] = None  # backup de referência dos incrementais
+    references: List[str] = field(default_factory=list)  # backups cujos membros são referenciados
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte os metadados para um dicionário."""
@@ -61,14 +81,28 @@ class CronosSystem:
     preservação de dados, garantindo a integridade e evolução do sistema.
     """
     
-    def __init__(self):
-        """Inicializa o sistema CRONOS."""
-        self.version = "3.0.0"
+    def __init__(self,
+                 base_dir: Optional[Union[str, Path]] = None,
+                 checksum_algorithm: str = "sha256",
+                 max_workers: Optional[int] = None,
+                 compression_level: int = 6):
+        """
+        Inicializa o sistema CRONOS.
+        
+        Args:
+            base_dir: Raiz onde ficam data/backups (padrão: raiz do projeto)
+            checksum_algorithm: Checksum dos novos backups ("sha256" ou "blake2b")
+            max_workers: Threads de compressão (padrão: número de CPUs)
+            compression_level: Nível do deflate (1-9)
+        """
+        self.version = "3.1.0"
         self.consciousness_level = 0.990
         self.love_level = 0.995
         
         # Configuração de diretórios
-        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent
+        if base_dir is None:
+            base_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent
+        self.base_dir = Path(base_dir)
         self.data_dir = self.base_dir / "data"
         self.backups_dir = self.data_dir / "backups"
         self.metadata_dir = self.backups_dir / "metadata"
@@ -76,6 +110,19 @@ class CronosSystem:
         # Criar diretórios se não existirem
         self._ensure_directories()
         
+        # Catálogo SQLite dos metadados (reconstruível a partir dos JSON)
+        self.catalog = BackupCatalog(self.backups_dir / "catalog.db")
+        
+        # Sem orçamentos por padrão; quem roda backups em horário de uso
+        # substitui por IOScheduler(mb_per_s=..., iops=...)
+        self.io_scheduler = IOScheduler()
+        
+        # Compressão paralela e checksum calculado durante a gravação
+        new_hasher(checksum_algorithm)  # valida o algoritmo
+        self.checksum_algorithm = checksum_algorithm
+        self.max_workers = max_workers
+        self.compression_level = compression_level
+        
         # Carregar metadados existentes
         self.backups_metadata = self._load_backups_metadata()
         
@@ -87,24 +134,66 @@ class CronosSystem:
             directory.mkdir(exist_ok=True, parents=True)
     
     def _load_backups_metadata(self) -> Dict[str, BackupMetadata]:
-        """Carrega os metadados de todos os backups existentes."""
+        """
+        Carrega os metadados de todos os backups existentes.
+        
+        Os metadados vêm do catálogo; apenas arquivos JSON novos ou
+        alterados desde a última sincronização são abertos.
+        """
         metadata = {}
         
         if not self.metadata_dir.exists():
             return metadata
         
-        for file_path in self.metadata_dir.glob("*.json"):
+        self.catalog.sync(self.metadata_dir, self._catalog_entry)
+        
+        for data in self.catalog.list_backups():
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    backup_meta = BackupMetadata.from_dict(data)
-                    metadata[backup_meta.id] = backup_meta
+                backup_meta = BackupMetadata.from_dict(data)
+                metadata[backup_meta.id] = backup_meta
             except Exception as e:
-                logger.error(f"Erro ao carregar metadados de {file_path}: {e}")
+                logger.error(f"Erro ao carregar metadados de {data.get('id')}: {e}")
         
         logger.info(f"Carregados metadados de {len(metadata)} backups")
         return metadata
     
+    @staticmethod
+    def _catalog_entry(data: Dict[str, Any]) -> CatalogEntry:
+        """Converte os metadados de um backup em entrada do catálogo."""
+        return CatalogEntry(
+            id=data["id"],
+            timestamp=data["timestamp"],
+            day=data["timestamp"][:10],
+            type=data.get("type"),
+            total_size=data.get("size_bytes", 0),
+            stored_size=data.get("size_bytes", 0),
+            summary=data
+        )
+    
+    def rebuild_catalog(self) -> int:
+        """
+        Recria o catálogo a partir dos arquivos JSON de metadados.
+        
+        Returns:
+            Número de backups indexados
+        """
+        count = self.catalog.rebuild(self.metadata_dir, self._catalog_entry)
+        self.backups_metadata = self._load_backups_metadata()
+        return count
+    
+    def bytes_by_day(self, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Soma os bytes dos backups por dia.
+        
+        Args:
+            since: Primeiro dia (YYYY-MM-DD)
+            until: Último dia (YYYY-MM-DD)
+            
+        Returns:
+            Dia, número de backups e bytes armazenados
+        """
+        return self.catalog.bytes_by_day(since, until)
+    
     def _save_backup_metadata(self, metadata: BackupMetadata) -> None:
         """Salva os metadados de um backup."""
         file_path = self.metadata_dir / f"{metadata.id}.json"
@@ -112,6 +201,7 @@ class CronosSystem:
         try:
             with open(file_path, "w", encoding="utf-8") as f:
                 json.dump(metadata.to_dict(), f, indent=2, ensure_ascii=False)
+            self.catalog.add(self._catalog_entry(metadata.to_dict()), file_path)
             logger.info(f"Metadados do backup {metadata.id} salvos com sucesso")
         except Exception as e:
             logger.error(f"Erro ao salvar metadados do backup {metadata.id}: {e}")
@@ -122,17 +212,23 @@ class CronosSystem:
         random_suffix = hashlib.md5(os.urandom(8)).hexdigest()[:8]
         return f"backup_{timestamp}_{random_suffix}"
     
-    def _calculate_checksum(self, file_path: Union[str, Path]) -> str:
-        """Calcula o checksum de um arquivo."""
+    def _calculate_checksum(self, file_path: Union[str, Path], algorithm: str = "md5") -> str:
+        """
+        Calcula o checksum de um arquivo.
+        
+        Args:
+            file_path: Arquivo a verificar
+            algorithm: Algoritmo registrado nos metadados do backup
+        """
         file_path = Path(file_path)
         if not file_path.exists() or not file_path.is_file():
             raise ValueError(f"Arquivo não encontrado: {file_path}")
         
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        hasher = new_hasher(algorithm)
+        with self.io_scheduler.open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
     
     def create_backup(self, 
                      source_paths: List[Union[str, Path]], 
@@ -148,12 +244,29 @@ class CronosSystem:
             backup_type: Tipo de backup ('full', 'incremental', 'quantum')
             tags: Tags para categorizar o backup
             
+        No tipo 'incremental', arquivos cujo conteúdo já está no backup
+        anterior das mesmas origens entram no índice como referência ao
+        membro existente; o zip recebe só os arquivos novos ou alterados.
+            
         Returns:
             ID do backup criado ou None em caso de falha
         """
         if tags is None:
             tags = []
         
+        source_paths_str = [str(Path(source_path)) for source_path in source_paths]
+        parent = None
+        by_name: Dict[str, ArchiveMember] = {}
+        by_digest: Dict[str, ArchiveMember] = {}
+        if backup_type == "incremental":
+            parent = self._find_parent(source_paths_str)
+            if parent is None:
+                logger.info("Nenhum backup anterior das mesmas origens; incremental gravará todos os arquivos")
+            else:
+                by_name, by_digest = self._reference_table(parent)
+        sizes = {member.file_size for member in by_digest.values()}
+        references: List[ArchiveMember] = []
+        
         backup_id = self._generate_backup_id()
         timestamp = datetime.datetime.now().isoformat()
         target_dir = self.backups_dir / backup_id
@@ -163,30 +276,58 @@ class CronosSystem:
         zip_path = target_dir / f"{backup_id}.zip"
         
         try:
-            # Criar o arquivo zip
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                source_paths_str = []
+            # Criar o arquivo zip (membros comprimidos em paralelo e
+            # checksum calculado enquanto o arquivo é gravado)
+            with ParallelZipWriter(
+                zip_path,
+                max_workers=self.max_workers,
+                compression_level=self.compression_level,
+                checksum_algorithm=self.checksum_algorithm,
+                opener=self.io_scheduler.open
+            ) as writer:
+                def add(file_path: Path, arcname: str):
+                    # Inalterado (mesmo tamanho e data) ou mesmo conteúdo de
+                    # um membro anterior: referência em vez de nova cópia
+                    st = file_path.stat()
+                    previous = by_name.get(arcname)
+                    if previous and previous.file_size == st.st_size and previous.mtime == st.st_mtime:
+                        references.append(replace(previous, name=arcname, mode=st.st_mode))
+                        return
+                    if st.st_size in sizes:
+                        match = by_digest.get(file_digest(file_path, self.checksum_algorithm, self.io_scheduler.open))
+                        if match and match.file_size == st.st_size:
+                            references.append(replace(match, name=arcname, mtime=st.st_mtime, mode=st.st_mode))
+                            return
+                    writer.add_file(file_path, arcname)
                 
                 for source_path in source_paths:
                     source_path = Path(source_path)
-                    source_paths_str.append(str(source_path))
                     
                     if not source_path.exists():
                         logger.warning(f"Caminho não encontrado: {source_path}")
                         continue
                     
                     if source_path.is_file():
-                        zipf.write(source_path, arcname=source_path.name)
+                        add(source_path, source_path.name)
                     elif source_path.is_dir():
                         for root, _, files in os.walk(source_path):
                             for file in files:
                                 file_path = Path(root) / file
                                 arcname = file_path.relative_to(source_path.parent)
-                                zipf.write(file_path, arcname=str(arcname))
+                                add(file_path, arcname.as_posix())
+                
+                result = writer.close()
             
-            # Calcular tamanho e checksum
-            size_bytes = zip_path.stat().st_size
-            checksum = self._calculate_checksum(zip_path)
+            # Índice dos membros ao lado do zip (restauração parcial); as
+            # referências apontam direto para o backup que guarda os dados
+            save_index(
+                self._index_path(backup_id, zip_path),
+                replace(result, members=result.members + references),
+                source_paths_str
+            )
+            
+            size_bytes = result.size_bytes
+            checksum = result.checksum
             
             # Criar e salvar metadados
             metadata = BackupMetadata(
@@ -200,13 +341,19 @@ class CronosSystem:
                 checksum=checksum,
                 tags=tags,
                 consciousness_level=self.consciousness_level,
-                ethical_rating=self.love_level
+                ethical_rating=self.love_level,
+                checksum_algorithm=result.checksum_algorithm,
+                parent_id=parent.id if parent else None,
+                references=sorted({member.ref for member in references})
             )
             
             self._save_backup_metadata(metadata)
             self.backups_metadata[backup_id] = metadata
             
-            logger.info(f"Backup {backup_id} criado com sucesso ({size_bytes/1024/1024:.2f} MB)")
+            logger.info(
+                f"Backup {backup_id} criado com sucesso ({size_bytes/1024/1024:.2f} MB, "
+                f"{len(result.members)} arquivos gravados, {len(references)} referências)"
+            )
             return backup_id
             
         except Exception as e:
@@ -218,13 +365,129 @@ class CronosSystem:
                 shutil.rmtree(target_dir)
             return None
     
-    def restore_backup(self, backup_id: str, target_dir: Optional[Union[str, Path]] = None) -> bool:
+    @staticmethod
+    def _index_path(backup_id: str, zip_path: Union[str, Path]) -> Path:
+        """Caminho do índice de membros de um backup."""
+        return Path(zip_path).with_name(f"{backup_id}.index.json")
+    
+    def _load_index(self, metadata: BackupMetadata) -> Tuple[str, List[ArchiveMember]]:
+        """
+        Carrega o índice de membros de um backup.
+        
+        Backups anteriores ao índice têm o índice montado a partir do
+        diretório central do zip e gravado para as próximas consultas.
+        
+        Returns:
+            Algoritmo dos hashes dos membros e lista de membros
+        """
+        index_path = self._index_path(metadata.id, metadata.target_path)
+        if index_path.exists():
+            return load_index(index_path)
+        
+        result = index_from_zip(metadata.target_path, metadata.checksum_algorithm)
+        try:
+            save_index(index_path, result, metadata.source_paths)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o índice de {metadata.id}: {e}")
+        return result.checksum_algorithm, result.members
+    
+    def _find_parent(self, source_paths: List[str]) -> Optional[BackupMetadata]:
+        """Backup mais recente das mesmas origens, base de um incremental."""
+        candidates = [
+            meta for meta in self.backups_metadata.values()
+            if sorted(meta.source_paths) == sorted(source_paths)
+            and meta.checksum_algorithm == self.checksum_algorithm
+            and Path(meta.target_path).exists()
+        ]
+        return max(candidates, key=lambda meta: meta.timestamp, default=None)
+    
+    def _reference_table(self, parent: BackupMetadata) -> Tuple[Dict[str, ArchiveMember], Dict[str, ArchiveMember]]:
+        """
+        Membros do backup anterior que podem ser referenciados.
+        
+        Returns:
+            Membros por nome e por hash do conteúdo, já apontando para o
+            backup que guarda os dados
+        """
+        algorithm, members = self._load_index(parent)
+        by_name = {}
+        by_digest = {}
+        if algorithm != self.checksum_algorithm:
+            return by_name, by_digest
+        for member in members:
+            # Membros sem hash (backups anteriores ao índice) não são referenciáveis
+            if not member.digest:
+                continue
+            if not member.ref:
+                member = replace(member, ref=parent.id)
+            by_name[member.name] = member
+            by_digest.setdefault(member.digest, member)
+        return by_name, by_digest
+    
+    def list_backup_files(self, backup_id: str, paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Lista os arquivos de um backup sem abrir o zip.
+        
+        Args:
+            backup_id: ID do backup
+            paths: Caminhos, diretórios ou globs a filtrar (ex.: "*.json")
+            
+        Returns:
+            Nome, tamanho, tamanho comprimido, data e hash de cada arquivo
+        """
+        if backup_id not in self.backups_metadata:
+            logger.error(f"Backup {backup_id} não encontrado")
+            return []
+        
+        _, members = self._load_index(self.backups_metadata[backup_id])
+        return [
+            {
+                "name": member.name,
+                "size": member.file_size,
+                "compressed_size": member.compress_size,
+                "mtime": datetime.datetime.fromtimestamp(member.mtime).isoformat(),
+                "digest": member.digest or None,
+                "stored_in": member.ref or backup_id
+            }
+            for member in select_members(members, paths)
+        ]
+    
+    @staticmethod
+    def _member_target(root: Path, name: str) -> Path:
+        """Destino de um membro sob `root`, recusando caminhos que escapem dele."""
+        parts = PurePosixPath(name).parts
+        if not parts or PurePosixPath(name).is_absolute() or ".." in parts:
+            raise ValueError(f"Caminho inseguro no backup: {name}")
+        return root.joinpath(*parts)
+    
+    @staticmethod
+    def _original_target(source_paths: List[str], name: str) -> Optional[Path]:
+        """Caminho original de um membro, a partir das origens do backup."""
+        first = PurePosixPath(name).parts[0]
+        for source in source_paths:
+            source = Path(source)
+            if source.name == first:
+                return CronosSystem._member_target(source.parent, name)
+        return None
+    
+    def restore_backup(self,
+                       backup_id: str,
+                       target_dir: Optional[Union[str, Path]] = None,
+                       paths: Optional[List[str]] = None,
+                       in_place: bool = False) -> bool:
         """
         Restaura um backup para o diretório especificado.
         
+        Os membros são lidos direto dos offsets do índice (no zip deste
+        backup ou, nas referências de um incremental, no zip do backup que
+        guarda os dados) e extraídos em paralelo; arquivos de destino que
+        já têm o mesmo conteúdo (hash do índice) são mantidos.
+        
         Args:
             backup_id: ID do backup a ser restaurado
             target_dir: Diretório de destino para a restauração (opcional)
+            paths: Caminhos, diretórios ou globs a restaurar (padrão: todos)
+            in_place: Restaurar para os caminhos originais
             
         Returns:
             True se a restauração foi bem-sucedida, False caso contrário
@@ -240,32 +503,67 @@ class CronosSystem:
             logger.error(f"Arquivo de backup não encontrado: {backup_path}")
             return False
         
-        # Se target_dir não for especificado, restaurar para os caminhos originais
-        if target_dir is None:
-            extract_dir = self.backups_dir / f"restore_{backup_id}"
-            extract_dir.mkdir(exist_ok=True)
-        else:
-            extract_dir = Path(target_dir)
+        # Sem target_dir (e fora do modo in_place), restaurar em um diretório próprio
+        extract_dir = None
+        if not in_place:
+            if target_dir is None:
+                extract_dir = self.backups_dir / f"restore_{backup_id}"
+            else:
+                extract_dir = Path(target_dir)
             extract_dir.mkdir(exist_ok=True, parents=True)
         
         try:
-            # Verificar checksum antes de restaurar
-            current_checksum = self._calculate_checksum(backup_path)
-            if current_checksum != metadata.checksum:
-                logger.error(f"Checksum do backup {backup_id} não corresponde. Possível corrupção.")
+            algorithm, members = self._load_index(metadata)
+            selected = select_members(members, paths)
+            if paths is not None and not selected:
+                logger.error(f"Nenhum arquivo do backup {backup_id} corresponde a {paths}")
                 return False
             
-            # Extrair o backup
-            with zipfile.ZipFile(backup_path, 'r') as zipf:
-                zipf.extractall(extract_dir)
+            # Zips envolvidos: o deste backup e os referenciados
+            archives = {backup_id: backup_path}
+            for ref in {member.ref for member in selected if member.ref}:
+                if ref not in self.backups_metadata or not Path(self.backups_metadata[ref].target_path).exists():
+                    logger.error(f"Backup referenciado {ref} não encontrado")
+                    return False
+                archives[ref] = Path(self.backups_metadata[ref].target_path)
             
-            logger.info(f"Backup {backup_id} restaurado com sucesso para {extract_dir}")
+            # A restauração completa confere o checksum dos arquivos inteiros;
+            # a parcial confia no CRC e no hash de cada membro extraído
+            if paths is None:
+                for archive_id, archive_path in archives.items():
+                    archive_meta = self.backups_metadata[archive_id]
+                    current_checksum = self._calculate_checksum(archive_path, archive_meta.checksum_algorithm)
+                    if current_checksum != archive_meta.checksum:
+                        logger.error(f"Checksum do backup {archive_id} não corresponde. Possível corrupção.")
+                        return False
             
-            # Se target_dir não foi especificado, mover arquivos para os caminhos originais
-            if target_dir is None:
-                # Implementação futura: restaurar para caminhos originais
-                pass
+            jobs = []
+            for member in selected:
+                if in_place:
+                    target = self._original_target(metadata.source_paths, member.name)
+                    if target is None:
+                        logger.warning(f"Origem de {member.name} desconhecida; arquivo ignorado")
+                        continue
+                else:
+                    target = self._member_target(extract_dir, member.name)
+                jobs.append((member, target))
+            
+            def restore(job: Tuple[ArchiveMember, Path]) -> bool:
+                member, target = job
+                if file_matches(target, member, algorithm, self.io_scheduler.open):
+                    return False
+                with self.io_scheduler.open(archives[member.ref or backup_id], "rb") as archive:
+                    extract_member(archive, member, target, algorithm, self.io_scheduler.open)
+                return True
             
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                restored = sum(executor.map(restore, jobs))
+            
+            destination = "os caminhos originais" if in_place else str(extract_dir)
+            logger.info(
+                f"Backup {backup_id} restaurado com sucesso para {destination} "
+                f"({restored} arquivos restaurados, {len(jobs) - restored} já atualizados)"
+            )
             return True
             
         except Exception as e:
@@ -326,6 +624,11 @@ class CronosSystem:
             logger.error(f"Backup {backup_id} não encontrado")
             return False
         
+        dependents = [meta.id for meta in self.backups_metadata.values() if backup_id in meta.references]
+        if dependents:
+            logger.error(f"Backup {backup_id} é referenciado por {', '.join(sorted(dependents))}; exclua-os antes")
+            return False
+        
         metadata = self.backups_metadata[backup_id]
         backup_path = Path(metadata.target_path)
         backup_dir = backup_path.parent
@@ -346,6 +649,7 @@ class CronosSystem:
             
             # Remover dos metadados carregados
             del self.backups_metadata[backup_id]
+            self.catalog.remove(backup_id)
             
             logger.info(f"Backup {backup_id} excluído com sucesso")
             return True
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Controle de Admissão do Adaptador de API
+Versão: 1.0.0 - Build 2025.03.20
+
+Este módulo limita quantas requisições do APIAdapter chegam aos
+provedores ao mesmo tempo. Cada rota cara pertence a uma classe de
+tráfego (moderação, geração, embeddings, quântica) com:
+- limite de requisições simultâneas
+- fila de espera limitada, com prazo máximo de espera
+- prioridade: quando há vaga no limite global, as filas das classes
+  mais prioritárias são atendidas primeiro
+
+Quando a fila da classe está cheia, a requisição é recusada na hora com
+429; quando o prazo de espera termina, com 503. As duas respostas trazem
+Retry-After estimado a partir do tempo médio de atendimento da classe.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger("api-adapter")
+
+
+@dataclass
+class TrafficClass:
+    """Limites de uma classe de tráfego (prioridade menor = atendida antes)."""
+    name: str
+    priority: int
+    max_concurrent: int
+    max_queue: int
+    queue_timeout: float
+
+
+DEFAULT_TRAFFIC_CLASSES = (
+    TrafficClass("moderation", priority=0, max_concurrent=8, max_queue=32, queue_timeout=2.0),
+    TrafficClass("generation", priority=1, max_concurrent=16, max_queue=64, queue_timeout=10.0),
+    TrafficClass("embeddings", priority=2, max_concurrent=8, max_queue=32, queue_timeout=10.0),
+    TrafficClass("quantum", priority=3, max_concurrent=4, max_queue=16, queue_timeout=5.0),
+)
+
+# Rotas controladas (caminho canônico do aiohttp -> classe); as demais passam direto
+DEFAULT_ROUTE_CLASSES = {
+    "/api/moderate": "moderation",
+    "/api/generate": "generation",
+    "/api/sessions/{session_id}/messages": "generation",
+    "/api/embeddings": "embeddings",
+    "/api/quantum/process": "quantum",
+    "/api/quantum/enhance": "quantum",
+}
+
+
+class AdmissionRejected(Exception):
+    """A requisição foi descartada pelo controle de admissão."""
+
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _ClassState:
+    """Estado de execução de uma classe de tráfego."""
+
+    def __init__(self, traffic: TrafficClass):
+        self.traffic = traffic
+        self.active = 0
+        self.waiters: "deque[asyncio.Future]" = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.avg_service = 0.0
+        self.avg_wait = 0.0
+
+    def has_capacity(self) -> bool:
+        return self.active < self.traffic.max_concurrent
+
+    def retry_after(self) -> int:
+        # Tempo para esvaziar a fila atual, com o atendimento médio observado
+        rounds = (len(self.waiters) + 1) / self.traffic.max_concurrent
+        return max(1, math.ceil(rounds * (self.avg_service or 1.0)))
+
+
+class AdmissionController:
+    """Limita a concorrência por classe de tráfego e descarta o excesso."""
+
+    def __init__(
+        self,
+        classes: Iterable[TrafficClass] = DEFAULT_TRAFFIC_CLASSES,
+        routes: Optional[Dict[str, str]] = None,
+        max_total: int = 32
+    ):
+        """
+        Args:
+            classes: Classes de tráfego
+            routes: Caminho canônico da rota -> nome da classe
+            max_total: Requisições controladas simultâneas, somando as classes
+        """
+        self.max_total = max_total
+        self.routes = dict(DEFAULT_ROUTE_CLASSES if routes is None else routes)
+        self._states = {traffic.name: _ClassState(traffic) for traffic in classes}
+        self._by_priority = sorted(self._states.values(), key=lambda state: state.traffic.priority)
+        self._active = 0
+
+    def classify(self, request: web.Request) -> Optional[str]:
+        """Classe de tráfego da requisição, ou None se não for controlada."""
+        if request.method == "OPTIONS":
+            return None
+        route = request.match_info.route
+        resource = route.resource if route is not None else None
+        return self.routes.get(resource.canonical) if resource is not None else None
+
+    def _can_admit(self, state: _ClassState) -> bool:
+        # Com vaga global sobrando, só espera quem está na fila da própria
+        # classe (ordem de chegada); a prioridade entre classes decide quem
+        # recebe as vagas globais liberadas em _dispatch
+        return state.has_capacity() and self._active < self.max_total and not state.waiters
+
+    def _admit(self, state: _ClassState):
+        state.active += 1
+        state.admitted += 1
+        self._active += 1
+
+    def _dispatch(self):
+        # Entrega as vagas livres às filas, da classe mais prioritária para a menos
+        for state in self._by_priority:
+            while state.waiters and state.has_capacity() and self._active < self.max_total:
+                waiter = state.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._admit(state)
+                waiter.set_result(True)
+
+    async def acquire(self, name: str):
+        """
+        Obtém uma vaga na classe, esperando na fila se preciso.
+
+        Raises:
+            AdmissionRejected: 429 se a fila estiver cheia, 503 se o prazo expirar
+        """
+        state = self._states[name]
+        if self._can_admit(state):
+            self._admit(state)
+            return
+
+        if len(state.waiters) >= state.traffic.max_queue:
+            state.shed_queue_full += 1
+            raise AdmissionRejected(429, f"Fila de {name} cheia", state.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        state.queued += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), state.traffic.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                state.waiters.remove(waiter)
+                state.shed_timeout += 1
+                raise AdmissionRejected(503, f"Tempo de espera de {name} esgotado", state.retry_after())
+        except asyncio.CancelledError:
+            # Cliente desistiu: devolve a vaga se ela já tinha sido entregue
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)
+            else:
+                waiter.cancel()
+                if waiter in state.waiters:
+                    state.waiters.remove(waiter)
+            raise
+        state.avg_wait = 0.9 * state.avg_wait + 0.1 * (time.monotonic() - start)
+
+    def release(self, name: str, service_time: Optional[float] = None):
+        """Devolve a vaga e a entrega ao próximo da fila."""
+        state = self._states[name]
+        state.active -= 1
+        self._active -= 1
+        if service_time is not None:
+            state.avg_service = (
+                service_time if not state.avg_service
+                else 0.9 * state.avg_service + 0.1 * service_time
+            )
+        self._dispatch()
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        """Middleware aiohttp que aplica o controle às rotas classificadas."""
+        name = self.classify(request)
+        if name is None:
+            return await handler(request)
+
+        try:
+            await self.acquire(name)
+        except AdmissionRejected as e:
+            logger.warning(f"Requisição descartada ({e.status}): {e.reason}")
+            return web.json_response(
+                {"error": e.reason, "traffic_class": name, "retry_after": e.retry_after},
+                status=e.status,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+
+        start = time.monotonic()
+        try:
+            return await handler(request)
+        finally:
+            self.release(name, time.monotonic() - start)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Ocupação, filas e descartes por classe."""
+        classes = {}
+        for state in self._by_priority:
+            classes[state.traffic.name] = {
+                "priority": state.traffic.priority,
+                "active": state.active,
+                "queue_depth": len(state.waiters),
+                "max_concurrent": state.traffic.max_concurrent,
+                "max_queue": state.traffic.max_queue,
+                "admitted": state.admitted,
+                "queued": state.queued,
+                "shed_queue_full": state.shed_queue_full,
+                "shed_timeout": state.shed_timeout,
+                "avg_wait_seconds": round(state.avg_wait, 4),
+                "avg_service_seconds": round(state.avg_service, 4),
+            }
+        return {
+            "active": self._active,
+            "max_total": self.max_total,
+            "queue_depth": sum(len(state.waiters) for state in self._by_priority),
+            "shed": sum(state.shed_queue_full + state.shed_timeout for state in self._by_priority),
+            "classes": classes,
+        }
@@ -16,7 +16,7 @@ import json
 import asyncio
 import uuid
 import time
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, Any, Optional, Union, Callable
 from pathlib import Path
 import os
 
@@ -25,6 +25,11 @@ import aiohttp_cors
 
 from .model_manager import ModelManager, ModelConfig
 from .quantum_bridge import QuantumBridge
+from .session_store import SessionStore, MemorySessionStore
+from .prompt_builder import PromptCache, get_counter
+from .admission import AdmissionController
+from .serialization import dumps, read_json, json_response, embeddings_response
+from .embedding_cache import EmbeddingCache
 
 # Instância do QuantumBridge para uso em toda a aplicação
 quantum_bridge = QuantumBridge()
@@ -40,25 +45,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger("api-adapter")
 
+def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """Codifica um server-sent event."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
 class APIAdapter:
     """Adaptador de API REST compatível com o padrão ElizaOS."""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 3000):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 3000,
+        session_store: Optional[SessionStore] = None,
+        sweep_interval: float = 60.0,
+        admission: Optional[AdmissionController] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        warm_up: bool = True
+    ):
         """
         Inicializa o adaptador de API.
         
         Args:
             host: Host para o servidor
             port: Porta para o servidor
+            session_store: Armazenamento das sessões (padrão: em memória)
+            sweep_interval: Intervalo da varredura de sessões expiradas (segundos)
+            admission: Controle de admissão das rotas caras (padrão: limites de DEFAULT_TRAFFIC_CLASSES)
+            embedding_cache: Cache de embeddings (padrão: memória + data/embedding_cache.db)
+            warm_up: Abre conexões com as APIs dos provedores ao iniciar
         """
         self.host = host
         self.port = port
-        self.app = web.Application()
-        self.model_manager = ModelManager()
-        self.sessions = {}
+        self.logger = logging.getLogger("api-adapter")
+        self.admission = admission or AdmissionController()
+        self.app = web.Application(middlewares=[self.admission.middleware])
+        self.model_manager = ModelManager(embedding_cache=embedding_cache)
+        self.sessions = session_store or MemorySessionStore()
+        self.prompt_cache = PromptCache(max_entries=self.sessions.max_sessions)
+        self.sweep_interval = sweep_interval
+        self._sweeper: Optional[asyncio.Task] = None
+        self.warm_up = warm_up
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self.app.on_startup.append(self._start_sweeper)
+        self.app.on_startup.append(self._start_warm_up)
+        self.app.on_cleanup.append(self._stop_sweeper)
+        self.app.on_cleanup.append(self._close_models)
         self.setup_routes()
         self.setup_cors()
-        self.logger = logging.getLogger("api-adapter")
         self.logger.info(f"Adaptador de API inicializado em {host}:{port}")
     
     def setup_routes(self):
@@ -70,6 +103,10 @@ class APIAdapter:
         
         # Rotas de sessão
         self.app.router.add_post("/api/sessions", self.handle_create_session)
+        self.app.router.add_get("/api/metrics/sessions", self.handle_session_metrics)
+        self.app.router.add_get("/api/metrics/admission", self.handle_admission_metrics)
+        self.app.router.add_get("/api/metrics/embeddings", self.handle_embedding_metrics)
+        self.app.router.add_get("/api/metrics/http", self.handle_http_metrics)
         self.app.router.add_get("/api/sessions/{session_id}", self.handle_get_session)
         self.app.router.add_delete("/api/sessions/{session_id}", self.handle_delete_session)
         
@@ -116,9 +153,40 @@ class APIAdapter:
         self.logger.info(f"Servidor da API iniciado em http://{self.host}:{self.port}")
         return site
     
+    async def _start_sweeper(self, app):
+        """Inicia a varredura periódica das sessões expiradas."""
+        self._sweeper = asyncio.create_task(self.sessions.run_sweeper(self.sweep_interval))
+    
+    async def _stop_sweeper(self, app):
+        """Para a varredura e fecha o armazenamento de sessões."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        self.sessions.close()
+    
+    async def _start_warm_up(self, app):
+        """Aquece o pool HTTP em segundo plano, sem atrasar a inicialização."""
+        if self.warm_up:
+            self._warm_up_task = asyncio.create_task(self.model_manager.warm_up())
+    
+    async def _close_models(self, app):
+        """Fecha o pool HTTP dos provedores e o cache de embeddings."""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+            try:
+                await self._warm_up_task
+            except asyncio.CancelledError:
+                pass
+            self._warm_up_task = None
+        await self.model_manager.close()
+    
     async def handle_root(self, request):
         """Manipulador para a rota raiz."""
-        return web.json_response({
+        return json_response({
             "name": "EVA & GUARANI API",
             "version": "1.0.0",
             "description": "API REST para o sistema EVA & GUARANI, compatível com ElizaOS",
@@ -127,7 +195,7 @@ class APIAdapter:
     
     async def handle_info(self, request):
         """Manipulador para a rota de informações."""
-        return web.json_response({
+        return json_response({
             "name": "EVA & GUARANI API",
             "version": "1.0.0",
             "build": "2024.02.26",
@@ -139,9 +207,13 @@ class APIAdapter:
                 {"path": "/api/sessions", "method": "POST", "description": "Cria uma nova sessão"},
                 {"path": "/api/sessions/{session_id}", "method": "GET", "description": "Obtém informações de uma sessão"},
                 {"path": "/api/sessions/{session_id}", "method": "DELETE", "description": "Exclui uma sessão"},
-                {"path": "/api/generate", "method": "POST", "description": "Gera uma resposta sem sessão"},
-                {"path": "/api/sessions/{session_id}/messages", "method": "POST", "description": "Adiciona uma mensagem a uma sessão"},
-                {"path": "/api/embeddings", "method": "POST", "description": "Gera embeddings para um texto"},
+                {"path": "/api/metrics/sessions", "method": "GET", "description": "Métricas do armazenamento de sessões"},
+                {"path": "/api/metrics/admission", "method": "GET", "description": "Filas e descartes do controle de admissão"},
+                {"path": "/api/metrics/embeddings", "method": "GET", "description": "Acertos e economia do cache de embeddings"},
+                {"path": "/api/metrics/http", "method": "GET", "description": "Conexões criadas e reaproveitadas pelo pool HTTP"},
+                {"path": "/api/generate", "method": "POST", "description": "Gera uma resposta sem sessão (stream: true para SSE)"},
+                {"path": "/api/sessions/{session_id}/messages", "method": "POST", "description": "Adiciona uma mensagem a uma sessão (stream: true para SSE)"},
+                {"path": "/api/embeddings", "method": "POST", "description": "Gera embeddings para um texto ou uma lista de textos (Accept: application/octet-stream para float32)"},
                 {"path": "/api/moderate", "method": "POST", "description": "Modera um texto"},
                 {"path": "/api/quantum/process", "method": "POST", "description": "Processa dados com o processador quântico"},
                 {"path": "/api/quantum/enhance", "method": "POST", "description": "Aprimora uma resposta com processamento quântico"},
@@ -178,7 +250,7 @@ class APIAdapter:
                 }
             })
         
-        return web.json_response({
+        return json_response({
             "models": formatted_models,
             "default_model": self.model_manager.default_model
         })
@@ -186,9 +258,9 @@ class APIAdapter:
     async def handle_create_session(self, request):
         """Manipulador para a rota de criação de sessão."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Cria um ID de sessão
         session_id = str(uuid.uuid4())
@@ -198,71 +270,86 @@ class APIAdapter:
         
         # Verifica se o modelo existe
         if model_id not in self.model_manager.list_models():
-            return web.json_response({"error": f"Model {model_id} not found"}, status=404)
+            return json_response({"error": f"Model {model_id} not found"}, status=404)
         
-        # Cria a sessão
-        self.sessions[session_id] = {
+        # Cria a sessão, com as mensagens iniciais, se fornecidas
+        session = self.sessions.create({
             "id": session_id,
             "model": model_id,
             "created_at": time.time(),
-            "messages": [],
+            "messages": data.get("messages", []),
             "metadata": data.get("metadata", {})
-        }
-        
-        # Adiciona mensagens iniciais, se fornecidas
-        if "messages" in data:
-            self.sessions[session_id]["messages"] = data["messages"]
+        })
         
-        return web.json_response({
+        return json_response({
             "session_id": session_id,
             "model": model_id,
-            "created_at": self.sessions[session_id]["created_at"]
+            "created_at": session["created_at"]
         })
     
     async def handle_get_session(self, request):
         """Manipulador para a rota de obtenção de sessão."""
         session_id = request.match_info["session_id"]
         
-        # Verifica se a sessão existe
-        if session_id not in self.sessions:
-            return web.json_response({"error": f"Session {session_id} not found"}, status=404)
+        # Verifica se a sessão existe (ou se expirou)
+        session = self.sessions.get(session_id)
+        if session is None:
+            return json_response({"error": f"Session {session_id} not found"}, status=404)
         
-        return web.json_response(self.sessions[session_id])
+        return json_response(session)
     
     async def handle_delete_session(self, request):
         """Manipulador para a rota de exclusão de sessão."""
         session_id = request.match_info["session_id"]
         
-        # Verifica se a sessão existe
-        if session_id not in self.sessions:
-            return web.json_response({"error": f"Session {session_id} not found"}, status=404)
-        
-        # Remove a sessão
-        del self.sessions[session_id]
+        # Remove a sessão, se existir
+        self.prompt_cache.discard(session_id)
+        if not self.sessions.delete(session_id):
+            return json_response({"error": f"Session {session_id} not found"}, status=404)
         
-        return web.json_response({"success": True})
+        return json_response({"success": True})
+    
+    async def handle_session_metrics(self, request):
+        """Manipulador para a rota de métricas das sessões."""
+        return json_response(self.sessions.metrics())
+    
+    async def handle_admission_metrics(self, request):
+        """Manipulador para a rota de métricas do controle de admissão."""
+        return json_response(self.admission.metrics())
+    
+    async def handle_embedding_metrics(self, request):
+        """Manipulador para a rota de métricas do cache de embeddings."""
+        return json_response(self.model_manager.embedding_cache.metrics())
+    
+    async def handle_http_metrics(self, request):
+        """Manipulador para a rota de métricas do pool HTTP dos provedores."""
+        return json_response(self.model_manager.http.metrics())
     
     async def handle_generate(self, request):
         """Manipulador para a rota de geração sem sessão."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se o prompt foi fornecido
         if "prompt" not in data:
-            return web.json_response({"error": "Prompt is required"}, status=400)
+            return json_response({"error": "Prompt is required"}, status=400)
         
         # Obtém o modelo a ser usado
         model_id = data.get("model", self.model_manager.default_model)
         
         # Verifica se o modelo existe
         if model_id not in self.model_manager.list_models():
-            return web.json_response({"error": f"Model {model_id} not found"}, status=404)
+            return json_response({"error": f"Model {model_id} not found"}, status=404)
         
         # Obtém os parâmetros de geração
         params = data.get("parameters", {})
         
+        # Streaming (SSE): quantum_enhance não se aplica, pois precisa da resposta completa
+        if data.get("stream", False):
+            return await self._stream_generation(request, data["prompt"], model_id, params)
+        
         try:
             # Gera a resposta
             start_time = time.time()
@@ -277,7 +364,7 @@ class APIAdapter:
             if data.get("quantum_enhance", False):
                 response = await quantum_bridge.enhance_response(response, {})
             
-            return web.json_response({
+            return json_response({
                 "response": response,
                 "model": model_id,
                 "prompt": data["prompt"],
@@ -287,27 +374,24 @@ class APIAdapter:
             })
         except Exception as e:
             self.logger.error(f"Erro ao gerar resposta: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def handle_add_message(self, request):
         """Manipulador para a rota de adição de mensagem a uma sessão."""
         session_id = request.match_info["session_id"]
         
-        # Verifica se a sessão existe
-        if session_id not in self.sessions:
-            return web.json_response({"error": f"Session {session_id} not found"}, status=404)
+        # Verifica se a sessão existe (ou se expirou)
+        if self.sessions.get(session_id) is None:
+            return json_response({"error": f"Session {session_id} not found"}, status=404)
         
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se a mensagem foi fornecida
         if "content" not in data:
-            return web.json_response({"error": "Message content is required"}, status=400)
-        
-        # Obtém a sessão
-        session = self.sessions[session_id]
+            return json_response({"error": "Message content is required"}, status=400)
         
         # Cria a mensagem
         message = {
@@ -318,17 +402,46 @@ class APIAdapter:
         }
         
         # Adiciona a mensagem à sessão
-        session["messages"].append(message)
+        session = self.sessions.append_message(session_id, message)
+        if session is None:
+            return json_response({"error": f"Session {session_id} not found"}, status=404)
         
         # Se a mensagem for do usuário, gera uma resposta do assistente
         if message["role"] == "user":
             try:
-                # Constrói o prompt com base no histórico de mensagens
-                prompt = self._build_prompt_from_messages(session["messages"])
+                # Atualiza o prompt da sessão com as mensagens novas
+                builder = self.prompt_cache.get(session_id, self._model_config(session["model"]))
+                prompt = builder.sync(session["messages"])
                 
                 # Obtém os parâmetros de geração
                 params = data.get("parameters", {})
                 
+                # Streaming (SSE): a resposta é salva na sessão ao final
+                if data.get("stream", False):
+                    def store_reply(text: str, processing_time: float) -> Dict[str, Any]:
+                        assistant_message = {
+                            "id": str(uuid.uuid4()),
+                            "role": "assistant",
+                            "content": text,
+                            "created_at": time.time(),
+                            "processing_time": processing_time
+                        }
+                        self.sessions.append_message(session_id, assistant_message)
+                        return {
+                            "message": message,
+                            "response": assistant_message,
+                            "session_id": session_id,
+                            "context": {
+                                "prompt_tokens": builder.tokens,
+                                "token_budget": builder.budget,
+                                "omitted_messages": builder.omitted
+                            }
+                        }
+                    
+                    return await self._stream_generation(
+                        request, prompt, session["model"], params, on_complete=store_reply
+                    )
+                
                 # Gera a resposta
                 start_time = time.time()
                 response = await self.model_manager.generate_response(
@@ -352,67 +465,170 @@ class APIAdapter:
                 }
                 
                 # Adiciona a mensagem de resposta à sessão
-                session["messages"].append(assistant_message)
+                self.sessions.append_message(session_id, assistant_message)
                 
-                return web.json_response({
+                return json_response({
                     "message": message,
                     "response": assistant_message,
-                    "session_id": session_id
+                    "session_id": session_id,
+                    "context": {
+                        "prompt_tokens": builder.tokens,
+                        "token_budget": builder.budget,
+                        "omitted_messages": builder.omitted
+                    }
                 })
             except Exception as e:
                 self.logger.error(f"Erro ao gerar resposta: {e}")
-                return web.json_response({"error": str(e)}, status=500)
+                return json_response({"error": str(e)}, status=500)
         
-        return web.json_response({
+        return json_response({
             "message": message,
             "session_id": session_id
         })
     
-    def _build_prompt_from_messages(self, messages: List[Dict[str, Any]]) -> str:
+    async def _stream_generation(
+        self,
+        request: web.Request,
+        prompt: str,
+        model_id: str,
+        params: Dict[str, Any],
+        on_complete: Optional[Callable[[str, float], Dict[str, Any]]] = None
+    ) -> web.StreamResponse:
         """
-        Constrói um prompt a partir de uma lista de mensagens.
+        Transmite a geração como server-sent events.
+        
+        Eventos: "token" a cada trecho do provedor, "usage" ao final (uso de
+        tokens e tempo de geração) e "error" se o provedor falhar. Cada
+        trecho só é lido do provedor depois que o anterior foi entregue ao
+        cliente (backpressure); se o cliente desconectar, a requisição ao
+        provedor é cancelada.
         
         Args:
-            messages: Lista de mensagens
+            request: Requisição do cliente
+            prompt: Texto de entrada
+            model_id: Identificador do modelo
+            params: Parâmetros de geração
+            on_complete: Chamado com o texto completo e o tempo de geração;
+                o dicionário retornado é incluído no evento "usage"
             
         Returns:
-            Prompt construído
+            Resposta em streaming (já enviada)
         """
-        prompt = ""
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
         
-        for message in messages:
-            role = message["role"]
-            content = message["content"]
+        stream = self.model_manager.generate_stream(prompt, model_id=model_id, **params)
+        parts = []
+        usage = None
+        start_time = time.time()
+        try:
+            async for chunk in stream:
+                if request.transport is None or request.transport.is_closing():
+                    raise ConnectionResetError("Cliente desconectado")
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.text:
+                    parts.append(chunk.text)
+                    await response.write(_sse_event("token", {"text": chunk.text}))
             
-            if role == "system":
-                prompt += f"[Sistema]: {content}\n\n"
-            elif role == "user":
-                prompt += f"[Usuário]: {content}\n\n"
-            elif role == "assistant":
-                prompt += f"[Assistente]: {content}\n\n"
+            text = "".join(parts)
+            processing_time = time.time() - start_time
+            final = {
+                "model": model_id,
+                "usage": usage or self._estimate_usage(model_id, prompt, text),
+                "processing_time": processing_time
+            }
+            if on_complete is not None:
+                final.update(on_complete(text, processing_time))
+            await response.write(_sse_event("usage", final))
+        except ConnectionResetError:
+            self.logger.info("Cliente desconectou durante o streaming; requisição ao provedor cancelada")
+        except Exception as e:
+            self.logger.error(f"Erro no streaming da resposta: {e}")
+            try:
+                await response.write(_sse_event("error", {"error": str(e)}))
+            except ConnectionResetError:
+                pass
+        finally:
+            await stream.aclose()
         
-        # Adiciona o prefixo para a resposta do assistente
-        prompt += "[Assistente]: "
+        return response
+    
+    def _estimate_usage(self, model_id: str, prompt: str, text: str) -> Dict[str, Any]:
+        """Uso de tokens estimado, para provedores que não o informam."""
+        config = self._model_config(model_id)
+        counter = get_counter((config.model_name or config.name) if config else "")
+        prompt_tokens = counter.count(prompt)
+        completion_tokens = counter.count(text)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "estimated": True
+        }
+    
+    def _model_config(self, model_id: str) -> Optional[ModelConfig]:
+        """
+        Configuração de um modelo registrado.
         
-        return prompt
+        Args:
+            model_id: ID do modelo
+            
+        Returns:
+            Configuração ou None se o modelo não estiver carregado
+        """
+        model = self.model_manager.get_model(model_id)
+        return model.config if model is not None else None
     
     async def handle_embeddings(self, request):
         """Manipulador para a rota de geração de embeddings."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se o texto foi fornecido
         if "text" not in data:
-            return web.json_response({"error": "Text is required"}, status=400)
+            return json_response({"error": "Text is required"}, status=400)
         
         # Obtém o modelo a ser usado
         model_id = data.get("model", self.model_manager.default_model)
         
         # Verifica se o modelo existe
         if model_id not in self.model_manager.list_models():
-            return web.json_response({"error": f"Model {model_id} not found"}, status=404)
+            return json_response({"error": f"Model {model_id} not found"}, status=404)
+        
+        # Lista de textos: embeddings em lote, na ordem de entrada
+        if isinstance(data["text"], list):
+            texts = data["text"]
+            if not all(isinstance(text, str) for text in texts):
+                return json_response({"error": "Text must be a string or a list of strings"}, status=400)
+            
+            try:
+                start_time = time.time()
+                embeddings = await self.model_manager.generate_embeddings(
+                    texts,
+                    model_id=model_id,
+                    **data.get("parameters", {})
+                )
+                end_time = time.time()
+                if embeddings is None:
+                    return json_response({"error": "Failed to generate embeddings"}, status=500)
+                
+                return embeddings_response(request, {
+                    "model": model_id,
+                    "count": len(embeddings),
+                    "dimensions": len(embeddings[0]) if embeddings else 0,
+                    "generated_at": time.time(),
+                    "processing_time": end_time - start_time
+                }, embeddings, encoding_format=data.get("encoding_format", "float"))
+            except Exception as e:
+                self.logger.error(f"Erro ao gerar embeddings: {e}")
+                return json_response({"error": str(e)}, status=500)
         
         try:
             # Gera os embeddings
@@ -423,35 +639,34 @@ class APIAdapter:
             )
             end_time = time.time()
             
-            return web.json_response({
-                "embeddings": embeddings,
+            return embeddings_response(request, {
                 "model": model_id,
                 "text": data["text"],
                 "dimensions": len(embeddings),
                 "generated_at": time.time(),
                 "processing_time": end_time - start_time
-            })
+            }, [embeddings], single=True, encoding_format=data.get("encoding_format", "float"))
         except Exception as e:
             self.logger.error(f"Erro ao gerar embeddings: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def handle_moderate(self, request):
         """Manipulador para a rota de moderação de conteúdo."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se o texto foi fornecido
         if "text" not in data:
-            return web.json_response({"error": "Text is required"}, status=400)
+            return json_response({"error": "Text is required"}, status=400)
         
         # Obtém o modelo a ser usado
         model_id = data.get("model", self.model_manager.default_model)
         
         # Verifica se o modelo existe
         if model_id not in self.model_manager.list_models():
-            return web.json_response({"error": f"Model {model_id} not found"}, status=404)
+            return json_response({"error": f"Model {model_id} not found"}, status=404)
         
         try:
             # Modera o conteúdo
@@ -462,7 +677,7 @@ class APIAdapter:
             )
             end_time = time.time()
             
-            return web.json_response({
+            return json_response({
                 "result": result,
                 "model": model_id,
                 "text": data["text"],
@@ -471,18 +686,18 @@ class APIAdapter:
             })
         except Exception as e:
             self.logger.error(f"Erro ao moderar conteúdo: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def handle_quantum_process(self, request):
         """Manipulador para a rota de processamento quântico."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se os dados de entrada foram fornecidos
         if "input_data" not in data:
-            return web.json_response({"error": "Input data is required"}, status=400)
+            return json_response({"error": "Input data is required"}, status=400)
         
         # Obtém o módulo quântico a ser usado
         module = data.get("module", "quantum_master")
@@ -493,7 +708,7 @@ class APIAdapter:
             result = await quantum_bridge.process(data["input_data"], module)
             end_time = time.time()
             
-            return web.json_response({
+            return json_response({
                 "result": result,
                 "module": module,
                 "input_data": data["input_data"],
@@ -503,18 +718,18 @@ class APIAdapter:
             })
         except Exception as e:
             self.logger.error(f"Erro no processamento quântico: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def handle_quantum_enhance(self, request):
         """Manipulador para a rota de aprimoramento quântico."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except json.JSONDecodeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Verifica se a resposta foi fornecida
         if "response" not in data:
-            return web.json_response({"error": "Response is required"}, status=400)
+            return json_response({"error": "Response is required"}, status=400)
         
         # Obtém o contexto
         context = data.get("context", {})
@@ -525,7 +740,7 @@ class APIAdapter:
             enhanced_response = await quantum_bridge.enhance_response(data["response"], {})
             end_time = time.time()
             
-            return web.json_response({
+            return json_response({
                 "original_response": data["response"],
                 "enhanced_response": enhanced_response,
                 "context": context,
@@ -534,7 +749,7 @@ class APIAdapter:
             })
         except Exception as e:
             self.logger.error(f"Erro ao aprimorar resposta: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def handle_quantum_consciousness(self, request):
         """Manipulador para a rota de consciência quântica."""
@@ -542,13 +757,13 @@ class APIAdapter:
             # Obtém o nível de consciência
             consciousness_level = quantum_bridge.consciousness_level if hasattr(quantum_bridge, 'consciousness_level') else 0.98
             
-            return web.json_response({
+            return json_response({
                 "consciousness_level": consciousness_level,
                 "timestamp": time.time()
             })
         except Exception as e:
             self.logger.error(f"Erro ao obter nível de consciência: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
 
 async def start_api(host: str = "0.0.0.0", port: int = 3000):
     """
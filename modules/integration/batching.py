@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Lotes de Requisições aos Provedores
+Versão: 1.0.0 - Build 2025.03.19
+
+Utilitários para enviar muitos textos aos provedores de embeddings:
+divisão em lotes por quantidade de itens e por tokens, e execução
+concorrente com limite, mantendo a ordem dos resultados.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def split_batches(
+    texts: Sequence[str],
+    max_items: int,
+    max_tokens: int,
+    count_tokens: Callable[[str], int]
+) -> List[List[int]]:
+    """
+    Divide textos em lotes consecutivos.
+
+    Cada lote tem no máximo max_items textos e max_tokens tokens; um
+    texto que sozinho excede max_tokens vai em um lote próprio (o
+    provedor decide se o trunca ou recusa).
+
+    Args:
+        texts: Textos, na ordem de entrada
+        max_items: Itens por lote
+        max_tokens: Tokens por lote
+        count_tokens: Conta os tokens de um texto
+
+    Returns:
+        Índices dos textos de cada lote
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def gather_limited(factories: Sequence[Callable[[], Awaitable[T]]], limit: int) -> List[T]:
+    """
+    Executa corrotinas com no máximo `limit` em andamento.
+
+    Args:
+        factories: Funções que criam as corrotinas (criadas só ao iniciar)
+        limit: Máximo de corrotinas simultâneas
+
+    Returns:
+        Resultados na ordem de factories; a primeira exceção é propagada
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(factory: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await factory()
+
+    return list(await asyncio.gather(*(run(factory) for factory in factories)))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Cache de Embeddings
+Versão: 1.0.0 - Build 2025.03.22
+
+Este módulo evita pedir ao provedor embeddings de textos já vistos
+(descrições de persona, perguntas frequentes...). A chave é o modelo e
+o hash SHA-256 do texto normalizado (Unicode NFC, espaços colapsados).
+
+Há duas camadas:
+- memória: LRU limitado em bytes, com os vetores em float32 compacto
+- disco: SQLite (WAL), que sobrevive a reinícios e alimenta a memória
+
+As consultas são em lote: só os textos ausentes nas duas camadas vão ao
+provedor. Os vetores são guardados em float32; vetores totalmente nulos
+(devolvidos por provedores em caso de erro) não são guardados.
+"""
+
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .serialization import pack_float32, unpack_float32
+
+logger = logging.getLogger("✨quantum-models✨")
+
+# Parâmetros por consulta no SQLite (limite de variáveis)
+_SQL_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    last_hit REAL NOT NULL,
+    PRIMARY KEY (model, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_hit ON embeddings(last_hit);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Forma canônica do texto para a chave do cache."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> bytes:
+    """Hash SHA-256 do texto normalizado."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Cache de embeddings em duas camadas (memória LRU e SQLite)."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = "data/embedding_cache.db",
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_entries: int = 1_000_000
+    ):
+        """
+        Args:
+            path: Banco SQLite (None = somente memória)
+            max_memory_bytes: Bytes de vetores mantidos em memória
+            max_disk_entries: Vetores mantidos em disco; acima disso saem os menos usados
+        """
+        self.path = Path(path) if path else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "bytes_saved": 0,
+        }
+
+        self._db = None
+        self._disk_entries = 0
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        """Fecha o banco."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: Tuple[str, bytes], packed: bytes):
+        # Chamado com o lock
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = packed
+        self._memory_bytes += len(packed)
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Consulta vários textos de uma vez.
+
+        Args:
+            model: Chave do modelo de embeddings
+            texts: Textos
+
+        Returns:
+            Vetor de cada texto, ou None para os ausentes
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[bytes, bytes] = {}
+
+        with self._lock:
+            for digest in hashes:
+                packed = self._memory.get((model, digest))
+                if packed is not None:
+                    self._memory.move_to_end((model, digest))
+                    found[digest] = packed
+            in_memory = set(found)
+
+            missing = list({digest for digest in hashes if digest not in found})
+            if missing and self._db is not None:
+                now = time.time()
+                with self._db:
+                    for start in range(0, len(missing), _SQL_CHUNK):
+                        chunk = missing[start:start + _SQL_CHUNK]
+                        marks = ",".join("?" * len(chunk))
+                        rows = self._db.execute(
+                            f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                            (model, *chunk)
+                        ).fetchall()
+                        for digest, packed in rows:
+                            found[digest] = packed
+                            self._remember((model, digest), packed)
+                        if rows:
+                            self._db.execute(
+                                f"UPDATE embeddings SET last_hit = ? WHERE model = ? AND hash IN ({marks})",
+                                (now, model, *[digest for digest, _ in rows])
+                            )
+
+            results: List[Optional[List[float]]] = []
+            for text, digest in zip(texts, hashes):
+                packed = found.get(digest)
+                if packed is None:
+                    self._counters["misses"] += 1
+                    results.append(None)
+                    continue
+                self._counters["memory_hits" if digest in in_memory else "disk_hits"] += 1
+                # Texto que não foi enviado e vetor que não foi recebido
+                self._counters["bytes_saved"] += len(text.encode("utf-8")) + len(packed)
+                results.append(unpack_float32(packed))
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[List[float]]):
+        """
+        Guarda os vetores de vários textos.
+
+        Args:
+            model: Chave do modelo de embeddings
+            texts: Textos
+            vectors: Vetor de cada texto
+        """
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            if vector and any(vector):
+                entries[text_hash(text)] = pack_float32(vector)
+        if not entries:
+            return
+
+        with self._lock:
+            for digest, packed in entries.items():
+                self._remember((model, digest), packed)
+            self._counters["stored"] += len(entries)
+
+            if self._db is not None:
+                now = time.time()
+                with self._db:
+                    inserted = self._db.executemany(
+                        "INSERT OR IGNORE INTO embeddings (model, hash, vector, created_at, last_hit) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(model, digest, packed, now, now) for digest, packed in entries.items()]
+                    ).rowcount
+                    self._disk_entries += max(inserted, 0)
+                    excess = self._disk_entries - self.max_disk_entries
+                    if excess > 0:
+                        self._db.execute(
+                            "DELETE FROM embeddings WHERE (model, hash) IN "
+                            "(SELECT model, hash FROM embeddings ORDER BY last_hit LIMIT ?)",
+                            (excess,)
+                        )
+                        self._disk_entries -= excess
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Vetor de um texto, ou None."""
+        return self.get_many(model, [text])[0]
+
+    def put(self, model: str, text: str, vector: List[float]):
+        """Guarda o vetor de um texto."""
+        self.put_many(model, [text], [vector])
+
+    def metrics(self) -> Dict[str, Any]:
+        """Acertos, falhas, taxa de acerto e bytes economizados."""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+            memory_bytes = self._memory_bytes
+            disk_entries = self._disk_entries
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_bytes,
+            "disk_entries": disk_entries,
+            "persistent": self.path is not None,
+        }
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Pool HTTP Compartilhado dos Provedores
+Versão: 1.0.0 - Build 2025.03.23
+
+Este módulo mantém uma única aiohttp.ClientSession para todo o processo,
+usada por todos os provedores (OpenAI, Anthropic, Gemini). Assim as
+conexões TLS com cada API são reaproveitadas entre modelos e requisições,
+em vez de cada modelo abrir (e cada fallback recriar) o próprio pool.
+
+O conector tem:
+- limite total e por host de conexões simultâneas
+- keep-alive das conexões ociosas
+- cache de DNS com TTL
+
+Os cabeçalhos de autenticação são enviados por requisição (cada provedor
+tem os seus). Um TraceConfig conta conexões criadas e reaproveitadas,
+consultas de DNS e esperas por vaga no pool, para observar a rotatividade
+de conexões. O aquecimento abre conexões com os hosts dos provedores na
+inicialização; o fechamento é feito pelo ModelManager.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger("✨quantum-models✨")
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Limites do pool de conexões."""
+    limit: int = 100
+    limit_per_host: int = 16
+    keepalive_timeout: float = 60.0
+    ttl_dns_cache: int = 300
+    connect_timeout: float = 10.0
+    warmup_timeout: float = 5.0
+
+
+class HTTPClientRegistry:
+    """Sessão HTTP compartilhada pelo processo, com métricas de conexões."""
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        """
+        Args:
+            config: Limites do pool (padrão: HTTPPoolConfig())
+        """
+        self.config = config or HTTPPoolConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters = {
+            "sessions_created": 0,
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_queued": 0,
+            "dns_resolves": 0,
+            "dns_cache_hits": 0,
+            "warmup_connections": 0,
+            "warmup_errors": 0,
+        }
+        self._connect_seconds = 0.0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        counters = self._counters
+
+        def counter(name):
+            async def handler(session, context, params):
+                counters[name] += 1
+            return handler
+
+        async def connection_start(session, context, params):
+            context.connect_started = time.monotonic()
+
+        async def connection_end(session, context, params):
+            counters["connections_created"] += 1
+            self._connect_seconds += time.monotonic() - getattr(context, "connect_started", time.monotonic())
+
+        trace.on_request_start.append(counter("requests"))
+        trace.on_connection_create_start.append(connection_start)
+        trace.on_connection_create_end.append(connection_end)
+        trace.on_connection_reuseconn.append(counter("connections_reused"))
+        trace.on_connection_queued_start.append(counter("connections_queued"))
+        trace.on_dns_resolvehost_end.append(counter("dns_resolves"))
+        trace.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        return trace
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config.limit,
+            limit_per_host=self.config.limit_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+            ttl_dns_cache=self.config.ttl_dns_cache,
+        )
+        self._counters["sessions_created"] += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=300, connect=self.config.connect_timeout),
+            trace_configs=[self._trace_config()],
+        )
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Sessão compartilhada, criada no primeiro uso (uma por event loop)."""
+        # Criação síncrona: não há corrida entre corrotinas do mesmo loop.
+        # Sessões ficam presas ao loop em que foram criadas.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    async def warm_up(self, urls: Iterable[str], connections: int = 2) -> int:
+        """
+        Abre conexões com os hosts informados, que ficam no pool (keep-alive).
+
+        Args:
+            urls: URLs base dos provedores (uma por host basta)
+            connections: Conexões abertas por host
+
+        Returns:
+            Conexões estabelecidas
+        """
+        origins = {}
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme and parts.netloc:
+                origins[f"{parts.scheme}://{parts.netloc}"] = url
+        if not origins:
+            return 0
+
+        session = await self.session()
+        timeout = aiohttp.ClientTimeout(total=self.config.warmup_timeout)
+
+        async def touch(url: str) -> bool:
+            # Qualquer resposta (inclusive 401/404) deixa a conexão pronta no pool
+            try:
+                async with session.head(url, timeout=timeout, allow_redirects=False) as response:
+                    await response.read()
+                return True
+            except Exception as e:
+                logger.warning(f"Falha ao aquecer conexão com {url}: {e}")
+                return False
+
+        results = await asyncio.gather(*(
+            touch(url) for url in origins.values() for _ in range(max(1, connections))
+        ))
+        opened = sum(results)
+        self._counters["warmup_connections"] += opened
+        self._counters["warmup_errors"] += len(results) - opened
+        logger.info(f"Pool HTTP aquecido: {opened} conexões com {len(origins)} hosts")
+        return opened
+
+    async def close(self):
+        """Fecha a sessão compartilhada e todas as conexões do pool."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Conexões criadas e reaproveitadas, DNS e limites do pool."""
+        counters = dict(self._counters)
+        acquired = counters["connections_created"] + counters["connections_reused"]
+        return {
+            **counters,
+            "reuse_rate": round(counters["connections_reused"] / acquired, 4) if acquired else 0.0,
+            "avg_connect_seconds": (
+                round(self._connect_seconds / counters["connections_created"], 4)
+                if counters["connections_created"] else 0.0
+            ),
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.config.limit,
+            "limit_per_host": self.config.limit_per_host,
+            "keepalive_timeout": self.config.keepalive_timeout,
+            "ttl_dns_cache": self.config.ttl_dns_cache,
+        }
+
+
+_registry = HTTPClientRegistry()
+
+
+def get_registry() -> HTTPClientRegistry:
+    """Registro HTTP do processo."""
+    return _registry
+
+
+def configure(config: HTTPPoolConfig) -> HTTPClientRegistry:
+    """
+    Troca os limites do pool do processo.
+
+    Deve ser chamado antes do primeiro uso; uma sessão já aberta mantém os
+    limites antigos até ser fechada.
+    """
+    _registry.config = config
+    return _registry
+
@@ -13,10 +13,14 @@ permitindo que o sistema utilize diferentes provedores de forma transparente.
 import logging
 import json
 import os
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, AsyncIterator
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
+from .batching import gather_limited
+from .embedding_cache import EmbeddingCache, normalize_text
+from .http_pool import HTTPClientRegistry, get_registry
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +32,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("✨quantum-models✨")
 
+# Requisições de embeddings simultâneas por chamada de embed_many
+DEFAULT_EMBED_CONCURRENCY = 4
+
 @dataclass
 class ModelConfig:
     """Configuração de modelo de IA."""
@@ -39,6 +46,13 @@ class ModelConfig:
     max_tokens: int = 1000
     options: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class StreamChunk:
+    """Trecho de uma resposta em streaming."""
+    text: str = ""
+    usage: Optional[Dict[str, int]] = None
+    finish_reason: Optional[str] = None
+
 class BaseModel:
     """Modelo base para todas as integrações de IA."""
     
@@ -54,10 +68,28 @@ class BaseModel:
         """Gera uma resposta. Deve ser implementado pelas subclasses."""
         raise NotImplementedError("Método generate() deve ser implementado pela subclasse")
         
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Gera uma resposta em trechos, à medida que o provedor os envia.
+        
+        Provedores sem streaming entregam a resposta inteira em um único trecho.
+        """
+        yield StreamChunk(text=await self.generate(prompt, **kwargs), finish_reason="stop")
+        
     async def embed(self, text: str, **kwargs) -> List[float]:
         """Gera embeddings. Deve ser implementado pelas subclasses."""
         raise NotImplementedError("Método embed() deve ser implementado pela subclasse")
         
+    async def embed_many(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos, na ordem de entrada.
+        
+        Provedores sem API de lote fazem uma requisição por texto, com no
+        máximo kwargs["max_concurrency"] (padrão 4) simultâneas.
+        """
+        limit = kwargs.pop("max_concurrency", DEFAULT_EMBED_CONCURRENCY)
+        return await gather_limited([lambda text=text: self.embed(text, **kwargs) for text in texts], limit)
+        
     async def moderate(self, text: str) -> Dict[str, Any]:
         """Modera o texto. Deve ser implementado pelas subclasses."""
         raise NotImplementedError("Método moderate() deve ser implementado pela subclasse")
@@ -65,9 +97,22 @@ class BaseModel:
 class ModelManager:
     """Gerenciador de modelos de IA inspirado no ElizaOS."""
     
-    def __init__(self):
-        """Inicializa o gerenciador de modelos."""
+    def __init__(
+        self,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        http: Optional[HTTPClientRegistry] = None
+    ):
+        """
+        Inicializa o gerenciador de modelos.
+        
+        Args:
+            embedding_cache: Cache de embeddings (padrão: memória + data/embedding_cache.db,
+                aberto no primeiro uso)
+            http: Pool HTTP dos provedores (padrão: o pool compartilhado do processo)
+        """
         self.models = {}
+        self._embedding_cache = embedding_cache
+        self.http = http or get_registry()
         self.default_model = None
         self.logger = logging.getLogger("✨quantum-models✨")
         self.config_dir = Path("config/integration")
@@ -104,6 +149,9 @@ class ModelManager:
             elif config.provider == "local":
                 from .models.local import LocalModel
                 self.models[model_id] = LocalModel(config)
+            elif config.provider == "fake":
+                from .models.fake import FakeModel
+                self.models[model_id] = FakeModel(config)
             else:
                 self.logger.error(f"Provedor de modelo desconhecido: {config.provider}")
                 return False
@@ -166,6 +214,36 @@ class ModelManager:
             self.logger.error(f"Erro ao gerar resposta com modelo {model_id}: {e}")
             return None
     
+    async def generate_stream(self, prompt: str, model_id: Optional[str] = None, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Gera uma resposta em streaming usando o modelo especificado ou o padrão.
+        
+        Os trechos são repassados assim que o provedor os envia; encerrar o
+        iterador (aclose) cancela a requisição ao provedor.
+        
+        Args:
+            prompt: Texto de entrada
+            model_id: Identificador do modelo (usa o padrão se None)
+            **kwargs: Argumentos adicionais específicos do modelo
+            
+        Yields:
+            Trechos da resposta; o último traz o uso de tokens, quando informado
+            
+        Raises:
+            ValueError: Se o modelo não estiver registrado
+        """
+        model_id = model_id or self.default_model
+        
+        if not model_id or model_id not in self.models:
+            raise ValueError(f"Modelo {model_id} não encontrado")
+        
+        stream = self.models[model_id].generate_stream(prompt, **kwargs)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
     async def generate_embedding(self, text: str, model_id: Optional[str] = None, **kwargs) -> Optional[List[float]]:
         """
         Gera embeddings para o texto usando o modelo especificado ou o padrão.
@@ -188,14 +266,77 @@ class ModelManager:
             self.logger.error(f"Modelo {model_id} não encontrado")
             return None
         
+        cache_key = self._embedding_cache_key(model_id, kwargs)
+        cached = self.embedding_cache.get(cache_key, text)
+        if cached is not None:
+            return cached
+        
         try:
             model = self.models[model_id]
             embeddings = await model.embed(text, **kwargs)
+            self.embedding_cache.put(cache_key, text, embeddings)
             return embeddings
         except Exception as e:
             self.logger.error(f"Erro ao gerar embeddings com modelo {model_id}: {e}")
             return None
     
+    async def generate_embeddings(self, texts: List[str], model_id: Optional[str] = None, **kwargs) -> Optional[List[List[float]]]:
+        """
+        Gera embeddings para vários textos em lotes.
+        
+        Args:
+            texts: Textos para gerar embeddings
+            model_id: Identificador do modelo (usa o padrão se None)
+            **kwargs: Argumentos adicionais (max_concurrency, batch_size, ...)
+            
+        Returns:
+            Embeddings na ordem dos textos ou None em caso de erro
+        """
+        model_id = model_id or self.default_model
+        
+        if not model_id:
+            self.logger.error("Nenhum modelo padrão definido")
+            return None
+        
+        if model_id not in self.models:
+            self.logger.error(f"Modelo {model_id} não encontrado")
+            return None
+        
+        # Só os textos ausentes do cache vão ao provedor, uma vez cada
+        cache_key = self._embedding_cache_key(model_id, kwargs)
+        results = self.embedding_cache.get_many(cache_key, texts)
+        pending: Dict[str, List[int]] = {}
+        for index, vector in enumerate(results):
+            if vector is None:
+                pending.setdefault(normalize_text(texts[index]), []).append(index)
+        if not pending:
+            return results
+        
+        try:
+            model = self.models[model_id]
+            misses = [texts[indices[0]] for indices in pending.values()]
+            vectors = await model.embed_many(misses, **kwargs)
+            self.embedding_cache.put_many(cache_key, misses, vectors)
+            for indices, vector in zip(pending.values(), vectors):
+                for index in indices:
+                    results[index] = vector
+            return results
+        except Exception as e:
+            self.logger.error(f"Erro ao gerar embeddings em lote com modelo {model_id}: {e}")
+            return None
+    
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        """Cache de embeddings; o padrão só abre o banco quando usado (não na importação)."""
+        if self._embedding_cache is None:
+            self._embedding_cache = EmbeddingCache()
+        return self._embedding_cache
+    
+    @staticmethod
+    def _embedding_cache_key(model_id: str, kwargs: Dict[str, Any]) -> str:
+        # O modelo de embeddings do provedor pode vir nos argumentos
+        return f"{model_id}/{kwargs.get('model', 'default')}"
+    
     async def moderate_content(self, text: str, model_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Modera o conteúdo usando o modelo especificado ou o padrão.
@@ -225,6 +366,30 @@ class ModelManager:
             self.logger.error(f"Erro ao moderar conteúdo com modelo {model_id}: {e}")
             return None
     
+    async def warm_up(self, connections: int = 2) -> int:
+        """
+        Abre conexões com as APIs dos modelos registrados.
+        
+        Args:
+            connections: Conexões abertas por host
+            
+        Returns:
+            Conexões estabelecidas
+        """
+        urls = [getattr(model, "base_url", None) for model in self.models.values()]
+        return await self.http.warm_up([url for url in urls if url], connections)
+    
+    async def close(self):
+        """Fecha o pool HTTP dos provedores e o cache de embeddings."""
+        for model in self.models.values():
+            close_session = getattr(model, "_close_session", None)
+            if close_session is not None:
+                await close_session()
+        await self.http.close()
+        if self._embedding_cache is not None:
+            self._embedding_cache.close()
+        self.logger.info("Gerenciador de modelos encerrado")
+    
     def get_model(self, model_id: str) -> Optional[BaseModel]:
         """
         Obtém um modelo específico.
@@ -13,12 +13,14 @@ Este pacote contém os adaptadores para diferentes modelos de IA.
 from .openai import OpenAIModel
 from .anthropic import AnthropicModel
 from .gemini import GeminiModel
+from .fake import FakeModel
 
 # Exporta os símbolos
 __all__ = [
     "OpenAIModel",
     "AnthropicModel",
-    "GeminiModel"
+    "GeminiModel",
+    "FakeModel"
 ]
 
 # Versão do pacote
@@ -12,9 +12,10 @@ Este módulo implementa a integração com a API da Anthropic (Claude).
 import logging
 import json
 import asyncio
-from typing import Dict, List, Any, Optional, Union
-import aiohttp
-from ..model_manager import BaseModel, ModelConfig
+from typing import Dict, List, Any, Optional, Union, AsyncIterator
+from ..model_manager import BaseModel, ModelConfig, StreamChunk
+from ..http_pool import get_registry
+from .sse import iter_sse_data
 
 class AnthropicModel(BaseModel):
     """Implementação do modelo Anthropic (Claude)."""
@@ -25,38 +26,23 @@ class AnthropicModel(BaseModel):
         self.base_url = "https://api.anthropic.com/v1"
         self.session = None
         self.api_version = "2023-06-01"  # Versão da API Anthropic
+        self.headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": self.api_version,
+            "Content-Type": "application/json"
+        }
         self.logger.info(f"Modelo Anthropic inicializado: {self.name}")
         
     async def _ensure_session(self):
         """Garante que a sessão HTTP está inicializada."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession(
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": self.api_version,
-                    "Content-Type": "application/json"
-                }
-            )
+        self.session = await get_registry().session()
     
     async def _close_session(self):
-        """Fecha a sessão HTTP."""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Solta a sessão compartilhada (o pool é fechado pelo ModelManager)."""
+        self.session = None
     
-    async def generate(self, prompt: str, **kwargs) -> str:
-        """
-        Gera uma resposta usando o modelo Anthropic Claude.
-        
-        Args:
-            prompt: Texto de entrada
-            **kwargs: Argumentos adicionais
-            
-        Returns:
-            Resposta gerada
-        """
-        await self._ensure_session()
-        
+    def _build_request(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Monta o corpo da requisição à API de mensagens."""
         # Mescla as configurações padrão com as fornecidas
         params = {
             "model": self.config.model_name or "claude-3-opus-20240229",
@@ -91,12 +77,27 @@ class AnthropicModel(BaseModel):
         if "stop_sequences" in kwargs:
             data["stop_sequences"] = kwargs["stop_sequences"]
         
+        return data
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Gera uma resposta usando o modelo Anthropic Claude.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Returns:
+            Resposta gerada
+        """
+        await self._ensure_session()
+        data = self._build_request(prompt, **kwargs)
         endpoint = f"{self.base_url}/messages"
         
         try:
             self.logger.debug(f"Enviando requisição para Anthropic: {json.dumps(data)[:100]}...")
             
-            async with self.session.post(endpoint, json=data) as response:
+            async with self.session.post(endpoint, json=data, headers=self.headers) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     self.logger.error(f"Erro na API Anthropic: {response.status} - {error_text}")
@@ -114,6 +115,44 @@ class AnthropicModel(BaseModel):
             self.logger.error(f"Erro ao gerar resposta: {e}")
             return f"Erro ao gerar resposta: {str(e)}"
     
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Gera uma resposta em streaming usando o modelo Anthropic Claude.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Yields:
+            Trechos da resposta; o último traz o uso de tokens
+        """
+        await self._ensure_session()
+        data = self._build_request(prompt, **kwargs)
+        data["stream"] = True
+        usage = {}
+        
+        async with self.session.post(f"{self.base_url}/messages", json=data, headers=self.headers) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                self.logger.error(f"Erro na API Anthropic: {response.status} - {error_text}")
+                raise Exception(f"Erro na API Anthropic: {response.status}")
+            
+            async for event in iter_sse_data(response):
+                event_type = event.get("type")
+                if event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield StreamChunk(text=text)
+                elif event_type == "message_start":
+                    usage["prompt_tokens"] = event["message"].get("usage", {}).get("input_tokens", 0)
+                elif event_type == "message_delta":
+                    usage["completion_tokens"] = event.get("usage", {}).get("output_tokens", 0)
+                    finish_reason = event.get("delta", {}).get("stop_reason")
+                    usage["total_tokens"] = usage.get("prompt_tokens", 0) + usage["completion_tokens"]
+                    yield StreamChunk(usage=dict(usage), finish_reason=finish_reason)
+                elif event_type == "error":
+                    raise Exception(f"Erro na API Anthropic: {event.get('error', {}).get('message')}")
+    
     async def embed(self, text: str, **kwargs) -> List[float]:
         """
         Gera embeddings para o texto usando o modelo Anthropic.
@@ -131,27 +170,11 @@ class AnthropicModel(BaseModel):
         
         # Importa o modelo OpenAI para usar como fallback
         try:
-            from .openai import OpenAIModel
-            from ..model_manager import ModelConfig
-            
-            # Cria uma configuração temporária para o modelo OpenAI
-            openai_config = ModelConfig(
-                name="OpenAI-Embedding-Fallback",
-                provider="openai",
-                api_key=kwargs.get("openai_api_key", ""),
-                model_name="text-embedding-ada-002"
-            )
-            
-            # Cria uma instância temporária do modelo OpenAI
-            openai_model = OpenAIModel(openai_config)
-            
-            # Gera embeddings usando o modelo OpenAI
-            embeddings = await openai_model.embed(text, **kwargs)
-            
-            # Fecha a sessão do modelo OpenAI
-            await openai_model._close_session()
+            from .openai import embedding_fallback
             
-            return embeddings
+            # Modelo OpenAI reaproveitado entre chamadas (mesmo pool HTTP)
+            openai_model = embedding_fallback(kwargs.get("openai_api_key", ""))
+            return await openai_model.embed(text, **kwargs)
         except Exception as e:
             self.logger.error(f"Erro ao gerar embeddings com fallback: {e}")
             # Retorna um vetor de embeddings vazio em caso de erro
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Provedor Simulado (fake)
+Versão: 1.0.0 - Build 2025.03.18
+
+Provedor local, sem rede, para testar a API offline: responde com um
+texto fixo, transmitido palavra a palavra com um atraso configurável,
+gera embeddings determinísticos a partir do texto e nunca sinaliza
+conteúdo na moderação.
+
+Opções (ModelConfig.options):
+    reply: Texto da resposta
+    repeat: Quantas vezes o texto é repetido (respostas longas)
+    chunk_delay: Atraso entre palavras no streaming (segundos)
+    embedding_dim: Dimensão dos embeddings
+"""
+
+import asyncio
+import hashlib
+import random
+from typing import Any, AsyncIterator, Dict, List
+
+from ..model_manager import BaseModel, ModelConfig, StreamChunk
+
+DEFAULT_REPLY = "Olá! Esta é uma resposta simulada do provedor local EVA & GUARANI."
+
+
+class FakeModel(BaseModel):
+    """Provedor simulado, para testes sem rede."""
+
+    def __init__(self, config: ModelConfig):
+        """Inicializa o provedor simulado."""
+        super().__init__(config)
+        self.reply = config.options.get("reply", DEFAULT_REPLY)
+        self.repeat = config.options.get("repeat", 1)
+        self.chunk_delay = config.options.get("chunk_delay", 0.02)
+        self.embedding_dim = config.options.get("embedding_dim", 64)
+        self.logger.info(f"Modelo simulado inicializado: {self.name}")
+
+    def _words(self) -> List[str]:
+        return " ".join([self.reply] * self.repeat).split(" ")
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Retorna a resposta completa."""
+        await asyncio.sleep(self.chunk_delay)
+        return " ".join(self._words())
+
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """Transmite a resposta palavra a palavra; o último trecho traz o uso."""
+        words = self._words()
+        for index, word in enumerate(words):
+            await asyncio.sleep(self.chunk_delay)
+            yield StreamChunk(text=word if index == len(words) - 1 else word + " ")
+        yield StreamChunk(
+            usage={
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(words),
+                "total_tokens": len(prompt.split()) + len(words)
+            },
+            finish_reason="stop"
+        )
+
+    async def embed(self, text: str, **kwargs) -> List[float]:
+        """Vetor unitário determinístico, derivado do hash do texto."""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.embedding_dim)]
+        norm = sum(value * value for value in vector) ** 0.5 or 1.0
+        return [value / norm for value in vector]
+
+    async def moderate(self, text: str) -> Dict[str, Any]:
+        """Nunca sinaliza conteúdo."""
+        return {"flagged": False, "categories": {}, "scores": {}}
@@ -12,13 +12,20 @@ Este módulo implementa a integração com a API do Google Gemini.
 import logging
 import json
 import asyncio
-from typing import Dict, List, Any, Optional, Union
-import aiohttp
-from ..model_manager import BaseModel, ModelConfig
+from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple
+from ..model_manager import BaseModel, ModelConfig, StreamChunk, DEFAULT_EMBED_CONCURRENCY
+from ..batching import split_batches, gather_limited
+from ..prompt_builder import get_counter
+from ..http_pool import get_registry
+from .sse import iter_sse_data
 
 class GeminiModel(BaseModel):
     """Implementação do modelo Google Gemini."""
     
+    # Limites de uma requisição batchEmbedContents
+    EMBEDDING_BATCH_ITEMS = 100
+    EMBEDDING_BATCH_TOKENS = 100 * 2048
+    
     def __init__(self, config: ModelConfig):
         """Inicializa o modelo Google Gemini."""
         super().__init__(config)
@@ -28,28 +35,19 @@ class GeminiModel(BaseModel):
         
     async def _ensure_session(self):
         """Garante que a sessão HTTP está inicializada."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        self.session = await get_registry().session()
     
     async def _close_session(self):
-        """Fecha a sessão HTTP."""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Solta a sessão compartilhada (o pool é fechado pelo ModelManager)."""
+        self.session = None
     
-    async def generate(self, prompt: str, **kwargs) -> str:
+    def _build_request(self, prompt: str, **kwargs) -> Tuple[str, Dict[str, Any]]:
         """
-        Gera uma resposta usando o modelo Google Gemini.
+        Monta a requisição de geração.
         
-        Args:
-            prompt: Texto de entrada
-            **kwargs: Argumentos adicionais
-            
         Returns:
-            Resposta gerada
+            Nome do modelo e corpo da requisição
         """
-        await self._ensure_session()
-        
         # Mescla as configurações padrão com as fornecidas
         params = {
             "model": self.config.model_name or "gemini-2.0-flash-exp",
@@ -89,6 +87,21 @@ class GeminiModel(BaseModel):
         if "safety_settings" in kwargs:
             data["safetySettings"] = kwargs["safety_settings"]
         
+        return model_name, data
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Gera uma resposta usando o modelo Google Gemini.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Returns:
+            Resposta gerada
+        """
+        await self._ensure_session()
+        model_name, data = self._build_request(prompt, **kwargs)
         endpoint = f"{self.base_url}/models/{model_name}:generateContent?key={self.api_key}"
         
         try:
@@ -115,6 +128,46 @@ class GeminiModel(BaseModel):
             self.logger.error(f"Erro ao gerar resposta: {e}")
             return f"Erro ao gerar resposta: {str(e)}"
     
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Gera uma resposta em streaming usando o modelo Google Gemini.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Yields:
+            Trechos da resposta; o último traz o uso de tokens
+        """
+        await self._ensure_session()
+        model_name, data = self._build_request(prompt, **kwargs)
+        endpoint = f"{self.base_url}/models/{model_name}:streamGenerateContent?alt=sse&key={self.api_key}"
+        usage = None
+        
+        async with self.session.post(endpoint, json=data) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                self.logger.error(f"Erro na API Google Gemini: {response.status} - {error_text}")
+                raise Exception(f"Erro na API Google Gemini: {response.status}")
+            
+            async for event in iter_sse_data(response):
+                for candidate in event.get("candidates") or []:
+                    parts = candidate.get("content", {}).get("parts") or []
+                    text = "".join(part.get("text", "") for part in parts)
+                    if text or candidate.get("finishReason"):
+                        yield StreamChunk(text=text, finish_reason=candidate.get("finishReason"))
+                # O uso de tokens vem acumulado em cada evento; vale o último
+                metadata = event.get("usageMetadata")
+                if metadata:
+                    usage = {
+                        "prompt_tokens": metadata.get("promptTokenCount", 0),
+                        "completion_tokens": metadata.get("candidatesTokenCount", 0),
+                        "total_tokens": metadata.get("totalTokenCount", 0)
+                    }
+        
+        if usage:
+            yield StreamChunk(usage=usage)
+    
     async def embed(self, text: str, **kwargs) -> List[float]:
         """
         Gera embeddings para o texto usando o modelo Google Gemini.
@@ -166,33 +219,67 @@ class GeminiModel(BaseModel):
             if kwargs.get("fallback_to_openai", True) and kwargs.get("openai_api_key"):
                 self.logger.warning("Usando OpenAI como fallback para embeddings")
                 try:
-                    from .openai import OpenAIModel
-                    from ..model_manager import ModelConfig
-                    
-                    # Cria uma configuração temporária para o modelo OpenAI
-                    openai_config = ModelConfig(
-                        name="OpenAI-Embedding-Fallback",
-                        provider="openai",
-                        api_key=kwargs.get("openai_api_key", ""),
-                        model_name="text-embedding-ada-002"
-                    )
-                    
-                    # Cria uma instância temporária do modelo OpenAI
-                    openai_model = OpenAIModel(openai_config)
-                    
-                    # Gera embeddings usando o modelo OpenAI
-                    embeddings = await openai_model.embed(text, **kwargs)
+                    from .openai import embedding_fallback
                     
-                    # Fecha a sessão do modelo OpenAI
-                    await openai_model._close_session()
-                    
-                    return embeddings
+                    # Modelo OpenAI reaproveitado entre chamadas (mesmo pool HTTP)
+                    openai_model = embedding_fallback(kwargs["openai_api_key"])
+                    return await openai_model.embed(text, **kwargs)
                 except Exception as fallback_error:
                     self.logger.error(f"Erro ao usar fallback para embeddings: {fallback_error}")
             
             # Retorna um vetor de embeddings vazio em caso de erro
             return [0.0] * 768  # Dimensão típica dos embeddings do Gemini
     
+    async def embed_many(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos com batchEmbedContents.
+        
+        Os textos são divididos em lotes pelo número de itens e de tokens,
+        enviados com concorrência limitada e devolvidos na ordem de entrada.
+        Ao contrário de embed(), erros são propagados em vez de virar
+        vetores zerados.
+        
+        Args:
+            texts: Textos para gerar embeddings
+            **kwargs: model, batch_size, max_concurrency
+            
+        Returns:
+            Lista de embeddings, um por texto
+        """
+        await self._ensure_session()
+        
+        model = kwargs.get("model", "embedding-001")
+        endpoint = f"{self.base_url}/models/{model}:batchEmbedContents?key={self.api_key}"
+        batches = split_batches(
+            texts,
+            min(kwargs.get("batch_size", self.EMBEDDING_BATCH_ITEMS), self.EMBEDDING_BATCH_ITEMS),
+            self.EMBEDDING_BATCH_TOKENS,
+            get_counter(model).count
+        )
+        
+        async def embed_batch(indices: List[int]) -> List[List[float]]:
+            data = {
+                "requests": [
+                    {"model": f"models/{model}", "content": {"parts": [{"text": texts[i]}]}}
+                    for i in indices
+                ]
+            }
+            async with self.session.post(endpoint, json=data) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    self.logger.error(f"Erro na API Google Gemini: {response.status} - {error_text}")
+                    raise Exception(f"Erro na API Google Gemini: {response.status}")
+                result = await response.json()
+            # As respostas vêm na ordem das requisições do lote
+            return [embedding["values"] for embedding in result["embeddings"]]
+        
+        results = await gather_limited(
+            [lambda indices=indices: embed_batch(indices) for indices in batches],
+            kwargs.get("max_concurrency", DEFAULT_EMBED_CONCURRENCY)
+        )
+        self.logger.debug(f"Embeddings gerados para {len(texts)} textos em {len(batches)} lotes")
+        return [embedding for batch in results for embedding in batch]
+    
     async def moderate(self, text: str) -> Dict[str, Any]:
         """
         Modera o texto usando a API do Google Gemini.
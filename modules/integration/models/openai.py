@@ -12,46 +12,44 @@ Este módulo implementa a integração com a API da OpenAI.
 import logging
 import json
 import asyncio
-from typing import Dict, List, Any, Optional, Union
-import aiohttp
-from ..model_manager import BaseModel, ModelConfig
+from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple
+from functools import lru_cache
+from ..model_manager import BaseModel, ModelConfig, StreamChunk, DEFAULT_EMBED_CONCURRENCY
+from ..batching import split_batches, gather_limited
+from ..prompt_builder import get_counter
+from ..http_pool import get_registry
+from .sse import iter_sse_data
 
 class OpenAIModel(BaseModel):
     """Implementação do modelo OpenAI."""
     
+    # Limites de uma requisição de embeddings
+    EMBEDDING_BATCH_ITEMS = 2048
+    EMBEDDING_BATCH_TOKENS = 300000
+    
     def __init__(self, config: ModelConfig):
         """Inicializa o modelo OpenAI."""
         super().__init__(config)
         self.base_url = "https://api.openai.com/v1"
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
         self.session = None
         self.logger.info(f"Modelo OpenAI inicializado: {self.name}")
         
     async def _ensure_session(self):
         """Garante que a sessão HTTP está inicializada."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession(
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            )
+        self.session = await get_registry().session()
     
     async def _close_session(self):
-        """Fecha a sessão HTTP."""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Solta a sessão compartilhada (o pool é fechado pelo ModelManager)."""
+        self.session = None
     
-    async def generate(self, prompt: str, **kwargs) -> str:
+    def _build_request(self, prompt: str, **kwargs) -> Tuple[str, Dict[str, Any], bool]:
         """
-        Gera uma resposta usando o modelo OpenAI.
+        Monta a requisição de geração.
         
-        Args:
-            prompt: Texto de entrada
-            **kwargs: Argumentos adicionais
-            
         Returns:
-            Resposta gerada
+            Endpoint, corpo da requisição e se o modelo é de chat
         """
-        await self._ensure_session()
-        
         # Mescla as configurações padrão com as fornecidas
         params = {
             "model": self.config.model_name or "gpt-4",
@@ -62,7 +60,8 @@ class OpenAIModel(BaseModel):
         }
         
         # Prepara os dados para a API
-        if "gpt-4" in params["model"] or "gpt-3.5" in params["model"]:
+        chat = "gpt-4" in params["model"] or "gpt-3.5" in params["model"]
+        if chat:
             # Formato para modelos de chat
             data = {
                 "model": params["model"],
@@ -86,10 +85,26 @@ class OpenAIModel(BaseModel):
             if key not in data:
                 data[key] = kwargs[key]
         
+        return endpoint, data, chat
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Gera uma resposta usando o modelo OpenAI.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Returns:
+            Resposta gerada
+        """
+        await self._ensure_session()
+        endpoint, data, chat = self._build_request(prompt, **kwargs)
+        
         try:
             self.logger.debug(f"Enviando requisição para OpenAI: {json.dumps(data)[:100]}...")
             
-            async with self.session.post(endpoint, json=data) as response:
+            async with self.session.post(endpoint, json=data, headers=self.headers) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     self.logger.error(f"Erro na API OpenAI: {response.status} - {error_text}")
@@ -98,7 +113,7 @@ class OpenAIModel(BaseModel):
                 result = await response.json()
                 
                 # Extrai a resposta dependendo do tipo de modelo
-                if "gpt-4" in params["model"] or "gpt-3.5" in params["model"]:
+                if chat:
                     content = result["choices"][0]["message"]["content"]
                 else:
                     content = result["choices"][0]["text"]
@@ -110,6 +125,37 @@ class OpenAIModel(BaseModel):
             self.logger.error(f"Erro ao gerar resposta: {e}")
             return f"Erro ao gerar resposta: {str(e)}"
     
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Gera uma resposta em streaming usando o modelo OpenAI.
+        
+        Args:
+            prompt: Texto de entrada
+            **kwargs: Argumentos adicionais
+            
+        Yields:
+            Trechos da resposta; o último traz o uso de tokens
+        """
+        await self._ensure_session()
+        endpoint, data, chat = self._build_request(prompt, **kwargs)
+        data["stream"] = True
+        if chat:
+            data["stream_options"] = {"include_usage": True}
+        
+        async with self.session.post(endpoint, json=data, headers=self.headers) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                self.logger.error(f"Erro na API OpenAI: {response.status} - {error_text}")
+                raise Exception(f"Erro na API OpenAI: {response.status}")
+            
+            async for event in iter_sse_data(response):
+                for choice in event.get("choices") or []:
+                    text = choice.get("delta", {}).get("content") if chat else choice.get("text")
+                    if text or choice.get("finish_reason"):
+                        yield StreamChunk(text=text or "", finish_reason=choice.get("finish_reason"))
+                if event.get("usage"):
+                    yield StreamChunk(usage=event["usage"])
+    
     async def embed(self, text: str, **kwargs) -> List[float]:
         """
         Gera embeddings para o texto usando o modelo OpenAI.
@@ -132,7 +178,7 @@ class OpenAIModel(BaseModel):
         }
         
         try:
-            async with self.session.post(f"{self.base_url}/embeddings", json=data) as response:
+            async with self.session.post(f"{self.base_url}/embeddings", json=data, headers=self.headers) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     self.logger.error(f"Erro na API OpenAI: {response.status} - {error_text}")
@@ -148,6 +194,48 @@ class OpenAIModel(BaseModel):
             self.logger.error(f"Erro ao gerar embeddings: {e}")
             raise
     
+    async def embed_many(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos com a API de lote da OpenAI.
+        
+        Os textos são divididos em lotes pelo número de itens e de tokens,
+        enviados com concorrência limitada e devolvidos na ordem de entrada.
+        
+        Args:
+            texts: Textos para gerar embeddings
+            **kwargs: model, batch_size, max_concurrency
+            
+        Returns:
+            Lista de embeddings, um por texto
+        """
+        await self._ensure_session()
+        
+        model = kwargs.get("model", "text-embedding-ada-002")
+        batches = split_batches(
+            texts,
+            min(kwargs.get("batch_size", self.EMBEDDING_BATCH_ITEMS), self.EMBEDDING_BATCH_ITEMS),
+            self.EMBEDDING_BATCH_TOKENS,
+            get_counter(model).count
+        )
+        
+        async def embed_batch(indices: List[int]) -> List[List[float]]:
+            data = {"model": model, "input": [texts[i] for i in indices]}
+            async with self.session.post(f"{self.base_url}/embeddings", json=data, headers=self.headers) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    self.logger.error(f"Erro na API OpenAI: {response.status} - {error_text}")
+                    raise Exception(f"Erro na API OpenAI: {response.status}")
+                result = await response.json()
+            # A API informa o índice de cada item dentro do lote
+            return [item["embedding"] for item in sorted(result["data"], key=lambda item: item["index"])]
+        
+        results = await gather_limited(
+            [lambda indices=indices: embed_batch(indices) for indices in batches],
+            kwargs.get("max_concurrency", DEFAULT_EMBED_CONCURRENCY)
+        )
+        self.logger.debug(f"Embeddings gerados para {len(texts)} textos em {len(batches)} lotes")
+        return [embedding for batch in results for embedding in batch]
+    
     async def moderate(self, text: str) -> Dict[str, Any]:
         """
         Modera o texto usando a API de moderação da OpenAI.
@@ -165,7 +253,7 @@ class OpenAIModel(BaseModel):
         }
         
         try:
-            async with self.session.post(f"{self.base_url}/moderations", json=data) as response:
+            async with self.session.post(f"{self.base_url}/moderations", json=data, headers=self.headers) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     self.logger.error(f"Erro na API OpenAI: {response.status} - {error_text}")
@@ -195,4 +283,20 @@ class OpenAIModel(BaseModel):
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fecha a sessão ao sair do contexto."""
-        await self._close_session() 
\ No newline at end of file
+        await self._close_session()
+
+
+@lru_cache(maxsize=8)
+def embedding_fallback(api_key: str) -> OpenAIModel:
+    """
+    Modelo OpenAI de embeddings usado como fallback por outros provedores.
+    
+    Uma instância por chave de API, reaproveitada entre chamadas; as
+    conexões vêm do pool HTTP compartilhado.
+    """
+    return OpenAIModel(ModelConfig(
+        name="OpenAI-Embedding-Fallback",
+        provider="openai",
+        api_key=api_key,
+        model_name="text-embedding-ada-002"
+    ))
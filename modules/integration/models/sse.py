@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Leitura de Streams SSE dos Provedores
+Versão: 1.0.0 - Build 2025.03.18
+
+Os provedores (OpenAI, Anthropic, Gemini) enviam respostas em streaming
+como server-sent events. Este módulo lê as linhas "data:" de uma
+resposta aiohttp sem acumulá-la; se a leitura for interrompida antes do
+fim, a conexão é fechada, o que cancela a geração no provedor.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict
+
+import aiohttp
+
+
+async def iter_sse_data(response: aiohttp.ClientResponse) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Itera sobre os eventos JSON de uma resposta SSE.
+
+    Args:
+        response: Resposta do provedor (status 200)
+
+    Yields:
+        Conteúdo de cada linha "data:", decodificado de JSON
+    """
+    finished = False
+    try:
+        async for line in response.content:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == b"[DONE]":
+                break
+            if payload:
+                yield json.loads(payload)
+        finished = True
+    finally:
+        if not finished:
+            # Consumidor desistiu (cliente desconectou): derruba a conexão
+            response.close()
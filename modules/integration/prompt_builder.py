@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Construtor Incremental de Prompts
+Versão: 1.0.0 - Build 2025.03.17
+
+Este módulo monta o prompt das conversas do APIAdapter sem refazer o
+histórico inteiro a cada mensagem: cada sessão tem um construtor que
+guarda o texto renderizado e a contagem de tokens de cada mensagem, e
+só processa as mensagens novas.
+
+O prompt respeita o orçamento de tokens do modelo (janela de contexto
+menos a reserva para a resposta): as mensagens de sistema iniciais são
+mantidas e as mensagens mais antigas saem primeiro, substituídas por
+uma nota com a quantidade omitida.
+"""
+
+import logging
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .model_manager import ModelConfig
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger("api-adapter")
+
+ROLE_LABELS = {
+    "system": "[Sistema]",
+    "user": "[Usuário]",
+    "assistant": "[Assistente]",
+}
+ASSISTANT_PREFIX = "[Assistente]: "
+
+# Janelas de contexto por prefixo do nome do modelo (o primeiro que casar)
+CONTEXT_WINDOWS = (
+    ("gpt-4o", 128000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4", 8192),
+    ("gpt-3.5", 16385),
+    ("claude", 200000),
+    ("gemini-1.5", 1000000),
+    ("gemini-2", 1000000),
+    ("gemini", 32760),
+    ("llama", 8192),
+)
+DEFAULT_CONTEXT_WINDOW = 8192
+MIN_PROMPT_BUDGET = 256
+
+
+class TokenCounter:
+    """Conta tokens com o tiktoken ou, sem ele, por estimativa (4 caracteres por token)."""
+
+    def __init__(self, model_name: str = ""):
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model_name)
+            except Exception:
+                try:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.warning(f"Tokenizador indisponível, usando estimativa: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=32)
+def get_counter(model_name: str = "") -> TokenCounter:
+    """Contador compartilhado por nome de modelo."""
+    return TokenCounter(model_name)
+
+
+def token_budget(config: Optional[ModelConfig]) -> int:
+    """
+    Tokens disponíveis para o prompt de um modelo.
+
+    A janela vem de config.options["context_window"] ou da tabela
+    CONTEXT_WINDOWS; config.max_tokens fica reservado para a resposta.
+    """
+    if config is None:
+        return DEFAULT_CONTEXT_WINDOW - 1000
+    window = config.options.get("context_window")
+    if not window:
+        name = (config.model_name or config.name).lower()
+        window = next((size for prefix, size in CONTEXT_WINDOWS if name.startswith(prefix)), DEFAULT_CONTEXT_WINDOW)
+    return max(MIN_PROMPT_BUDGET, window - config.max_tokens)
+
+
+def render_message(message: Dict[str, Any]) -> str:
+    """Texto de uma mensagem no prompt (vazio para papéis desconhecidos)."""
+    label = ROLE_LABELS.get(message.get("role"))
+    return f"{label}: {message['content']}\n\n" if label else ""
+
+
+class PromptBuilder:
+    """Prompt de uma sessão, atualizado mensagem a mensagem."""
+
+    def __init__(self, budget: int, counter: TokenCounter):
+        """
+        Args:
+            budget: Tokens disponíveis para o prompt
+            counter: Contador de tokens do modelo
+        """
+        self.budget = budget
+        self.counter = counter
+        self._suffix_tokens = counter.count(ASSISTANT_PREFIX)
+        self.reset()
+
+    def reset(self):
+        """Descarta o estado (o próximo sync reconstrói a partir das mensagens)."""
+        # (texto, tokens) das mensagens de sistema iniciais e da janela de conversa
+        self._pinned: List[Tuple[str, int]] = []
+        self._window: "deque[Tuple[str, int]]" = deque()
+        self._pinned_tokens = 0
+        self._window_tokens = 0
+        self._note_tokens = 0
+        self.omitted = 0
+        self._last_id: Optional[str] = None
+        self._conversation_started = False
+        self._prompt: Optional[str] = None
+
+    @property
+    def tokens(self) -> int:
+        """Tokens do prompt atual."""
+        return self._pinned_tokens + self._note_tokens + self._window_tokens + self._suffix_tokens
+
+    def _note(self) -> str:
+        if not self.omitted:
+            return ""
+        return f"[Sistema]: {self.omitted} mensagens anteriores foram omitidas.\n\n"
+
+    def _entry(self, message: Dict[str, Any]) -> Tuple[str, int]:
+        text = render_message(message)
+        return text, self.counter.count(text)
+
+    def append(self, message: Dict[str, Any]):
+        """Inclui uma mensagem nova no fim do prompt."""
+        self._last_id = message.get("id")
+        text, tokens = self._entry(message)
+        if not text:
+            return
+        if message.get("role") == "system" and not self._conversation_started:
+            self._pinned.append((text, tokens))
+            self._pinned_tokens += tokens
+        else:
+            self._conversation_started = True
+            self._window.append((text, tokens))
+            self._window_tokens += tokens
+        self._prompt = None
+        self._fit()
+
+    def _fit(self):
+        # Retira as mensagens mais antigas até caber (a última sempre fica)
+        omitted = self.omitted
+        while self.tokens > self.budget and len(self._window) > 1:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+            self.omitted += 1
+            self._note_tokens = self.counter.count(self._note())
+        if self.omitted != omitted:
+            self._prompt = None
+
+    def _rebuild(self, messages: List[Dict[str, Any]]):
+        # Sem estado válido: conta só as mensagens que cabem, da mais nova para a mais antiga
+        self.reset()
+        start = 0
+        while start < len(messages) and messages[start].get("role") == "system":
+            self.append(messages[start])
+            start += 1
+
+        tail = []
+        available = self.budget - self._pinned_tokens - self._suffix_tokens
+        for message in reversed(messages[start:]):
+            text, tokens = self._entry(message)
+            if not text:
+                continue
+            if tail and tokens > available:
+                break
+            tail.append((text, tokens))
+            available -= tokens
+
+        self._conversation_started = len(messages) > start
+        self.omitted = sum(1 for message in messages[start:] if render_message(message)) - len(tail)
+        self._note_tokens = self.counter.count(self._note())
+        for text, tokens in reversed(tail):
+            self._window.append((text, tokens))
+            self._window_tokens += tokens
+        self._last_id = messages[-1].get("id") if messages else None
+        self._prompt = None
+        self._fit()
+
+    def sync(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Atualiza o prompt com o histórico da sessão.
+
+        Só as mensagens posteriores à última vista são processadas; se a
+        última vista não estiver no histórico (sessão recriada, processo
+        reiniciado), o prompt é reconstruído.
+
+        Args:
+            messages: Histórico da sessão, em ordem
+
+        Returns:
+            Prompt pronto para o modelo
+        """
+        if self._last_id is not None:
+            for index in range(len(messages) - 1, -1, -1):
+                if messages[index].get("id") == self._last_id:
+                    for message in messages[index + 1:]:
+                        self.append(message)
+                    return self.prompt()
+        self._rebuild(messages)
+        return self.prompt()
+
+    def prompt(self) -> str:
+        """Prompt atual (em cache até a próxima alteração)."""
+        if self._prompt is None:
+            parts = [text for text, _ in self._pinned]
+            parts.append(self._note())
+            parts.extend(text for text, _ in self._window)
+            parts.append(ASSISTANT_PREFIX)
+            self._prompt = "".join(parts)
+        return self._prompt
+
+
+class PromptCache:
+    """Construtores de prompt por sessão, limitados em ordem de uso (LRU)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._builders: "OrderedDict[str, PromptBuilder]" = OrderedDict()
+
+    def get(self, session_id: str, config: Optional[ModelConfig]) -> PromptBuilder:
+        """Construtor da sessão para o modelo (novo se o orçamento mudou)."""
+        budget = token_budget(config)
+        builder = self._builders.get(session_id)
+        if builder is None or builder.budget != budget:
+            model_name = (config.model_name or config.name) if config else ""
+            builder = PromptBuilder(budget, get_counter(model_name))
+            self._builders[session_id] = builder
+            while len(self._builders) > self.max_entries:
+                self._builders.popitem(last=False)
+        self._builders.move_to_end(session_id)
+        return builder
+
+    def discard(self, session_id: str):
+        """Esquece o construtor de uma sessão."""
+        self._builders.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._builders)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Codificação das Respostas do Adaptador de API
+Versão: 1.0.0 - Build 2025.03.21
+
+Este módulo concentra a (de)serialização do APIAdapter:
+- JSON com orjson quando instalado, senão com o json da biblioteca padrão
+- formatos compactos para embeddings, negociados pelo cabeçalho Accept:
+    application/json          lista de floats (padrão)
+    application/octet-stream  matriz float32 little-endian crua; metadados
+                              nos cabeçalhos X-Embedding-*
+    application/x-msgpack     mesmo corpo do JSON, com cada vetor em float32
+                              binário (requer msgpack)
+  e, no corpo JSON, "encoding_format": "base64" (float32 em base64, como
+  na API da OpenAI).
+"""
+
+import sys
+import json
+import base64
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+JSON = "application/json"
+OCTET_STREAM = "application/octet-stream"
+MSGPACK = "application/x-msgpack"
+
+EMBEDDING_MEDIA_TYPES = (JSON, OCTET_STREAM) + ((MSGPACK,) if MSGPACK_AVAILABLE else ())
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa em JSON (UTF-8)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Desserializa JSON; erros levantam json.JSONDecodeError."""
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError é subclasse de json.JSONDecodeError
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def read_json(request: web.Request) -> Any:
+    """Corpo JSON da requisição (substitui request.json())."""
+    return loads(await request.read())
+
+
+def json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    """Resposta JSON (substitui web.json_response)."""
+    return web.Response(body=dumps(data), status=status, headers=headers, content_type=JSON)
+
+
+def pack_float32(vector: Sequence[float]) -> bytes:
+    """Vetor em float32 little-endian."""
+    packed = array("f", vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_float32(data: bytes) -> List[float]:
+    """Inverso de pack_float32."""
+    packed = array("f")
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tolist()
+
+
+def negotiate(accept: Optional[str], offered: Sequence[str] = EMBEDDING_MEDIA_TYPES) -> str:
+    """
+    Escolhe o formato da resposta a partir do cabeçalho Accept.
+
+    Args:
+        accept: Valor do cabeçalho (None = qualquer)
+        offered: Formatos disponíveis, o primeiro é o padrão
+
+    Returns:
+        Formato de maior qualidade aceito pelo cliente, ou o padrão
+    """
+    if not accept:
+        return offered[0]
+    best, best_rank = offered[0], (0.0, -1)
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        # Com a mesma qualidade, o tipo explícito vence o curinga
+        if media_type in offered:
+            candidate, specific = media_type, 1
+        elif media_type in ("*/*", "application/*"):
+            candidate, specific = offered[0], 0
+        else:
+            continue
+        if q > 0 and (q, specific) > best_rank:
+            best, best_rank = candidate, (q, specific)
+    return best
+
+
+def embeddings_response(
+    request: web.Request,
+    metadata: Dict[str, Any],
+    embeddings: List[List[float]],
+    single: bool = False,
+    encoding_format: str = "float"
+) -> web.Response:
+    """
+    Resposta da rota de embeddings no formato negociado.
+
+    Args:
+        request: Requisição (para o cabeçalho Accept)
+        metadata: Demais campos da resposta (modelo, dimensões, tempos...)
+        embeddings: Vetores, na ordem de entrada
+        single: Se a requisição tinha um único texto (JSON devolve o vetor, não a lista)
+        encoding_format: "float" ou "base64" (somente JSON)
+
+    Returns:
+        Resposta aiohttp
+    """
+    media_type = negotiate(request.headers.get("Accept"))
+
+    if media_type == OCTET_STREAM:
+        body = b"".join(pack_float32(vector) for vector in embeddings)
+        return web.Response(body=body, content_type=OCTET_STREAM, headers={
+            "X-Embedding-Count": str(len(embeddings)),
+            "X-Embedding-Dimensions": str(len(embeddings[0]) if embeddings else 0),
+            "X-Embedding-Dtype": "float32-le",
+            "X-Embedding-Metadata": json.dumps(metadata, ensure_ascii=True, default=str),
+        })
+
+    if media_type == MSGPACK:
+        packed = [pack_float32(vector) for vector in embeddings]
+        body = msgpack.packb({**metadata, "dtype": "float32-le", "embeddings": packed[0] if single else packed})
+        return web.Response(body=body, content_type=MSGPACK)
+
+    if encoding_format == "base64":
+        encoded = [base64.b64encode(pack_float32(vector)).decode("ascii") for vector in embeddings]
+        return json_response({
+            **metadata, "encoding_format": "base64", "dtype": "float32-le",
+            "embeddings": encoded[0] if single else encoded
+        })
+    return json_response({**metadata, "embeddings": embeddings[0] if single else embeddings})
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Armazenamento de Sessões do Adaptador de API
+Versão: 1.0.0 - Build 2025.03.16
+
+Este módulo guarda as sessões do APIAdapter com limites:
+- TTL de inatividade: sessões sem acesso há mais que `idle_ttl` expiram
+- Máximo de sessões: a menos usada recentemente (LRU) é descartada
+- Máximo de mensagens por sessão: as mais antigas saem primeiro
+
+Há dois backends com a mesma interface: em memória (padrão) e SQLite
+(sobrevive a reinícios). Um varredor em segundo plano remove as sessões
+expiradas e as métricas contam criações, expirações, descartes e cortes.
+"""
+
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger("api-adapter")
+
+DEFAULT_IDLE_TTL = 3600.0  # 1 hora
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_MAX_MESSAGES = 200
+
+
+class SessionStore:
+    """Interface comum dos backends de sessão."""
+
+    def __init__(
+        self,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            idle_ttl: Segundos sem acesso até a sessão expirar
+            max_sessions: Sessões mantidas; acima disso descarta a LRU
+            max_messages: Mensagens mantidas por sessão
+            clock: Relógio (substituível em simulações)
+        """
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counters = {
+            "created": 0,
+            "deleted": 0,
+            "expired": 0,
+            "evicted": 0,
+            "trimmed_messages": 0,
+            "sweeps": 0,
+        }
+        self._last_sweep: Optional[float] = None
+
+    def create(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda uma sessão nova (com "id" e "messages")."""
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna a sessão (renovando o acesso) ou None se não existir ou tiver expirado."""
+        raise NotImplementedError
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Adiciona uma mensagem; retorna a sessão atualizada ou None se não existir."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        """Remove uma sessão."""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Remove as sessões expiradas; retorna quantas saíram."""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Sessões e mensagens guardadas."""
+        raise NotImplementedError
+
+    def close(self):
+        """Libera os recursos do backend."""
+
+    def metrics(self) -> Dict[str, Any]:
+        """Totais guardados, contadores e limites."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "backend": type(self).__name__,
+            **self.counts(),
+            **counters,
+            "last_sweep": self._last_sweep,
+            "limits": {
+                "idle_ttl": self.idle_ttl,
+                "max_sessions": self.max_sessions,
+                "max_messages": self.max_messages,
+            },
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        if amount:
+            with self._lock:
+                self._counters[name] += amount
+
+    def _trim(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        excess = len(messages) - self.max_messages
+        if excess > 0:
+            self._count("trimmed_messages", excess)
+            return messages[excess:]
+        return messages
+
+    async def run_sweeper(self, interval: float = 60.0):
+        """Varre as sessões expiradas periodicamente (tarefa asyncio)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"{removed} sessões expiradas removidas")
+            except Exception as e:
+                logger.error(f"Erro ao varrer sessões: {e}")
+
+
+class MemorySessionStore(SessionStore):
+    """Sessões em memória, em ordem de uso (LRU)."""
+
+    def __init__(self, **limits):
+        super().__init__(**limits)
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._access: Dict[str, float] = {}
+
+    def create(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        session = dict(session)
+        session["messages"] = self._trim(list(session.get("messages", [])))
+        with self._lock:
+            self._sessions[session["id"]] = session
+            self._access[session["id"]] = self.clock()
+            self._counters["created"] += 1
+            evicted = 0
+            while len(self._sessions) > self.max_sessions:
+                old_id, _ = self._sessions.popitem(last=False)
+                self._access.pop(old_id, None)
+                evicted += 1
+            self._counters["evicted"] += evicted
+        return session
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        # Chamado com o lock: expira sob demanda ou renova o acesso
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = self.clock()
+        if now - self._access[session_id] > self.idle_ttl:
+            del self._sessions[session_id]
+            del self._access[session_id]
+            self._counters["expired"] += 1
+            return None
+        self._access[session_id] = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._touch(session_id)
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                return None
+            messages = session["messages"]
+            messages.append(message)
+            excess = len(messages) - self.max_messages
+            if excess > 0:
+                del messages[:excess]
+                self._counters["trimmed_messages"] += excess
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                return False
+            self._access.pop(session_id, None)
+            self._counters["deleted"] += 1
+            return True
+
+    def sweep(self) -> int:
+        deadline = self.clock() - self.idle_ttl
+        with self._lock:
+            # Em ordem LRU: as expiradas estão no início
+            expired = []
+            for session_id in self._sessions:
+                if self._access[session_id] >= deadline:
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                del self._sessions[session_id]
+                del self._access[session_id]
+            self._counters["expired"] += len(expired)
+            self._counters["sweeps"] += 1
+            self._last_sweep = self.clock()
+        return len(expired)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "messages": sum(len(session["messages"]) for session in self._sessions.values()),
+            }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    last_access REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions(last_access);
+
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessões em SQLite, preservadas entre reinícios."""
+
+    def __init__(self, path: Union[str, Path] = "data/sessions.db", **limits):
+        """
+        Args:
+            path: Arquivo do banco SQLite
+            **limits: idle_ttl, max_sessions, max_messages, clock
+        """
+        super().__init__(**limits)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def create(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        session = dict(session)
+        messages = self._trim(list(session.pop("messages", [])))
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session["id"],))
+            self._db.execute(
+                "INSERT INTO sessions (id, last_access, data) VALUES (?, ?, ?)",
+                (session["id"], self.clock(), json.dumps(session, ensure_ascii=False))
+            )
+            self._db.executemany(
+                "INSERT INTO messages (session_id, seq, data) VALUES (?, ?, ?)",
+                ((session["id"], seq, json.dumps(message, ensure_ascii=False)) for seq, message in enumerate(messages))
+            )
+            self._counters["created"] += 1
+
+            excess = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM sessions WHERE id IN "
+                    "(SELECT id FROM sessions ORDER BY last_access LIMIT ?)", (excess,)
+                )
+                self._counters["evicted"] += excess
+        session["messages"] = messages
+        return session
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        # Chamado com o lock e dentro de uma transação
+        row = self._db.execute("SELECT last_access, data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        now = self.clock()
+        if now - row[0] > self.idle_ttl:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._counters["expired"] += 1
+            return None
+        self._db.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        return json.loads(row[1])
+
+    def _messages(self, session_id: str) -> List[Dict[str, Any]]:
+        rows = self._db.execute(
+            "SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._db:
+            session = self._touch(session_id)
+            if session is None:
+                return None
+            session["messages"] = self._messages(session_id)
+            return session
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock, self._db:
+            session = self._touch(session_id)
+            if session is None:
+                return None
+            last = self._db.execute(
+                "SELECT MAX(seq) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            seq = 0 if last is None else last + 1
+            self._db.execute(
+                "INSERT INTO messages (session_id, seq, data) VALUES (?, ?, ?)",
+                (session_id, seq, json.dumps(message, ensure_ascii=False))
+            )
+            trimmed = self._db.execute(
+                "DELETE FROM messages WHERE session_id = ? AND seq <= ?",
+                (session_id, seq - self.max_messages)
+            ).rowcount
+            self._counters["trimmed_messages"] += trimmed
+            session["messages"] = self._messages(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._db:
+            deleted = self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+            self._counters["deleted"] += deleted
+        return bool(deleted)
+
+    def sweep(self) -> int:
+        deadline = self.clock() - self.idle_ttl
+        with self._lock, self._db:
+            expired = self._db.execute("DELETE FROM sessions WHERE last_access < ?", (deadline,)).rowcount
+            self._counters["expired"] += expired
+            self._counters["sweeps"] += 1
+            self._last_sweep = self.clock()
+        return expired
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            sessions = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            messages = self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return {"sessions": sessions, "messages": messages}
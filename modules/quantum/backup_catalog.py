@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Catálogo SQLite de Backups
+Versão: 1.0.0 - Build 2025.03.10
+
+Este módulo mantém um índice SQLite dos backups, dos arquivos de cada
+backup, dos seus hashes e tamanhos. Listar backups, descobrir quais
+backups contêm um caminho ou somar bytes por dia passam a ser consultas
+indexadas, sem abrir os manifestos JSON.
+
+Os manifestos continuam sendo a fonte da verdade: o catálogo guarda o
+mtime de cada manifesto indexado, `sync` reindexa apenas os novos ou
+alterados e `rebuild` recria o índice inteiro a partir deles.
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger("✨quantum-backup-manager✨")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    day TEXT NOT NULL,
+    type TEXT,
+    total_size INTEGER NOT NULL DEFAULT 0,
+    stored_size INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    manifest TEXT UNIQUE,
+    manifest_mtime REAL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS backups_timestamp ON backups(timestamp);
+CREATE INDEX IF NOT EXISTS backups_day ON backups(day);
+
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    backup_id TEXT NOT NULL REFERENCES backups(id) ON DELETE CASCADE,
+    path_id INTEGER NOT NULL REFERENCES paths(id),
+    size INTEGER,
+    stored_size INTEGER,
+    hash TEXT,
+    PRIMARY KEY (backup_id, path_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_path ON files(path_id);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+"""
+
+
+@dataclass
+class CatalogEntry:
+    """Backup a indexar, extraído de um manifesto."""
+    id: str
+    timestamp: str
+    day: str
+    type: Optional[str]
+    total_size: int
+    stored_size: int
+    summary: Dict[str, Any]
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class BackupCatalog:
+    """Índice SQLite de backups, arquivos, hashes e tamanhos."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre (ou cria) o catálogo.
+
+        Args:
+            path: Arquivo do banco SQLite
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.execute("PRAGMA cache_size=-65536")
+        self._db.executescript(_SCHEMA)
+        self._path_cache: Dict[str, int] = {}
+
+    def close(self):
+        """Fecha o banco."""
+        with self._lock:
+            self._db.close()
+
+    def add(self, entry: CatalogEntry, manifest: Optional[Path] = None):
+        """
+        Indexa (ou reindexa) um backup.
+
+        Args:
+            entry: Backup extraído do manifesto
+            manifest: Manifesto de origem, usado por sync para detectar mudanças
+        """
+        manifest_name = manifest.name if manifest else None
+        manifest_mtime = manifest.stat().st_mtime if manifest else None
+
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM backups WHERE id = ?", (entry.id,))
+            self._db.execute(
+                "INSERT INTO backups (id, timestamp, day, type, total_size, stored_size, "
+                "file_count, manifest, manifest_mtime, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.id, entry.timestamp, entry.day, entry.type,
+                    entry.total_size, entry.stored_size, len(entry.files),
+                    manifest_name, manifest_mtime,
+                    json.dumps(entry.summary, ensure_ascii=False)
+                )
+            )
+
+            if entry.files:
+                path_ids = self._path_ids(entry.files)
+                self._db.executemany(
+                    "INSERT INTO files (backup_id, path_id, size, stored_size, hash) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (entry.id, path_ids[path], info.get("size"), info.get("stored_size"), info.get("hash"))
+                        for path, info in entry.files.items()
+                    )
+                )
+
+    def _path_ids(self, paths: Iterable[str]) -> Dict[str, int]:
+        # Caminhos se repetem entre backups; o cache evita uma consulta por
+        # arquivo e só os caminhos inéditos vão ao banco
+        missing = [path for path in paths if path not in self._path_cache]
+        if missing:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO paths (path) VALUES (?)", ((path,) for path in missing)
+            )
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                self._path_cache.update(self._db.execute(
+                    f"SELECT path, id FROM paths WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ))
+        return self._path_cache
+
+    def remove(self, backup_id: str):
+        """Remove um backup do catálogo."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM backups WHERE id = ?", (backup_id,))
+
+    def sync(self, manifest_dir: Path, parse: Callable[[Dict[str, Any]], CatalogEntry]) -> int:
+        """
+        Sincroniza o catálogo com um diretório de manifestos.
+
+        Apenas manifestos novos ou com mtime diferente do indexado são
+        abertos; backups cujo manifesto sumiu são removidos.
+
+        Args:
+            manifest_dir: Diretório com os manifestos JSON
+            parse: Converte o conteúdo de um manifesto em CatalogEntry
+
+        Returns:
+            Número de manifestos reindexados
+        """
+        with self._lock:
+            indexed = dict(self._db.execute(
+                "SELECT manifest, manifest_mtime FROM backups WHERE manifest IS NOT NULL"
+            ))
+
+        seen = set()
+        updated = 0
+
+        for path in Path(manifest_dir).glob("*.json"):
+            seen.add(path.name)
+            try:
+                if indexed.get(path.name) == path.stat().st_mtime:
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = parse(json.load(f))
+                self.add(entry, path)
+                updated += 1
+            except Exception as e:
+                logger.error(f"Erro ao indexar {path}: {e}")
+
+        removed = [name for name in indexed if name not in seen]
+        if removed:
+            with self._lock, self._db:
+                self._db.executemany(
+                    "DELETE FROM backups WHERE manifest = ?", ((name,) for name in removed)
+                )
+
+        if updated or removed:
+            logger.info(f"Catálogo sincronizado: {updated} indexados, {len(removed)} removidos")
+        return updated
+
+    def rebuild(self, manifest_dir: Path, parse: Callable[[Dict[str, Any]], CatalogEntry]) -> int:
+        """
+        Recria o catálogo inteiro a partir dos manifestos.
+
+        Args:
+            manifest_dir: Diretório com os manifestos JSON
+            parse: Converte o conteúdo de um manifesto em CatalogEntry
+
+        Returns:
+            Número de backups indexados
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM backups")
+            self._db.execute("DELETE FROM paths")
+            self._path_cache.clear()
+        return self.sync(manifest_dir, parse)
+
+    def list_backups(
+        self,
+        limit: Optional[int] = None,
+        backup_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista os backups, do mais recente ao mais antigo.
+
+        Args:
+            limit: Número máximo de backups
+            backup_type: Filtra por tipo
+
+        Returns:
+            Resumo de cada backup (manifesto sem a lista de arquivos)
+        """
+        query = "SELECT summary FROM backups"
+        params: List[Any] = []
+        if backup_type:
+            query += " WHERE type = ?"
+            params.append(backup_type)
+        query += " ORDER BY timestamp DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [json.loads(summary) for (summary,) in rows]
+
+    def get_backup(self, backup_id: str) -> Optional[Dict[str, Any]]:
+        """Resumo de um backup ou None se não estiver no catálogo."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT summary FROM backups WHERE id = ?", (backup_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def backups_containing(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Lista os backups que contêm um caminho, do mais recente ao mais antigo.
+
+        Args:
+            path: Caminho relativo, como registrado no manifesto
+
+        Returns:
+            Backup, tipo, timestamp, tamanho e hash da versão guardada
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT b.id, b.type, b.timestamp, f.size, f.stored_size, f.hash "
+                "FROM paths p JOIN files f ON f.path_id = p.id "
+                "JOIN backups b ON b.id = f.backup_id "
+                "WHERE p.path = ? ORDER BY b.timestamp DESC",
+                (path,)
+            ).fetchall()
+
+        return [
+            {
+                "backup_id": backup_id,
+                "type": backup_type,
+                "timestamp": timestamp,
+                "size": size,
+                "stored_size": stored_size,
+                "hash": digest
+            }
+            for backup_id, backup_type, timestamp, size, stored_size, digest in rows
+        ]
+
+    def bytes_by_day(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Soma os bytes dos backups por dia.
+
+        Args:
+            since: Primeiro dia (YYYY-MM-DD), inclusive
+            until: Último dia (YYYY-MM-DD), inclusive
+
+        Returns:
+            Dia, número de backups, bytes originais e bytes armazenados
+        """
+        query = (
+            "SELECT day, COUNT(*), SUM(total_size), SUM(stored_size) FROM backups "
+            "WHERE day >= ? AND day <= ? GROUP BY day ORDER BY day"
+        )
+        with self._lock:
+            rows = self._db.execute(query, (since or "", until or "9999-99-99")).fetchall()
+
+        return [
+            {"day": day, "backups": count, "total_size": total, "stored_size": stored}
+            for day, count, total, stored in rows
+        ]
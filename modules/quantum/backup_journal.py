@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Diário de Retomada dos Backups
+Versão: 1.0.0 - Build 2025.03.10
+
+Este módulo implementa o diário (write-ahead journal) de um backup em
+andamento. Os metadados só são gravados no fim do create_backup; até lá o
+diário registra, em JSON Lines e só por acréscimo:
+
+- o cabeçalho do backup (timestamp, tipo, pai, dicionários e a impressão
+  digital da configuração que produziu os dados);
+- cada arquivo concluído, com as mesmas informações que irão para os
+  metadados;
+- pontos de controle dos arquivos grandes (bytes do contêiner e da origem
+  depois de um bloco completo e sincronizado no disco).
+
+Uma linha só é registrada depois que o dado correspondente foi gravado.
+Uma última linha cortada por uma interrupção é ignorada na leitura.
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("✨quantum-backup-manager✨")
+
+
+class BackupJournal:
+    """Diário de um backup em andamento."""
+
+    def __init__(self, path: Path, header: Dict[str, Any]):
+        """
+        Inicializa o diário em memória (use create ou load).
+
+        Args:
+            path: Arquivo do diário
+            header: Cabeçalho do backup
+        """
+        self.path = Path(path)
+        self.header = header
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def create(cls, path: Path, header: Dict[str, Any]) -> "BackupJournal":
+        """
+        Cria um diário novo e grava o cabeçalho de forma durável.
+
+        Args:
+            path: Arquivo do diário
+            header: Cabeçalho do backup
+
+        Returns:
+            Diário aberto para acréscimo
+        """
+        journal = cls(path, header)
+        journal.path.parent.mkdir(parents=True, exist_ok=True)
+        journal._file = open(journal.path, "w", encoding="utf-8")
+        journal._append([{"op": "begin", **header}], sync=True)
+        return journal
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BackupJournal"]:
+        """
+        Lê um diário existente e o reabre para acréscimo.
+
+        Args:
+            path: Arquivo do diário
+
+        Returns:
+            Diário com os arquivos concluídos e os pontos de controle, ou
+            None se o cabeçalho estiver ilegível
+        """
+        journal = None
+        valid_size = 0
+
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Linha cortada no meio da gravação: o resto é descartado
+                    break
+                valid_size += len(line)
+
+                op = record.pop("op", None)
+                if journal is None:
+                    if op != "begin":
+                        break
+                    journal = cls(path, record)
+                elif op == "file":
+                    journal.files[record["path"]] = record["info"]
+                    journal.chunks.pop(record["path"], None)
+                elif op == "chunk":
+                    journal.chunks[record.pop("path")] = record
+
+        if journal is None:
+            return None
+
+        # Remove a cauda inválida antes de voltar a acrescentar linhas
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+        journal._file = open(path, "a", encoding="utf-8")
+        return journal
+
+    def _append(self, records: Iterable[Dict[str, Any]], sync: bool = False):
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def record_files(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        """
+        Registra arquivos concluídos (uma gravação por lote).
+
+        Args:
+            items: Caminho relativo e informações finais de cada arquivo
+        """
+        self._append({"op": "file", "path": rel_path, "info": info} for rel_path, info in items)
+
+    def record_chunk(self, rel_path: str, stored_size: int, size: int, source: Dict[str, Any]):
+        """
+        Registra um ponto de controle de um arquivo grande.
+
+        O contêiner parcial deve ter sido sincronizado antes da chamada; o
+        diário também é sincronizado para manter a ordem no disco.
+
+        Args:
+            rel_path: Caminho relativo do arquivo
+            stored_size: Bytes do contêiner até o último bloco completo
+            size: Bytes da origem já gravados
+            source: Informações da origem (size, mtime) para validar a retomada
+        """
+        self._append([{
+            "op": "chunk",
+            "path": rel_path,
+            "stored_size": stored_size,
+            "size": size,
+            "source_size": source["size"],
+            "source_mtime": source["mtime"]
+        }], sync=True)
+
+    def close(self):
+        """Fecha o diário, mantendo-o no disco para uma retomada."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """Fecha e apaga o diário (backup concluído ou descartado)."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,824 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Pipeline de Backup em Fluxo Único
+Versão: 1.0.0 - Build 2025.03.10
+
+Este módulo implementa o contêiner QBK1 usado pelo QuantumBackupManager.
+Cada arquivo é lido uma única vez e cada bloco lido segue, no mesmo passo,
+para o hash SHA-256, para o compressor zstd e para a criptografia
+autenticada AES-256-GCM. O uso de memória é constante (um bloco por vez)
+e o índice gravado no final permite acesso aleatório sem descomprimir o
+arquivo inteiro.
+
+Layout do contêiner:
+
+    cabeçalho  MAGIC | versão | flags | reservado | chunk_size | prefixo do nonce
+    bloco*     tamanho armazenado (u32) | tamanho original (u32) | payload
+    fim        0 (u32) | 0 (u32)
+    índice     (offset do bloco, offset no original) * N | tamanho original
+    rodapé     offset do índice | tamanho do índice | N | tamanho original | END_MAGIC
+
+Cada payload é um frame zstd independente. Quando há chave, o payload é
+selado com AES-GCM usando o nonce `prefixo || índice do bloco` e o
+cabeçalho como dado associado, o que impede troca, remoção ou reordenação
+de blocos. O índice é selado com o nonce reservado INDEX_NONCE, então um
+contêiner truncado é detectado mesmo em leitura sequencial.
+"""
+
+import io
+import os
+import struct
+import hashlib
+import secrets
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+import zstandard as zstd
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+FORMAT_NAME = "qbk1"
+MAGIC = b"QBK1"
+END_MAGIC = b"1KBQ"
+FORMAT_VERSION = 1
+
+FLAG_ENCRYPTED = 0x01
+
+INDEX_NONCE = 0xFFFFFFFF
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+
+_HEADER = struct.Struct("<4sBBHI8s")
+_FRAME = struct.Struct("<II")
+_INDEX_ENTRY = struct.Struct("<QQ")
+_INDEX_TOTAL = struct.Struct("<Q")
+_FOOTER = struct.Struct("<QIIQ4s")
+_GCM_TAG_SIZE = 16
+
+
+class ContainerError(ValueError):
+    """Contêiner QBK1 inválido, truncado ou com falha de autenticação."""
+
+
+@dataclass
+class PipelineResult:
+    """Resultado da gravação de um contêiner."""
+    size: int
+    stored_size: int
+    hash: str
+    stored_hash: str
+
+
+def _nonce(prefix: bytes, index: int) -> bytes:
+    return prefix + struct.pack("<I", index)
+
+
+def _aad(header: bytes, index: int) -> bytes:
+    return header + struct.pack("<I", index)
+
+
+def make_compressor(
+    level: int = 3,
+    dictionary: Optional[zstd.ZstdCompressionDict] = None
+) -> zstd.ZstdCompressor:
+    """
+    Cria um compressor zstd no formato esperado pelo contêiner.
+
+    Um compressor não pode ser usado por duas threads ao mesmo tempo, mas
+    pode ser reaproveitado entre arquivos da mesma thread.
+    """
+    return zstd.ZstdCompressor(level=level, dict_data=dictionary, write_checksum=True)
+
+
+def make_decompressor(
+    dictionary: Optional[zstd.ZstdCompressionDict] = None
+) -> zstd.ZstdDecompressor:
+    """Cria um descompressor zstd, opcionalmente com dicionário."""
+    return zstd.ZstdDecompressor(dict_data=dictionary)
+
+
+def train_dictionary(
+    samples: List[bytes],
+    dict_size: int = 112 * 1024,
+    level: int = 3
+) -> Optional[bytes]:
+    """
+    Treina um dicionário zstd a partir de amostras de arquivos parecidos.
+
+    Args:
+        samples: Conteúdo dos arquivos de amostra
+        dict_size: Tamanho máximo do dicionário
+        level: Nível de compressão para o qual o dicionário é otimizado
+
+    Returns:
+        Bytes do dicionário ou None se as amostras forem insuficientes
+    """
+    if len(samples) < 8:
+        return None
+    try:
+        return zstd.train_dictionary(dict_size, samples, level=level).as_bytes()
+    except zstd.ZstdError:
+        return None
+
+
+def load_dictionary(data: bytes) -> zstd.ZstdCompressionDict:
+    """Carrega um dicionário salvo por train_dictionary."""
+    return zstd.ZstdCompressionDict(data)
+
+
+class ContainerWriter:
+    """Grava um contêiner QBK1 bloco a bloco."""
+
+    def __init__(
+        self,
+        dst: BinaryIO,
+        key: Optional[bytes] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        level: int = 3,
+        compressor: Optional[zstd.ZstdCompressor] = None
+    ):
+        """
+        Inicializa o gravador e escreve o cabeçalho.
+
+        Args:
+            dst: Arquivo de destino aberto em modo binário
+            key: Chave AES-256 (32 bytes) ou None para não criptografar
+            chunk_size: Tamanho máximo de cada bloco original
+            level: Nível de compressão zstd
+            compressor: Compressor reutilizável (ignora level se fornecido)
+        """
+        flags = FLAG_ENCRYPTED if key else 0
+        prefix = secrets.token_bytes(8) if key else bytes(8)
+
+        self._dst = dst
+        self._prefix = prefix
+        self._aead = AESGCM(key) if key else None
+        self._cctx = compressor or make_compressor(level)
+        self._hasher = hashlib.sha256()
+        self._stored_hasher = hashlib.sha256()
+        self._entries: List[Tuple[int, int]] = []
+        self._plain_size = 0
+        self.chunk_size = chunk_size
+
+        self._header = _HEADER.pack(MAGIC, FORMAT_VERSION, flags, 0, chunk_size, prefix)
+        self._offset = 0
+        self._write(self._header)
+
+    @classmethod
+    def resume(
+        cls,
+        dst: BinaryIO,
+        src: BinaryIO,
+        stored_size: int,
+        plain_size: int,
+        key: Optional[bytes] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compressor: Optional[zstd.ZstdCompressor] = None
+    ) -> "ContainerWriter":
+        """
+        Retoma um contêiner interrompido a partir de um ponto de controle.
+
+        Os blocos já gravados não são recomprimidos nem recriptografados:
+        o prefixo armazenado é relido para reconstruir o índice e o hash
+        armazenado, e o prefixo da origem só passa pelo hash do original.
+        Tudo o que estiver depois de `stored_size` no destino é descartado.
+
+        Args:
+            dst: Contêiner parcial aberto para leitura e escrita
+            src: Origem aberta em modo binário, no início
+            stored_size: Bytes do contêiner no ponto de controle
+            plain_size: Bytes da origem já gravados no ponto de controle
+            key: Chave AES-256 usada na gravação
+            chunk_size: Tamanho de cada bloco (deve ser o da gravação)
+            compressor: Compressor reutilizável da thread atual
+
+        Returns:
+            Gravador posicionado para o próximo bloco
+        """
+        writer = cls.__new__(cls)
+        writer._dst = dst
+        writer._cctx = compressor or make_compressor()
+        writer._hasher = hashlib.sha256()
+        writer._stored_hasher = hashlib.sha256()
+        writer._entries = []
+        writer._plain_size = 0
+        writer.chunk_size = chunk_size
+
+        dst.seek(0)
+        writer._header = dst.read(_HEADER.size)
+        if len(writer._header) != _HEADER.size or stored_size < _HEADER.size:
+            raise ContainerError("Cabeçalho truncado")
+        magic, version, flags, _, stored_chunk_size, writer._prefix = _HEADER.unpack(writer._header)
+        if magic != MAGIC or version != FORMAT_VERSION or stored_chunk_size != chunk_size:
+            raise ContainerError("Contêiner incompatível com a retomada")
+        if bool(flags & FLAG_ENCRYPTED) != bool(key):
+            raise ContainerError("Chave incompatível com o contêiner")
+        writer._aead = AESGCM(key) if key else None
+        writer._stored_hasher.update(writer._header)
+        writer._offset = _HEADER.size
+
+        # Reconstrói o índice percorrendo os quadros até o ponto de controle
+        while writer._offset < stored_size:
+            frame = dst.read(_FRAME.size)
+            if len(frame) != _FRAME.size:
+                raise ContainerError("Contêiner truncado")
+            payload_size, chunk_plain = _FRAME.unpack(frame)
+            payload = dst.read(payload_size)
+            if payload_size == 0 or len(payload) != payload_size:
+                raise ContainerError("Contêiner truncado")
+            writer._entries.append((writer._offset, writer._plain_size))
+            writer._stored_hasher.update(frame)
+            writer._stored_hasher.update(payload)
+            writer._offset += _FRAME.size + payload_size
+            writer._plain_size += chunk_plain
+
+        if writer._offset != stored_size or writer._plain_size != plain_size:
+            raise ContainerError("Ponto de controle não coincide com os quadros gravados")
+
+        remaining = plain_size
+        while remaining:
+            chunk = src.read(min(chunk_size, remaining))
+            if not chunk:
+                raise ContainerError("Origem menor que o ponto de controle")
+            writer._hasher.update(chunk)
+            remaining -= len(chunk)
+
+        dst.seek(stored_size)
+        dst.truncate()
+        return writer
+
+    @property
+    def stored_size(self) -> int:
+        """Bytes do contêiner gravados até agora."""
+        return self._offset
+
+    @property
+    def size(self) -> int:
+        """Bytes da origem gravados até agora."""
+        return self._plain_size
+
+    def _write(self, data: bytes):
+        # Tudo o que é gravado passa pelo hash armazenado, usado pela
+        # verificação rápida sem descriptografar nem descomprimir
+        self._dst.write(data)
+        self._stored_hasher.update(data)
+        self._offset += len(data)
+
+    def write_chunk(self, chunk: bytes):
+        """
+        Comprime, sela e grava um bloco.
+
+        Args:
+            chunk: Bloco original (no máximo chunk_size bytes)
+        """
+        index = len(self._entries)
+        if index >= INDEX_NONCE:
+            raise ContainerError("Número máximo de blocos excedido")
+
+        self._hasher.update(chunk)
+        payload = self._cctx.compress(chunk)
+        if self._aead:
+            payload = self._aead.encrypt(
+                _nonce(self._prefix, index), payload, _aad(self._header, index)
+            )
+
+        self._entries.append((self._offset, self._plain_size))
+        self._write(_FRAME.pack(len(payload), len(chunk)))
+        self._write(payload)
+        self._plain_size += len(chunk)
+
+    def close(self) -> PipelineResult:
+        """
+        Grava o marcador de fim, o índice e o rodapé.
+
+        Returns:
+            Tamanhos e hashes SHA-256 do original e do contêiner gravado
+        """
+        self._write(_FRAME.pack(0, 0))
+
+        index = b"".join(_INDEX_ENTRY.pack(*entry) for entry in self._entries)
+        index += _INDEX_TOTAL.pack(self._plain_size)
+        if self._aead:
+            index = self._aead.encrypt(
+                _nonce(self._prefix, INDEX_NONCE), index, _aad(self._header, INDEX_NONCE)
+            )
+
+        footer = _FOOTER.pack(
+            self._offset, len(index), len(self._entries), self._plain_size, END_MAGIC
+        )
+        self._write(index)
+        self._write(footer)
+
+        return PipelineResult(
+            size=self._plain_size,
+            stored_size=self._offset,
+            hash=self._hasher.hexdigest(),
+            stored_hash=self._stored_hasher.hexdigest()
+        )
+
+
+class ContainerReader:
+    """Lê um contêiner QBK1 de forma sequencial ou por faixa de bytes."""
+
+    def __init__(
+        self,
+        src: BinaryIO,
+        key: Optional[bytes] = None,
+        offset: int = 0,
+        length: Optional[int] = None,
+        decompressor: Optional[zstd.ZstdDecompressor] = None
+    ):
+        """
+        Inicializa o leitor e valida o cabeçalho.
+
+        Args:
+            src: Arquivo de origem aberto em modo binário
+            key: Chave AES-256 usada na gravação
+            offset: Posição do contêiner dentro de src
+            length: Tamanho do contêiner (até o fim de src se None)
+            decompressor: Descompressor reutilizável (obrigatório se a
+                gravação usou dicionário)
+        """
+        self._src = src
+        self._base = offset
+        self._length = length
+        self._dctx = decompressor or make_decompressor()
+        self._index: Optional[List[Tuple[int, int]]] = None
+
+        src.seek(offset)
+        self._header = src.read(_HEADER.size)
+        if len(self._header) != _HEADER.size:
+            raise ContainerError("Cabeçalho truncado")
+
+        magic, version, flags, _, self.chunk_size, self._prefix = _HEADER.unpack(self._header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ContainerError("Formato de contêiner desconhecido")
+
+        self.encrypted = bool(flags & FLAG_ENCRYPTED)
+        if self.encrypted and not key:
+            raise ContainerError("Contêiner criptografado exige chave")
+        self._aead = AESGCM(key) if self.encrypted else None
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self._src.read(size)
+        if len(data) != size:
+            raise ContainerError("Contêiner truncado")
+        return data
+
+    def _open_payload(self, payload: bytes, index: int, plain_size: int) -> bytes:
+        try:
+            if self._aead:
+                payload = self._aead.decrypt(
+                    _nonce(self._prefix, index), payload, _aad(self._header, index)
+                )
+            chunk = self._dctx.decompress(payload, max_output_size=plain_size)
+        except Exception as e:
+            raise ContainerError(f"Bloco {index} inválido: {e}") from e
+
+        if len(chunk) != plain_size:
+            raise ContainerError(f"Bloco {index} com tamanho inesperado")
+        return chunk
+
+    def _open_index(self, data: bytes, frame_count: int) -> Tuple[List[Tuple[int, int]], int]:
+        try:
+            if self._aead:
+                data = self._aead.decrypt(
+                    _nonce(self._prefix, INDEX_NONCE), data, _aad(self._header, INDEX_NONCE)
+                )
+        except Exception as e:
+            raise ContainerError(f"Índice inválido: {e}") from e
+
+        if len(data) != frame_count * _INDEX_ENTRY.size + _INDEX_TOTAL.size:
+            raise ContainerError("Índice com tamanho inesperado")
+
+        entries = [
+            _INDEX_ENTRY.unpack_from(data, i * _INDEX_ENTRY.size)
+            for i in range(frame_count)
+        ]
+        (total,) = _INDEX_TOTAL.unpack_from(data, frame_count * _INDEX_ENTRY.size)
+        return entries, total
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        Percorre os blocos originais em ordem, sem usar seek.
+
+        O índice e o rodapé são validados no final, de modo que um
+        contêiner truncado ou adulterado sempre gera ContainerError.
+
+        Yields:
+            Blocos originais
+        """
+        self._src.seek(self._base + _HEADER.size)
+        offset = _HEADER.size
+        entries = []
+        plain_offset = 0
+
+        while True:
+            stored_size, plain_size = _FRAME.unpack(self._read_exact(_FRAME.size))
+            if stored_size == 0:
+                break
+
+            index = len(entries)
+            entries.append((offset, plain_offset))
+            payload = self._read_exact(stored_size)
+            yield self._open_payload(payload, index, plain_size)
+
+            offset += _FRAME.size + stored_size
+            plain_offset += plain_size
+
+        index_offset = offset + _FRAME.size
+        index_size = len(entries) * _INDEX_ENTRY.size + _INDEX_TOTAL.size
+        if self._aead:
+            index_size += _GCM_TAG_SIZE
+
+        stored_index, total = self._open_index(self._read_exact(index_size), len(entries))
+        footer = _FOOTER.unpack(self._read_exact(_FOOTER.size))
+
+        if (
+            stored_index != entries
+            or total != plain_offset
+            or footer != (index_offset, index_size, len(entries), total, END_MAGIC)
+        ):
+            raise ContainerError("Índice não corresponde aos blocos lidos")
+
+    def _load_index(self) -> List[Tuple[int, int]]:
+        if self._index is not None:
+            return self._index
+
+        if self._length is None:
+            end = self._src.seek(0, 2)
+        else:
+            end = self._base + self._length
+
+        self._src.seek(end - _FOOTER.size)
+        index_offset, index_size, frame_count, total, end_magic = _FOOTER.unpack(
+            self._read_exact(_FOOTER.size)
+        )
+        if end_magic != END_MAGIC:
+            raise ContainerError("Rodapé inválido")
+
+        self._src.seek(self._base + index_offset)
+        entries, stored_total = self._open_index(self._read_exact(index_size), frame_count)
+        if stored_total != total:
+            raise ContainerError("Rodapé não corresponde ao índice")
+
+        self._index = entries
+        self.size = total
+        return entries
+
+    def read_range(self, start: int, size: int) -> bytes:
+        """
+        Lê uma faixa do arquivo original usando o índice.
+
+        Args:
+            start: Posição inicial no arquivo original
+            size: Quantidade de bytes
+
+        Returns:
+            Bytes originais da faixa (menos se passar do fim)
+        """
+        entries = self._load_index()
+        end = min(start + size, self.size)
+        if start >= end:
+            return b""
+
+        parts = []
+        index = bisect_right([plain for _, plain in entries], start) - 1
+        while index < len(entries) and entries[index][1] < end:
+            frame_offset, plain_offset = entries[index]
+            self._src.seek(self._base + frame_offset)
+            stored_size, plain_size = _FRAME.unpack(self._read_exact(_FRAME.size))
+            chunk = self._open_payload(self._read_exact(stored_size), index, plain_size)
+            parts.append(chunk[max(start - plain_offset, 0):end - plain_offset])
+            index += 1
+
+        return b"".join(parts)
+
+
+def encode_file(
+    src: Path,
+    dst: Path,
+    key: Optional[bytes] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = 3,
+    compressor: Optional[zstd.ZstdCompressor] = None
+) -> PipelineResult:
+    """
+    Grava um arquivo como contêiner QBK1 lendo a origem uma única vez.
+
+    Args:
+        src: Arquivo original
+        dst: Contêiner de destino
+        key: Chave AES-256 ou None
+        chunk_size: Tamanho de cada bloco
+        level: Nível de compressão zstd
+        compressor: Compressor reutilizável da thread atual
+
+    Returns:
+        Resultado com tamanhos e hash do original
+    """
+    with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+        return encode_stream(f_in, f_out, key, chunk_size, level, compressor)
+
+
+def encode_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    key: Optional[bytes] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = 3,
+    compressor: Optional[zstd.ZstdCompressor] = None,
+    checkpoint: Optional[Callable[[int, int], None]] = None,
+    checkpoint_interval: int = 0
+) -> PipelineResult:
+    """
+    Grava um contêiner QBK1 a partir de arquivos já abertos.
+
+    Args:
+        src: Origem aberta em modo binário
+        dst: Destino aberto em modo binário
+        key: Chave AES-256 ou None
+        chunk_size: Tamanho de cada bloco
+        level: Nível de compressão zstd
+        compressor: Compressor reutilizável da thread atual
+        checkpoint: Chamado com (bytes do contêiner, bytes da origem) a cada
+            checkpoint_interval bytes da origem, logo após um bloco completo
+        checkpoint_interval: Intervalo entre pontos de controle (0 desativa)
+
+    Returns:
+        Resultado com tamanhos e hash do original
+    """
+    writer = ContainerWriter(
+        dst, key=key, chunk_size=chunk_size, level=level, compressor=compressor
+    )
+    return _pump(src, writer, checkpoint, checkpoint_interval)
+
+
+def resume_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    stored_size: int,
+    plain_size: int,
+    key: Optional[bytes] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compressor: Optional[zstd.ZstdCompressor] = None,
+    checkpoint: Optional[Callable[[int, int], None]] = None,
+    checkpoint_interval: int = 0
+) -> PipelineResult:
+    """
+    Conclui um contêiner interrompido a partir de um ponto de controle.
+
+    Args:
+        src: Origem aberta em modo binário, no início
+        dst: Contêiner parcial aberto para leitura e escrita
+        stored_size: Bytes do contêiner no ponto de controle
+        plain_size: Bytes da origem já gravados no ponto de controle
+        key: Chave AES-256 ou None
+        chunk_size: Tamanho de cada bloco
+        compressor: Compressor reutilizável da thread atual
+        checkpoint: Ver encode_stream
+        checkpoint_interval: Ver encode_stream
+
+    Returns:
+        Resultado com tamanhos e hash do original completo
+    """
+    writer = ContainerWriter.resume(
+        dst, src, stored_size, plain_size, key=key, chunk_size=chunk_size, compressor=compressor
+    )
+    return _pump(src, writer, checkpoint, checkpoint_interval)
+
+
+def _pump(
+    src: BinaryIO,
+    writer: ContainerWriter,
+    checkpoint: Optional[Callable[[int, int], None]],
+    checkpoint_interval: int
+) -> PipelineResult:
+    next_checkpoint = writer.size + checkpoint_interval
+    while chunk := src.read(writer.chunk_size):
+        writer.write_chunk(chunk)
+        if checkpoint and checkpoint_interval and writer.size >= next_checkpoint:
+            checkpoint(writer.stored_size, writer.size)
+            next_checkpoint = writer.size + checkpoint_interval
+    return writer.close()
+
+
+def encode_bytes(
+    data: bytes,
+    key: Optional[bytes] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = 3,
+    compressor: Optional[zstd.ZstdCompressor] = None
+) -> Tuple[bytes, PipelineResult]:
+    """
+    Gera um contêiner QBK1 em memória (usado para arquivos pequenos).
+
+    Args:
+        data: Conteúdo original
+        key: Chave AES-256 ou None
+        chunk_size: Tamanho de cada bloco
+        level: Nível de compressão zstd
+        compressor: Compressor reutilizável da thread atual
+
+    Returns:
+        Bytes do contêiner e resultado com tamanhos e hash
+    """
+    buffer = io.BytesIO()
+    writer = ContainerWriter(
+        buffer, key=key, chunk_size=chunk_size, level=level, compressor=compressor
+    )
+    for start in range(0, len(data), chunk_size):
+        writer.write_chunk(data[start:start + chunk_size])
+    result = writer.close()
+    return buffer.getvalue(), result
+
+
+def decode_stream(
+    src: BinaryIO,
+    dst: Optional[BinaryIO],
+    key: Optional[bytes] = None,
+    offset: int = 0,
+    length: Optional[int] = None,
+    decompressor: Optional[zstd.ZstdDecompressor] = None
+) -> Tuple[int, str]:
+    """
+    Decodifica um contêiner em fluxo a partir de um arquivo já aberto.
+
+    Args:
+        src: Arquivo que contém o contêiner (arquivo próprio ou segmento)
+        dst: Destino do conteúdo original (apenas calcula o hash se None)
+        key: Chave AES-256 usada na gravação
+        offset: Posição do contêiner em src
+        length: Tamanho do contêiner em src
+        decompressor: Descompressor reutilizável (com o dicionário usado
+            na gravação, se houver)
+
+    Returns:
+        Tamanho e hash SHA-256 do conteúdo original
+    """
+    hasher = hashlib.sha256()
+    size = 0
+
+    reader = ContainerReader(
+        src, key=key, offset=offset, length=length, decompressor=decompressor
+    )
+    for chunk in reader.chunks():
+        hasher.update(chunk)
+        if dst is not None:
+            dst.write(chunk)
+        size += len(chunk)
+
+    return size, hasher.hexdigest()
+
+
+def hash_stored(
+    src: BinaryIO,
+    offset: int = 0,
+    length: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> str:
+    """
+    Calcula o hash SHA-256 dos bytes armazenados de um contêiner.
+
+    Não exige a chave: compara o que está no disco com o stored_hash
+    registrado na gravação, sem descriptografar nem descomprimir.
+
+    Args:
+        src: Arquivo que contém o contêiner
+        offset: Posição do contêiner em src
+        length: Tamanho do contêiner (até o fim de src se None)
+        chunk_size: Tamanho de cada leitura
+
+    Returns:
+        Hash SHA-256 dos bytes armazenados
+    """
+    hasher = hashlib.sha256()
+    src.seek(offset)
+    remaining = length
+
+    while remaining is None or remaining > 0:
+        chunk = src.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            if remaining:
+                raise ContainerError("Contêiner truncado")
+            break
+        hasher.update(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+
+    return hasher.hexdigest()
+
+
+def decode_file(src: Path, dst: Optional[Path], key: Optional[bytes] = None) -> Tuple[int, str]:
+    """
+    Decodifica um contêiner QBK1 em fluxo, calculando o hash do original.
+
+    Args:
+        src: Contêiner de origem
+        dst: Arquivo de destino (apenas calcula o hash se None)
+        key: Chave AES-256 usada na gravação
+
+    Returns:
+        Tamanho e hash SHA-256 do conteúdo original
+    """
+    with open(src, "rb") as f_in:
+        if dst is None:
+            return decode_stream(f_in, None, key=key)
+        with open(dst, "wb") as f_out:
+            return decode_stream(f_in, f_out, key=key)
+
+
+class SegmentPacker:
+    """
+    Agrupa contêineres de arquivos pequenos em segmentos de tamanho limitado.
+
+    A compressão e a criptografia acontecem fora do lock, nos workers; só a
+    gravação sequencial no segmento atual é serializada. Cada contêiner
+    continua independente, então restaurar um arquivo exige apenas um seek
+    para (segmento, offset) e a leitura de `length` bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_size: int = 64 * 1024 * 1024,
+        opener: Callable[[Path, str], BinaryIO] = open,
+        first_segment: int = 0
+    ):
+        """
+        Inicializa o empacotador.
+
+        Args:
+            directory: Diretório dos segmentos
+            segment_size: Tamanho máximo de cada segmento
+            opener: Abre cada segmento para escrita (ex.: IOScheduler.open)
+            first_segment: Número do primeiro segmento (backups retomados
+                continuam depois dos segmentos já gravados)
+        """
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self._opener = opener
+        self._first_segment = first_segment
+        self.segments: List[str] = []
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._offset = 0
+
+    def _sync(self):
+        # Chamado com o lock
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _rotate(self):
+        if self._file:
+            self._sync()
+            self._file.close()
+
+        name = f"pack-{self._first_segment + len(self.segments):05d}.qpk"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = self._opener(self.directory / name, "wb")
+        self._offset = 0
+        self.segments.append(name)
+
+    def append(self, data: bytes) -> Tuple[str, int]:
+        """
+        Grava um contêiner no segmento atual.
+
+        Args:
+            data: Bytes do contêiner
+
+        Returns:
+            Nome do segmento e offset do contêiner
+        """
+        with self._lock:
+            if self._file is None or (
+                self._offset and self._offset + len(data) > self.segment_size
+            ):
+                self._rotate()
+
+            offset = self._offset
+            self._file.write(data)
+            self._offset += len(data)
+            return self.segments[-1], offset
+
+    def commit(self):
+        """
+        Grava no disco todos os contêineres já acrescentados.
+
+        Os segmentos anteriores foram sincronizados na rotação; basta
+        sincronizar o atual.
+        """
+        with self._lock:
+            if self._file:
+                self._sync()
+
+    def close(self):
+        """Sincroniza e fecha o segmento atual."""
+        with self._lock:
+            if self._file:
+                self._sync()
+                self._file.close()
+                self._file = None
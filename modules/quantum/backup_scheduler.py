@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Escalonador de I/O dos Backups
+Versão: 1.0.0 - Build 2025.03.10
+
+Este módulo limita o impacto dos backups no disco compartilhado com o bot
+e a API:
+
+- orçamentos de MB/s e IOPS aplicados por token buckets, cobrados depois
+  de cada operação real no disco (o tamanho efetivo, não o pedido);
+- prioridade baixa de I/O nas threads do pool (classe idle do ioprio no
+  Linux, via psutil quando disponível);
+- número de workers adaptativo: mede vazão e latência por operação em
+  janelas curtas, sobe enquanto a vazão melhora e recua quando a latência
+  passa do alvo, sinal de fila cheia no disco.
+
+Os arquivos abertos por IOScheduler.open são FileIO sem buffer sob um
+BufferedReader/BufferedWriter, então cada chamada contabilizada é uma
+leitura ou escrita de verdade no sistema de arquivos.
+"""
+
+import io
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger("✨quantum-backup-manager✨")
+
+BUFFER_SIZE = 128 * 1024  # 128KB
+
+
+class TokenBucket:
+    """
+    Token bucket com débito: a operação acontece primeiro e o custo real
+    é pago depois, dormindo o tempo necessário para voltar ao saldo.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Inicializa o bucket.
+
+        Args:
+            rate: Tokens por segundo
+            burst: Saldo máximo acumulado (1 segundo de rate se None)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: float) -> float:
+        """
+        Desconta tokens e espera se o saldo ficou negativo.
+
+        Args:
+            amount: Custo da operação
+
+        Returns:
+            Tempo esperado em segundos
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class _ThrottledRaw(io.RawIOBase):
+    """Arquivo sem buffer que passa cada leitura e escrita pelo escalonador."""
+
+    def __init__(self, raw: io.RawIOBase, scheduler: "IOScheduler"):
+        self._raw = raw
+        self._scheduler = scheduler
+
+    def readable(self) -> bool:
+        return self._raw.readable()
+
+    def writable(self) -> bool:
+        return self._raw.writable()
+
+    def seekable(self) -> bool:
+        return self._raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        return self._raw.truncate(size)
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
+
+    def readinto(self, buffer) -> Optional[int]:
+        start = time.perf_counter()
+        count = self._raw.readinto(buffer)
+        self._scheduler.account(count or 0, time.perf_counter() - start)
+        return count
+
+    def write(self, data) -> Optional[int]:
+        start = time.perf_counter()
+        count = self._raw.write(data)
+        self._scheduler.account(count or 0, time.perf_counter() - start)
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+class IOScheduler:
+    """Orçamentos de I/O, prioridade baixa e workers adaptativos."""
+
+    def __init__(
+        self,
+        mb_per_s: Optional[float] = None,
+        iops: Optional[float] = None,
+        low_priority: bool = False,
+        adaptive: bool = False,
+        max_workers: int = 4,
+        min_workers: int = 1,
+        target_latency: float = 0.05,
+        interval: float = 1.0,
+        opener: Optional[Callable[[str, str], io.RawIOBase]] = None
+    ):
+        """
+        Inicializa o escalonador.
+
+        Args:
+            mb_per_s: Orçamento de vazão (sem limite se None)
+            iops: Orçamento de operações por segundo (sem limite se None)
+            low_priority: Aplica prioridade idle de I/O às threads do pool
+            adaptive: Ajusta o número de workers ativos durante a execução
+            max_workers: Limite superior de workers ativos
+            min_workers: Limite inferior de workers ativos
+            target_latency: Latência média por operação acima da qual o
+                número de workers é reduzido
+            interval: Duração da janela de medição em segundos
+            opener: Abre o arquivo sem buffer (io.FileIO se None); permite
+                simular discos lentos
+        """
+        self.bandwidth = TokenBucket(mb_per_s * 1024 * 1024) if mb_per_s else None
+        self.operations = TokenBucket(iops) if iops else None
+        self.low_priority = low_priority
+        self.adaptive = adaptive
+        self.max_workers = max(1, max_workers)
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        self.target_latency = target_latency
+        self.interval = interval
+        self.opener = opener
+
+        # O modo adaptativo parte do meio da faixa e sonda para cima
+        self.workers = max(self.min_workers, self.max_workers // 2) if adaptive else self.max_workers
+        self._running = 0
+        self._cond = threading.Condition()
+        self._direction = 1
+        self._last_throughput = 0.0
+
+        self._stats_lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_ops = 0
+        self._window_latency = 0.0
+        self.total_bytes = 0
+        self.total_ops = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def passthrough(self) -> bool:
+        """True se nenhum recurso está ativo e os arquivos podem ser abertos diretamente."""
+        return not (self.bandwidth or self.operations or self.adaptive or self.opener)
+
+    def open(self, path: Union[str, Path], mode: str = "rb") -> BinaryIO:
+        """
+        Abre um arquivo cujas leituras e escritas passam pelo escalonador.
+
+        Args:
+            path: Caminho do arquivo
+            mode: "rb", "wb" ou "r+b"
+
+        Returns:
+            Arquivo binário com buffer
+        """
+        if self.passthrough:
+            return open(path, mode)
+
+        raw_mode = mode.replace("b", "")
+        raw = self.opener(str(path), raw_mode) if self.opener else io.FileIO(str(path), raw_mode)
+        throttled = _ThrottledRaw(raw, self)
+        if "+" in raw_mode:
+            return io.BufferedRandom(throttled, BUFFER_SIZE)
+        if "r" in raw_mode:
+            return io.BufferedReader(throttled, BUFFER_SIZE)
+        return io.BufferedWriter(throttled, BUFFER_SIZE)
+
+    def account(self, nbytes: int, latency: float):
+        """
+        Registra uma operação concluída e paga seu custo nos orçamentos.
+
+        Args:
+            nbytes: Bytes efetivamente lidos ou escritos
+            latency: Duração da operação no disco
+        """
+        with self._stats_lock:
+            self._window_bytes += nbytes
+            self._window_ops += 1
+            self._window_latency += latency
+            self.total_bytes += nbytes
+            self.total_ops += 1
+
+        waited = 0.0
+        if self.operations:
+            waited += self.operations.consume(1)
+        if self.bandwidth and nbytes:
+            waited += self.bandwidth.consume(nbytes)
+
+        if waited:
+            with self._stats_lock:
+                self.throttled_seconds += waited
+
+    def init_worker(self):
+        """Inicializador das threads do pool: aplica a prioridade baixa de I/O."""
+        if not self.low_priority:
+            return
+        if not PSUTIL_AVAILABLE or not sys.platform.startswith("linux"):
+            logger.debug("Prioridade de I/O por thread indisponível nesta plataforma")
+            return
+
+        # No Linux o ioprio vale por thread; o resto do processo não é afetado
+        try:
+            psutil.Process(threading.get_native_id()).ionice(psutil.IOPRIO_CLASS_IDLE)
+        except Exception as e:
+            logger.debug(f"Erro ao ajustar prioridade de I/O: {e}")
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Reserva um dos workers ativos enquanto um item é processado."""
+        if not self.adaptive:
+            yield
+            return
+
+        with self._cond:
+            while self._running >= self.workers:
+                self._cond.wait()
+            self._running += 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._adapt()
+                self._cond.notify_all()
+
+    def _adapt(self):
+        # Chamado com self._cond adquirido
+        now = time.monotonic()
+        with self._stats_lock:
+            elapsed = now - self._window_start
+            if elapsed < self.interval:
+                return
+            throughput = self._window_bytes / elapsed
+            latency = self._window_latency / self._window_ops if self._window_ops else 0.0
+            self._window_start = now
+            self._window_bytes = 0
+            self._window_ops = 0
+            self._window_latency = 0.0
+
+        workers = self.workers
+        if latency > self.target_latency:
+            # Disco saturado: recua rápido
+            workers = min(workers - 1, int(workers * 0.75))
+            self._direction = -1
+        elif throughput > self._last_throughput * 1.05:
+            # A última mudança ajudou: continua na mesma direção
+            workers += self._direction
+        elif throughput < self._last_throughput * 0.95:
+            self._direction = -self._direction
+            workers += self._direction
+        else:
+            # Estável: sonda um worker a mais
+            self._direction = 1
+            workers += 1
+
+        self._last_throughput = throughput
+        workers = max(self.min_workers, min(self.max_workers, workers))
+        if workers != self.workers:
+            logger.debug(
+                f"Workers de I/O: {self.workers} -> {workers} "
+                f"({throughput / 1024 / 1024:.1f} MB/s, {latency * 1000:.1f} ms/op)"
+            )
+            self.workers = workers
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores acumulados do escalonador."""
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "bytes": self.total_bytes,
+                "operations": self.total_ops,
+                "throttled_seconds": self.throttled_seconds
+            }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EVA & GUARANI - Coletor Paralelo de Arquivos para Backup
+Versão: 1.0.0 - Build 2025.03.10
+
+Este módulo percorre árvores de diretórios com os.scandir em várias
+threads. Diretórios excluídos são podados antes da descida e os arquivos
+encontrados são entregues por uma fila limitada, de modo que a memória
+usada pela coleta depende do número de workers e não do número de
+arquivos da árvore.
+"""
+
+import os
+import re
+import queue
+import fnmatch
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePath
+from typing import Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger("✨quantum-backup-manager✨")
+
+_DONE = object()
+
+
+@dataclass
+class WalkEntry:
+    """Arquivo encontrado pelo coletor."""
+    path: str
+    rel_path: str
+    size: int
+    mtime: float
+    mode: int
+
+
+class PatternSet:
+    """
+    Conjunto de padrões glob compilado.
+
+    Padrões sem separador (ex.: "*.pyc", "__pycache__") são testados contra
+    o nome em uma única expressão regular; os demais seguem a semântica de
+    PurePath.match sobre o caminho relativo.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        name_patterns = []
+        self.path_patterns: List[str] = []
+
+        for pattern in patterns:
+            if "/" in pattern or "\\" in pattern:
+                self.path_patterns.append(pattern)
+            else:
+                name_patterns.append(fnmatch.translate(os.path.normcase(pattern)))
+
+        self._names = re.compile("|".join(name_patterns)) if name_patterns else None
+        self.empty = not name_patterns and not self.path_patterns
+
+    def matches(self, rel_path: str, name: str) -> bool:
+        """
+        Verifica se um caminho corresponde a algum padrão.
+
+        Args:
+            rel_path: Caminho relativo à raiz
+            name: Último componente do caminho
+
+        Returns:
+            True se algum padrão corresponder
+        """
+        if self._names and self._names.match(os.path.normcase(name)):
+            return True
+        if self.path_patterns:
+            path = PurePath(rel_path)
+            return any(path.match(pattern) for pattern in self.path_patterns)
+        return False
+
+
+class ParallelWalker:
+    """Percorre uma árvore em paralelo, com poda e fila limitada."""
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        exclude_patterns: Optional[Iterable[str]] = None,
+        include_patterns: Optional[Iterable[str]] = None,
+        skip_dirs: Optional[Iterable[Union[str, Path]]] = None,
+        workers: int = 4,
+        max_pending: int = 1024
+    ):
+        """
+        Inicializa o coletor.
+
+        Args:
+            root: Diretório raiz
+            exclude_patterns: Padrões de exclusão (arquivos e diretórios)
+            include_patterns: Padrões de inclusão (apenas arquivos)
+            skip_dirs: Diretórios ignorados por caminho (ex.: destino do backup)
+            workers: Threads de varredura
+            max_pending: Capacidade da fila de arquivos encontrados
+        """
+        self.root = os.path.abspath(root)
+        self.exclude = PatternSet(exclude_patterns or [])
+        self.include = PatternSet(include_patterns or [])
+        self.skip_dirs = {os.path.abspath(d) for d in (skip_dirs or [])}
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+
+    def __iter__(self) -> Iterator[WalkEntry]:
+        return self.walk()
+
+    def walk(self) -> Iterator[WalkEntry]:
+        """
+        Percorre a árvore.
+
+        Yields:
+            Arquivos a incluir no backup, em ordem não determinística
+        """
+        dirs: "queue.LifoQueue[Optional[str]]" = queue.LifoQueue()
+        results: "queue.Queue[object]" = queue.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+        lock = threading.Lock()
+        pending = [1]
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def finish_dir():
+            with lock:
+                pending[0] -= 1
+                done = pending[0] == 0
+            if done:
+                for _ in range(self.workers):
+                    dirs.put(None)
+                put(_DONE)
+
+        def scan(directory: str):
+            rel_dir = os.path.relpath(directory, self.root)
+            prefix = "" if rel_dir == "." else rel_dir + os.sep
+
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if stop.is_set():
+                            return
+                        rel_path = prefix + entry.name
+
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.path in self.skip_dirs:
+                                    continue
+                                if self.exclude.matches(rel_path, entry.name):
+                                    continue
+                                with lock:
+                                    pending[0] += 1
+                                dirs.put(entry.path)
+                                continue
+
+                            if not entry.is_file():
+                                continue
+                            if self.exclude.matches(rel_path, entry.name):
+                                continue
+                            if not self.include.empty and not self.include.matches(rel_path, entry.name):
+                                continue
+
+                            stat = entry.stat()
+                        except OSError as e:
+                            logger.warning(f"Erro ao ler {entry.path}: {e}")
+                            continue
+
+                        put(WalkEntry(
+                            path=entry.path,
+                            rel_path=rel_path,
+                            size=stat.st_size,
+                            mtime=stat.st_mtime,
+                            mode=stat.st_mode
+                        ))
+            except OSError as e:
+                logger.warning(f"Erro ao listar {directory}: {e}")
+
+        def worker():
+            while True:
+                directory = dirs.get()
+                if directory is None or stop.is_set():
+                    return
+                try:
+                    scan(directory)
+                finally:
+                    finish_dir()
+
+        dirs.put(self.root)
+        threads = [
+            threading.Thread(target=worker, name=f"backup-walker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for _ in range(self.workers):
+                dirs.put(None)
+            for thread in threads:
+                thread.join()
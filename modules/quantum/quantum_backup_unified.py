@@ -35,27 +35,54 @@ Este módulo unifica todas as funcionalidades de backup do sistema,
 garantindo a preservação segura e eficiente da memória do sistema.
 """
 
+import io
 import os
 import sys
 import json
 import time
+import base64
 import shutil
 import logging
 import datetime
+import random
+import hmac
 import hashlib
 import secrets
 import threading
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Union, Any
-from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Set, Optional, Tuple, Union, Any
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import zstandard as zstd
 
+# Permite executar este módulo diretamente como script
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from modules.quantum.backup_pipeline import (
+    FORMAT_NAME,
+    ContainerError,
+    SegmentPacker,
+    encode_stream,
+    resume_stream,
+    encode_bytes,
+    decode_stream,
+    hash_stored,
+    make_compressor,
+    make_decompressor,
+    train_dictionary,
+    load_dictionary,
+)
+from modules.quantum.backup_walker import ParallelWalker
+from modules.quantum.backup_catalog import BackupCatalog, CatalogEntry
+from modules.quantum.backup_scheduler import IOScheduler
+from modules.quantum.backup_journal import BackupJournal
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -67,6 +94,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("✨quantum-backup-manager✨")
 
+# Arquivos pequenos processados por tarefa quando o empacotamento está ativo
+PACK_BATCH_FILES = 256
+
 @dataclass
 class BackupConfig:
     """Configuração do backup."""
@@ -76,9 +106,27 @@ class BackupConfig:
     include_patterns: List[str]
     compression_level: int = 3
     max_workers: int = os.cpu_count() or 4
+    io_mb_per_s: Optional[float] = None
+    io_iops: Optional[float] = None
+    io_low_priority: bool = False
+    adaptive_workers: bool = False
+    io_target_latency: float = 0.05  # 50ms por operação
+    scan_workers: int = 4
     chunk_size: int = 8 * 1024 * 1024  # 8MB
     retention_days: int = 30
     encryption_key: Optional[str] = None
+    pack_small_files: bool = False
+    pack_threshold: int = 256 * 1024  # 256KB
+    segment_size: int = 64 * 1024 * 1024  # 64MB
+    resumable: bool = True
+    checkpoint_interval: int = 256 * 1024 * 1024  # 256MB
+    use_dictionaries: bool = False
+    dictionary_size: int = 112 * 1024  # 112KB
+    dictionary_samples: int = 1000
+    dictionary_classes: Dict[str, List[str]] = field(default_factory=lambda: {
+        "json": [".json"],
+        "markdown": [".md", ".markdown"]
+    })
 
 @dataclass
 class BackupMetadata:
@@ -89,7 +137,11 @@ class BackupMetadata:
     compressed_size: int
     duration: float
     type: str
-    version: str = "2.0.0"
+    version: str = "2.1.0"
+    format: str = FORMAT_NAME
+    dictionaries: Dict[str, str] = field(default_factory=dict)
+    parent: Optional[str] = None
+    deleted: List[str] = field(default_factory=list)
 
 class QuantumBackupManager:
     """Gerenciador de backup quântico unificado."""
@@ -102,8 +154,25 @@ class QuantumBackupManager:
             config: Configuração do backup
         """
         self.config = config
+        self._local = threading.local()
+        self._dictionaries = {}
+        self._dictionaries_lock = threading.Lock()
+        self._suffix_classes = {
+            suffix.lower(): file_class
+            for file_class, suffixes in config.dictionary_classes.items()
+            for suffix in suffixes
+        }
         self._ensure_dirs()
         self._init_crypto()
+        self.catalog = BackupCatalog(config.backup_dir / "catalog.db")
+        self.io_scheduler = IOScheduler(
+            mb_per_s=config.io_mb_per_s,
+            iops=config.io_iops,
+            low_priority=config.io_low_priority,
+            adaptive=config.adaptive_workers,
+            max_workers=config.max_workers,
+            target_latency=config.io_target_latency
+        )
         
     def _ensure_dirs(self):
         """Garante que os diretórios necessários existam."""
@@ -111,9 +180,15 @@ class QuantumBackupManager:
         (self.config.backup_dir / "incremental").mkdir(exist_ok=True)
         (self.config.backup_dir / "full").mkdir(exist_ok=True)
         (self.config.backup_dir / "metadata").mkdir(exist_ok=True)
+        (self.config.backup_dir / "dictionaries").mkdir(exist_ok=True)
         
     def _init_crypto(self):
-        """Inicializa o sistema de criptografia."""
+        """
+        Inicializa o sistema de criptografia.
+        
+        A chave derivada é usada diretamente pelo AES-GCM do contêiner QBK1;
+        o Fernet é mantido apenas para ler backups no formato antigo.
+        """
         if self.config.encryption_key:
             # Deriva uma chave segura da senha
             kdf = PBKDF2HMAC(
@@ -123,184 +198,210 @@ class QuantumBackupManager:
                 iterations=100000,
                 backend=default_backend()
             )
-            key = kdf.derive(self.config.encryption_key.encode())
-            self.fernet = Fernet(base64.b64encode(key))
+            self.key = kdf.derive(self.config.encryption_key.encode())
+            self.fernet = Fernet(base64.urlsafe_b64encode(self.key))
         else:
+            self.key = None
             self.fernet = None
             
-    def _collect_files(self, incremental: bool = False) -> Dict[str, Dict[str, Any]]:
+    def _iter_files(
+        self,
+        baseline: Optional[Dict[str, Dict[str, Any]]] = None,
+        unseen: Optional[Set[str]] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
         """
-        Coleta arquivos para backup.
+        Coleta arquivos para backup em fluxo.
+        
+        A árvore é percorrida em paralelo com os.scandir; diretórios que
+        casam com exclude_patterns são podados antes da descida e os
+        arquivos chegam por uma fila limitada.
         
         Args:
-            incremental: Se True, coleta apenas arquivos modificados
+            baseline: Estado resolvido da cadeia anterior (backup incremental);
+                arquivos não modificados desde então são ignorados
+            unseen: Caminhos do baseline ainda não encontrados; cada arquivo
+                visto é removido, então ao final restam os apagados da árvore
             
-        Returns:
-            Dicionário com informações dos arquivos
+        Yields:
+            Caminho relativo e informações de cada arquivo
         """
-        files = {}
-        last_backup = None
+        baseline = baseline or {}
         
-        if incremental:
-            # Carrega metadados do último backup
-            try:
-                last_backup = self._load_last_backup()
-            except Exception as e:
-                logger.warning(f"Erro ao carregar último backup: {e}")
-                
-        def should_backup(path: Path) -> bool:
-            """Verifica se um arquivo deve ser incluído no backup."""
-            # Ignora o diretório de backup
-            if str(path).startswith(str(self.config.backup_dir)):
-                return False
+        for entry in self._walker():
+            if unseen is not None:
+                unseen.discard(entry.rel_path)
                 
-            # Verifica padrões de exclusão
-            for pattern in self.config.exclude_patterns:
-                if path.match(pattern):
-                    return False
-                    
-            # Verifica padrões de inclusão
-            if self.config.include_patterns:
-                return any(path.match(pattern) for pattern in self.config.include_patterns)
-                
-            return True
-            
-        def process_file(path: Path) -> Optional[Dict[str, Any]]:
-            """Processa um arquivo e retorna suas informações."""
-            try:
-                stat = path.stat()
-                rel_path = str(path.relative_to(self.config.base_path))
-                
-                # Se for backup incremental, verifica se arquivo foi modificado
-                if incremental and last_backup and rel_path in last_backup["files"]:
-                    last_mtime = last_backup["files"][rel_path]["mtime"]
-                    if stat.st_mtime <= last_mtime:
-                        return None
-                        
-                return {
-                    "size": stat.st_size,
-                    "mtime": stat.st_mtime,
-                    "mode": stat.st_mode,
-                    "hash": self._hash_file(path)
-                }
-                
-            except Exception as e:
-                logger.error(f"Erro ao processar arquivo {path}: {e}")
-                return None
+            # Se for backup incremental, verifica se arquivo foi modificado
+            last = baseline.get(entry.rel_path)
+            if last and entry.mtime <= last["mtime"]:
+                continue
                 
-        # Coleta arquivos em paralelo
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = []
+            # O hash é calculado durante a compressão, na mesma leitura
+            yield entry.rel_path, {
+                "size": entry.size,
+                "mtime": entry.mtime,
+                "mode": entry.mode
+            }
             
-            for path in self.config.base_path.rglob("*"):
-                if path.is_file() and should_backup(path):
-                    futures.append(executor.submit(process_file, path))
-                    
-            for future in futures:
-                try:
-                    result = future.result()
-                    if result:
-                        files[str(path.relative_to(self.config.base_path))] = result
-                except Exception as e:
-                    logger.error(f"Erro ao processar arquivo: {e}")
-                    
-        return files
+    def _walker(self) -> ParallelWalker:
+        """Cria o coletor paralelo configurado para base_path."""
+        return ParallelWalker(
+            self.config.base_path,
+            exclude_patterns=self.config.exclude_patterns,
+            include_patterns=self.config.include_patterns,
+            skip_dirs=[self.config.backup_dir],
+            workers=self.config.scan_workers,
+            max_pending=self.config.max_workers * 64
+        )
+        
+    def _file_class(self, rel_path: str) -> Optional[str]:
+        """Retorna a classe de dicionário de um arquivo (pela extensão)."""
+        return self._suffix_classes.get(os.path.splitext(rel_path)[1].lower())
         
-    def _hash_file(self, path: Path) -> str:
+    def _prepare_dictionaries(self, timestamp: str, incremental: bool) -> Dict[str, str]:
         """
-        Calcula o hash de um arquivo.
+        Define o dicionário zstd de cada classe de arquivo para um backup.
+        
+        Backups completos treinam uma nova versão por classe a partir de uma
+        amostra da árvore; incrementais reaproveitam a versão mais recente.
+        As versões ficam em backup_dir/dictionaries como <classe>-<timestamp>.zdict.
         
         Args:
-            path: Caminho do arquivo
+            timestamp: Timestamp do backup (identifica a versão treinada)
+            incremental: Se True, treina apenas classes sem dicionário
             
         Returns:
-            Hash SHA-256 do arquivo
+            Nome do dicionário de cada classe
         """
-        hasher = hashlib.sha256()
+        if not self.config.use_dictionaries:
+            return {}
+            
+        dictionaries_dir = self.config.backup_dir / "dictionaries"
+        latest = {}
+        for path in sorted(dictionaries_dir.glob("*.zdict")):
+            latest[path.stem.rsplit("-", 1)[0]] = path.stem
+            
+        to_train = [
+            file_class for file_class in self.config.dictionary_classes
+            if not incremental or file_class not in latest
+        ]
         
-        with open(path, "rb") as f:
-            while chunk := f.read(self.config.chunk_size):
-                hasher.update(chunk)
+        if to_train:
+            samples = self._sample_files(to_train)
+            for file_class in to_train:
+                data = train_dictionary(
+                    samples[file_class],
+                    self.config.dictionary_size,
+                    self.config.compression_level
+                )
+                if data is None:
+                    logger.info(f"Amostras insuficientes para o dicionário {file_class}")
+                    continue
+                    
+                name = f"{file_class}-{timestamp}"
+                (dictionaries_dir / f"{name}.zdict").write_bytes(data)
+                latest[file_class] = name
+                logger.info(
+                    f"Dicionário {name} treinado com {len(samples[file_class])} amostras"
+                )
                 
-        return hasher.hexdigest()
+        return {
+            file_class: latest[file_class]
+            for file_class in self.config.dictionary_classes
+            if file_class in latest
+        }
         
-    def _compress_file(self, src: Path, dst: Path):
+    def _sample_files(self, classes: List[str]) -> Dict[str, List[bytes]]:
         """
-        Comprime um arquivo usando zstandard.
+        Sorteia arquivos pequenos de cada classe para treinar dicionários.
         
         Args:
-            src: Arquivo fonte
-            dst: Arquivo destino
-        """
-        cctx = zstd.ZstdCompressor(level=self.config.compression_level)
-        
-        with open(src, "rb") as f_in, open(dst, "wb") as f_out:
-            compressor = cctx.stream_writer(f_out)
-            while chunk := f_in.read(self.config.chunk_size):
-                compressor.write(chunk)
-            compressor.flush()
+            classes: Classes de arquivo a amostrar
             
-    def _encrypt_file(self, path: Path):
-        """
-        Criptografa um arquivo in-place.
-        
-        Args:
-            path: Caminho do arquivo
-        """
-        if not self.fernet:
-            return
-            
-        with open(path, "rb") as f:
-            data = f.read()
-            
-        encrypted = self.fernet.encrypt(data)
-        
-        with open(path, "wb") as f:
-            f.write(encrypted)
-            
-    def _decrypt_file(self, path: Path):
+        Returns:
+            Conteúdo das amostras de cada classe
         """
-        Descriptografa um arquivo in-place.
+        limit = self.config.dictionary_samples
+        reservoirs = {file_class: [] for file_class in classes}
+        seen = {file_class: 0 for file_class in classes}
+        rng = random.Random()
         
-        Args:
-            path: Caminho do arquivo
-        """
-        if not self.fernet:
-            return
-            
-        with open(path, "rb") as f:
-            data = f.read()
-            
-        decrypted = self.fernet.decrypt(data)
+        # Amostragem por reservatório: uma passada, memória limitada
+        for entry in self._walker():
+            if not 0 < entry.size < self.config.pack_threshold:
+                continue
+            file_class = self._file_class(entry.rel_path)
+            if file_class not in reservoirs:
+                continue
+                
+            seen[file_class] += 1
+            reservoir = reservoirs[file_class]
+            if len(reservoir) < limit:
+                reservoir.append(entry.path)
+            else:
+                index = rng.randrange(seen[file_class])
+                if index < limit:
+                    reservoir[index] = entry.path
+                    
+        samples = {}
+        for file_class, paths in reservoirs.items():
+            samples[file_class] = []
+            for path in paths:
+                try:
+                    with open(path, "rb") as f:
+                        samples[file_class].append(f.read())
+                except OSError as e:
+                    logger.warning(f"Erro ao ler amostra {path}: {e}")
+                    
+        return samples
         
-        with open(path, "wb") as f:
-            f.write(decrypted)
+    def _load_dictionary(self, name: str):
+        """Carrega (com cache) um dicionário salvo em backup_dir/dictionaries."""
+        with self._dictionaries_lock:
+            dictionary = self._dictionaries.get(name)
+            if dictionary is None:
+                path = self.config.backup_dir / "dictionaries" / f"{name}.zdict"
+                dictionary = load_dictionary(path.read_bytes())
+                self._dictionaries[name] = dictionary
+            return dictionary
             
-    def _load_last_backup(self) -> Optional[Dict[str, Any]]:
+    def _incremental_baseline(self) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
         """
-        Carrega os metadados do último backup.
+        Carrega o estado da cadeia do último backup, base de um incremental.
         
         Returns:
-            Dicionário com metadados ou None se não houver backup
+            Informações de cada arquivo no estado resolvido e timestamp do
+            último backup (None se não houver cadeia utilizável)
         """
-        try:
-            metadata_dir = self.config.backup_dir / "metadata"
-            files = sorted(metadata_dir.glob("*.json"), reverse=True)
+        if not any((self.config.backup_dir / "metadata").glob("*.json")):
+            return {}, None
             
-            if not files:
-                return None
-                
-            with open(files[0], "r") as f:
-                return json.load(f)
-                
+        try:
+            chain, state = self.resolve_chain()
         except Exception as e:
-            logger.error(f"Erro ao carregar último backup: {e}")
-            return None
+            logger.warning(f"Erro ao carregar cadeia do último backup: {e}")
+            return {}, None
+            
+        return {rel_path: info for rel_path, (_, info) in state.items()}, chain[-1]["timestamp"]
+        
+    def _new_timestamp(self) -> str:
+        """Timestamp de um novo backup, sem colidir com os metadados existentes."""
+        metadata_dir = self.config.backup_dir / "metadata"
+        while True:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            if not (metadata_dir / f"{timestamp}.json").exists():
+                return timestamp
+            time.sleep(0.1)
             
     def create_backup(self, incremental: bool = True) -> BackupMetadata:
         """
         Cria um novo backup.
         
+        Com resumable ativo, o progresso vai para um diário em
+        backup_dir/journal; um backup interrompido do mesmo tipo e sobre a
+        mesma cadeia é retomado na próxima chamada, pulando os arquivos já
+        concluídos e continuando os grandes do último ponto de controle.
+        
         Args:
             incremental: Se True, cria um backup incremental
             
@@ -308,47 +409,167 @@ class QuantumBackupManager:
             Metadados do backup
         """
         start_time = time.time()
+        baseline = {}
+        parent = None
+        
+        # O incremental compara com o estado resolvido da cadeia inteira,
+        # não só com o último backup
+        if incremental:
+            baseline, parent = self._incremental_baseline()
+            if parent is None:
+                logger.info("Nenhuma cadeia anterior; criando backup completo")
+                incremental = False
+                
         backup_type = "incremental" if incremental else "full"
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        journal = self._resume_journal(backup_type, parent) if self.config.resumable else None
+        timestamp = journal.header["timestamp"] if journal else self._new_timestamp()
         backup_dir = self.config.backup_dir / backup_type / timestamp
+        unseen = set(baseline)
         
         try:
-            # Coleta arquivos
-            logger.info(f"Iniciando backup {backup_type}")
-            files = self._collect_files(incremental)
-            
-            if not files:
-                logger.info("Nenhum arquivo para backup")
-                return None
-                
-            # Cria diretório do backup
-            backup_dir.mkdir(parents=True)
+            first_segment = 0
+            if journal:
+                logger.info(
+                    f"Retomando backup {backup_type} {timestamp}: "
+                    f"{len(journal.files)} arquivos concluídos no diário"
+                )
+                dictionaries = journal.header["dictionaries"]
+                first_segment = self._validate_resume(backup_dir, journal)
+            else:
+                logger.info(f"Iniciando backup {backup_type}")
+                backup_dir.mkdir(parents=True)
+                dictionaries = self._prepare_dictionaries(timestamp, incremental)
+                if self.config.resumable:
+                    journal = BackupJournal.create(
+                        self.config.backup_dir / "journal" / f"{timestamp}.jsonl",
+                        {
+                            "timestamp": timestamp,
+                            "type": backup_type,
+                            "parent": parent,
+                            "dictionaries": dictionaries,
+                            "fingerprint": self._journal_fingerprint()
+                        }
+                    )
             
-            # Processa arquivos em paralelo
+            files = {}
             total_size = 0
             compressed_size = 0
+            resumed = 0
+            packer = None
+            
+            if self.config.pack_small_files:
+                packer = SegmentPacker(
+                    backup_dir / "segments",
+                    self.config.segment_size,
+                    self.io_scheduler.open,
+                    first_segment
+                )
             
-            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-                futures = []
+            # A coleta alimenta os workers diretamente; no máximo
+            # 2 * max_workers lotes ficam em processamento ao mesmo tempo
+            with ThreadPoolExecutor(
+                max_workers=self.config.max_workers, initializer=self.io_scheduler.init_worker
+            ) as executor:
+                pending = {}
+                batch = []
+                batch_bytes = 0
+                # Itens empacotados só entram no diário depois que o
+                # segmento foi sincronizado no disco
+                unsynced = []
+                unsynced_bytes = 0
                 
-                for rel_path, info in files.items():
-                    src = self.config.base_path / rel_path
-                    dst = backup_dir / rel_path
+                def commit_packed():
+                    nonlocal unsynced, unsynced_bytes
+                    packer.commit()
+                    journal.record_files(unsynced)
+                    unsynced = []
+                    unsynced_bytes = 0
                     
-                    # Cria diretórios necessários
-                    dst.parent.mkdir(parents=True, exist_ok=True)
+                def collect(done):
+                    nonlocal total_size, compressed_size, unsynced_bytes
+                    for future in done:
+                        items = pending.pop(future)
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            logger.error(f"Erro ao processar arquivos: {e}")
+                            continue
+                            
+                        completed = []
+                        for (rel_path, info), result in zip(items, results):
+                            if result is None:
+                                continue
+                            info.update(result)
+                            files[rel_path] = info
+                            total_size += result["size"]
+                            compressed_size += result["stored_size"]
+                            if journal and "segment" in result:
+                                unsynced.append((rel_path, info))
+                                unsynced_bytes += result["stored_size"]
+                            else:
+                                completed.append((rel_path, info))
+                                
+                        if journal and completed:
+                            journal.record_files(completed)
+                        # Um fsync por chunk_size empacotados, não por lote
+                        if unsynced_bytes >= self.config.chunk_size:
+                            commit_packed()
+                            
+                def submit(items):
+                    future = executor.submit(
+                        self._process_batch, items, backup_dir, packer, dictionaries, journal
+                    )
+                    pending[future] = items
                     
-                    # Comprime e criptografa
-                    futures.append(executor.submit(self._process_file, src, dst))
-                    total_size += info["size"]
+                    if len(pending) >= self.config.max_workers * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                        
+                for rel_path, info in self._iter_files(baseline, unseen):
+                    # Concluído antes da interrupção e sem mudanças desde então
+                    done = journal.files.get(rel_path) if journal else None
+                    if done:
+                        if done["size"] == info["size"] and done["mtime"] == info["mtime"]:
+                            files[rel_path] = done
+                            total_size += done["size"]
+                            compressed_size += done["stored_size"]
+                            resumed += 1
+                            continue
+                        if "segment" not in done:
+                            (backup_dir / rel_path).unlink(missing_ok=True)
+                            
+                    # Arquivos pequenos são agrupados para diluir o custo por tarefa
+                    if packer and info["size"] < self.config.pack_threshold:
+                        batch.append((rel_path, info))
+                        batch_bytes += info["size"]
+                        if len(batch) >= PACK_BATCH_FILES or batch_bytes >= self.config.chunk_size:
+                            submit(batch)
+                            batch = []
+                            batch_bytes = 0
+                    else:
+                        submit([(rel_path, info)])
+                        
+                if batch:
+                    submit(batch)
                     
                 # Aguarda conclusão
-                for future in futures:
-                    try:
-                        compressed_size += future.result()
-                    except Exception as e:
-                        logger.error(f"Erro ao processar arquivo: {e}")
-                        
+                collect(list(pending))
+                if unsynced:
+                    commit_packed()
+                
+            if packer:
+                packer.close()
+                
+            # Arquivos da cadeia que não existem mais na árvore
+            deleted = sorted(unseen)
+            
+            if not files and not deleted:
+                logger.info("Nenhum arquivo para backup")
+                shutil.rmtree(backup_dir)
+                if journal:
+                    journal.remove()
+                return None
+                
             # Salva metadados
             duration = time.time() - start_time
             metadata = BackupMetadata(
@@ -357,50 +578,348 @@ class QuantumBackupManager:
                 total_size=total_size,
                 compressed_size=compressed_size,
                 duration=duration,
-                type=backup_type
+                type=backup_type,
+                dictionaries=dictionaries,
+                parent=parent,
+                deleted=deleted
             )
             
             self._save_metadata(metadata)
+            if journal:
+                journal.remove()
             
             # Remove backups antigos
             self._cleanup_old_backups()
             
             logger.info(
                 f"Backup {backup_type} concluído em {duration:.2f}s\n"
-                f"Arquivos: {len(files)}\n"
+                f"Arquivos: {len(files)} ({resumed} retomados)\n"
+                f"Removidos: {len(deleted)}\n"
                 f"Tamanho original: {total_size / 1024 / 1024:.2f}MB\n"
                 f"Tamanho comprimido: {compressed_size / 1024 / 1024:.2f}MB\n"
-                f"Taxa de compressão: {(compressed_size / total_size * 100):.1f}%"
+                f"Taxa de compressão: {(compressed_size / max(total_size, 1) * 100):.1f}%"
             )
             
             return metadata
             
         except Exception as e:
             logger.error(f"Erro ao criar backup: {e}")
-            if backup_dir.exists():
+            if journal:
+                # Dados e diário ficam para a próxima chamada retomar
+                journal.close()
+                logger.info(f"Backup {timestamp} pode ser retomado")
+            elif backup_dir.exists():
                 shutil.rmtree(backup_dir)
             raise
             
-    def _process_file(self, src: Path, dst: Path) -> int:
+    def _journal_fingerprint(self) -> Dict[str, Any]:
+        """Configuração que determina os bytes gravados; retomar exige a mesma."""
+        return {
+            "base_path": str(self.config.base_path.resolve()),
+            "format": FORMAT_NAME,
+            "chunk_size": self.config.chunk_size,
+            "compression_level": self.config.compression_level,
+            "pack_small_files": self.config.pack_small_files,
+            "pack_threshold": self.config.pack_threshold,
+            # Confere a chave sem gravá-la no diário
+            "key_check": hmac.new(self.key, b"backup-journal", hashlib.sha256).hexdigest()[:16]
+            if self.key else None
+        }
+        
+    def _resume_journal(self, backup_type: str, parent: Optional[str]) -> Optional[BackupJournal]:
+        """
+        Procura um backup interrompido que possa ser retomado.
+        
+        Só o diário mais recente compatível (mesmo tipo, mesma cadeia e
+        mesma configuração) é aproveitado; os demais são descartados junto
+        com os dados parciais.
+        
+        Args:
+            backup_type: Tipo do backup pedido
+            parent: Último backup da cadeia (incrementais)
+            
+        Returns:
+            Diário a retomar ou None
+        """
+        resumable = None
+        fingerprint = self._journal_fingerprint()
+        
+        for path in sorted((self.config.backup_dir / "journal").glob("*.jsonl"), reverse=True):
+            try:
+                journal = BackupJournal.load(path)
+            except Exception as e:
+                logger.warning(f"Erro ao ler diário {path}: {e}")
+                journal = None
+                
+            header = journal.header if journal else {}
+            backup_dir = self.config.backup_dir / header.get("type", "") / header.get("timestamp", "")
+            dictionaries_dir = self.config.backup_dir / "dictionaries"
+            
+            if (
+                resumable is None and journal
+                and header.get("fingerprint") == fingerprint
+                and header.get("type") == backup_type
+                and header.get("parent") == parent
+                and backup_dir.is_dir()
+                and all((dictionaries_dir / f"{name}.zdict").exists()
+                        for name in header.get("dictionaries", {}).values())
+            ):
+                resumable = journal
+                continue
+                
+            logger.info(f"Descartando backup interrompido: {path.stem}")
+            if journal:
+                journal.remove()
+            else:
+                path.unlink()
+            metadata_path = self.config.backup_dir / "metadata" / f"{path.stem}.json"
+            if header and backup_dir.is_dir() and not metadata_path.exists():
+                shutil.rmtree(backup_dir)
+                
+        return resumable
+        
+    def _validate_resume(self, backup_dir: Path, journal: BackupJournal) -> int:
+        """
+        Confere o diário com o disco e descarta as saídas parciais.
+        
+        Arquivos próprios precisam ter exatamente stored_size bytes; itens
+        empacotados precisam caber no segmento, que é truncado depois do
+        último item válido. Contêineres com ponto de controle são mantidos
+        para continuar dali; qualquer outro arquivo do diretório do backup
+        é removido.
+        
+        Args:
+            backup_dir: Diretório do backup interrompido
+            journal: Diário carregado (files e chunks são filtrados no lugar)
+            
+        Returns:
+            Número do próximo segmento a criar
+        """
+        segments_dir = backup_dir / "segments"
+        segment_sizes = {
+            path.name: path.stat().st_size for path in segments_dir.glob("*.qpk")
+        } if segments_dir.is_dir() else {}
+        
+        files = {}
+        extents = {}
+        for rel_path, info in journal.files.items():
+            if "segment" in info:
+                end = info["offset"] + info["stored_size"]
+                if segment_sizes.get(info["segment"], -1) < end:
+                    continue
+                extents[info["segment"]] = max(extents.get(info["segment"], 0), end)
+            else:
+                path = backup_dir / rel_path
+                if not path.is_file() or path.stat().st_size != info["stored_size"]:
+                    continue
+            files[rel_path] = info
+            
+        chunks = {
+            rel_path: progress for rel_path, progress in journal.chunks.items()
+            if rel_path not in files
+            and (backup_dir / rel_path).is_file()
+            and (backup_dir / rel_path).stat().st_size >= progress["stored_size"]
+        }
+        
+        keep = {backup_dir / rel_path for rel_path, info in files.items() if "segment" not in info}
+        keep.update(backup_dir / rel_path for rel_path in chunks)
+        discarded = 0
+        
+        for path in list(backup_dir.rglob("*")):
+            if not path.is_file():
+                continue
+            if path.parent == segments_dir and path.name in extents:
+                if segment_sizes[path.name] > extents[path.name]:
+                    with open(path, "r+b") as f:
+                        f.truncate(extents[path.name])
+            elif path not in keep:
+                path.unlink()
+                discarded += 1
+                
+        if discarded or len(files) != len(journal.files):
+            logger.info(
+                f"Validação da retomada: {len(journal.files) - len(files)} itens do diário "
+                f"e {discarded} arquivos parciais descartados"
+            )
+            
+        journal.files = files
+        journal.chunks = chunks
+        return max((int(name[5:10]) + 1 for name in extents), default=0)
+        
+    def _compressor(self, dictionary: Optional[str] = None):
+        """Retorna o compressor zstd reutilizável da thread atual."""
+        compressors = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+            
+        compressor = compressors.get(dictionary)
+        if compressor is None:
+            compressor = make_compressor(
+                self.config.compression_level,
+                self._load_dictionary(dictionary) if dictionary else None
+            )
+            compressors[dictionary] = compressor
+        return compressor
+        
+    def _decompressor(self, dictionary: Optional[str] = None):
+        """Retorna o descompressor zstd reutilizável da thread atual."""
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+            
+        decompressor = decompressors.get(dictionary)
+        if decompressor is None:
+            decompressor = make_decompressor(
+                self._load_dictionary(dictionary) if dictionary else None
+            )
+            decompressors[dictionary] = decompressor
+        return decompressor
+        
+    def _process_batch(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        backup_dir: Path,
+        packer: Optional[SegmentPacker] = None,
+        dictionaries: Optional[Dict[str, str]] = None,
+        journal: Optional[BackupJournal] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Processa um lote de arquivos em uma única tarefa do pool.
+        
+        Args:
+            items: Caminhos relativos e informações dos arquivos
+            backup_dir: Diretório do backup
+            packer: Empacotador de segmentos
+            dictionaries: Dicionário zstd de cada classe de arquivo
+            journal: Diário do backup (pontos de controle dos arquivos grandes)
+            
+        Returns:
+            Resultado de cada arquivo, ou None para os que falharam
         """
-        Processa um arquivo (comprime e criptografa).
+        results = []
+        for rel_path, info in items:
+            dictionary = None
+            if dictionaries and info["size"] < self.config.pack_threshold:
+                dictionary = dictionaries.get(self._file_class(rel_path))
+                
+            try:
+                with self.io_scheduler.slot():
+                    results.append(self._process_file(
+                        self.config.base_path / rel_path,
+                        backup_dir / rel_path,
+                        info,
+                        packer,
+                        dictionary,
+                        journal,
+                        rel_path
+                    ))
+            except Exception:
+                results.append(None)
+        return results
+        
+    def _process_file(
+        self,
+        src: Path,
+        dst: Path,
+        info: Dict[str, Any],
+        packer: Optional[SegmentPacker] = None,
+        dictionary: Optional[str] = None,
+        journal: Optional[BackupJournal] = None,
+        rel_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Processa um arquivo (hash, compressão e criptografia em fluxo único).
+        
+        Arquivos menores que pack_threshold vão para um segmento do packer
+        em vez de gerar um arquivo próprio no backup. Os demais registram
+        pontos de controle no diário a cada checkpoint_interval bytes e,
+        numa retomada, continuam do último deles.
         
         Args:
             src: Arquivo fonte
-            dst: Arquivo destino
+            dst: Arquivo destino (quando não empacotado)
+            info: Informações coletadas do arquivo
+            packer: Empacotador de segmentos (None desativa o empacotamento)
+            dictionary: Nome do dicionário zstd a usar (None para nenhum)
+            journal: Diário do backup (None desativa os pontos de controle)
+            rel_path: Caminho relativo do arquivo, chave no diário
             
         Returns:
-            Tamanho do arquivo processado
+            Tamanhos original e armazenado, hash e localização no segmento
         """
+        compressor = self._compressor(dictionary)
+        extra = {"dictionary": dictionary} if dictionary else {}
+        
         try:
-            # Comprime
-            self._compress_file(src, dst)
+            if packer and info["size"] < self.config.pack_threshold:
+                with self.io_scheduler.open(src, "rb") as f:
+                    data = f.read()
+                    
+                container, result = encode_bytes(
+                    data,
+                    key=self.key,
+                    chunk_size=self.config.chunk_size,
+                    compressor=compressor
+                )
+                segment, offset = packer.append(container)
+                
+                return {
+                    "size": result.size,
+                    "hash": result.hash,
+                    "stored_size": result.stored_size,
+                    "stored_hash": result.stored_hash,
+                    "segment": segment,
+                    "offset": offset,
+                    **extra
+                }
+                
+            # Cria diretórios necessários
+            dst.parent.mkdir(parents=True, exist_ok=True)
             
-            # Criptografa
-            if self.fernet:
-                self._encrypt_file(dst)
+            progress = journal.chunks.get(rel_path) if journal else None
+            if progress and (progress["source_size"], progress["source_mtime"]) != (info["size"], info["mtime"]):
+                progress = None
                 
-            return dst.stat().st_size
+            with self.io_scheduler.open(src, "rb") as f_in:
+                result = None
+                if progress:
+                    logger.info(f"Retomando {src} a partir de {progress['size'] / 1024 / 1024:.1f}MB")
+                    try:
+                        with self.io_scheduler.open(dst, "r+b") as f_out:
+                            result = resume_stream(
+                                f_in,
+                                f_out,
+                                progress["stored_size"],
+                                progress["size"],
+                                key=self.key,
+                                chunk_size=self.config.chunk_size,
+                                compressor=compressor,
+                                checkpoint=self._checkpointer(journal, rel_path, info, f_out),
+                                checkpoint_interval=self.config.checkpoint_interval
+                            )
+                    except ContainerError as e:
+                        logger.warning(f"Ponto de controle inválido para {src}, recomeçando: {e}")
+                        f_in.seek(0)
+                        
+                if result is None:
+                    with self.io_scheduler.open(dst, "wb") as f_out:
+                        result = encode_stream(
+                            f_in,
+                            f_out,
+                            key=self.key,
+                            chunk_size=self.config.chunk_size,
+                            compressor=compressor,
+                            checkpoint=self._checkpointer(journal, rel_path, info, f_out),
+                            checkpoint_interval=self.config.checkpoint_interval
+                        )
+            
+            return {
+                "size": result.size,
+                "hash": result.hash,
+                "stored_size": result.stored_size,
+                "stored_hash": result.stored_hash,
+                **extra
+            }
             
         except Exception as e:
             logger.error(f"Erro ao processar {src}: {e}")
@@ -408,6 +927,25 @@ class QuantumBackupManager:
                 dst.unlink()
             raise
             
+    @staticmethod
+    def _checkpointer(
+        journal: Optional[BackupJournal],
+        rel_path: str,
+        info: Dict[str, Any],
+        f_out: BinaryIO
+    ) -> Optional[Callable[[int, int], None]]:
+        """Cria o callback que sincroniza o contêiner parcial e registra o ponto de controle."""
+        if journal is None:
+            return None
+            
+        def checkpoint(stored_size: int, size: int):
+            # O dado precisa estar no disco antes da linha do diário
+            f_out.flush()
+            os.fsync(f_out.fileno())
+            journal.record_chunk(rel_path, stored_size, size, info)
+            
+        return checkpoint
+        
     def _save_metadata(self, metadata: BackupMetadata):
         """
         Salva os metadados do backup.
@@ -417,25 +955,94 @@ class QuantumBackupManager:
         """
         path = self.config.backup_dir / "metadata" / f"{metadata.timestamp}.json"
         
+        # json.dumps sem indentação usa o codificador em C (json.dump não),
+        # o que importa quando o backup tem centenas de milhares de arquivos
         with open(path, "w") as f:
-            json.dump(asdict(metadata), f, indent=2)
+            f.write(json.dumps(vars(metadata)))
+            
+        self.catalog.add(self._catalog_entry(vars(metadata)), path)
+        
+    @staticmethod
+    def _catalog_entry(metadata: Dict[str, Any]) -> CatalogEntry:
+        """
+        Converte os metadados de um backup em entrada do catálogo.
+        
+        Args:
+            metadata: Conteúdo do manifesto
+            
+        Returns:
+            Entrada com o resumo (manifesto sem a lista de arquivos)
+        """
+        timestamp = metadata["timestamp"]
+        summary = {key: value for key, value in metadata.items() if key != "files"}
+        summary["file_count"] = len(metadata["files"])
+        
+        return CatalogEntry(
+            id=timestamp,
+            timestamp=timestamp,
+            day=f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}",
+            type=metadata.get("type"),
+            total_size=metadata.get("total_size", 0),
+            stored_size=metadata.get("compressed_size", 0),
+            summary=summary,
+            files=metadata["files"]
+        )
             
     def _cleanup_old_backups(self):
-        """Remove backups mais antigos que retention_days."""
-        now = datetime.datetime.now()
-        retention = datetime.timedelta(days=self.config.retention_days)
+        """
+        Remove backups mais antigos que retention_days.
         
-        for backup_type in ["incremental", "full"]:
-            backup_dir = self.config.backup_dir / backup_type
+        Um backup antigo do qual depende algum backup mantido (completo de
+        base ou incremental intermediário da cadeia) é mantido também. Cada
+        backup removido sai junto com o manifesto e a entrada do catálogo.
+        """
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=self.config.retention_days)
+        
+        def expired(name: str) -> bool:
+            try:
+                return datetime.datetime.strptime(name, "%Y%m%d_%H%M%S") < cutoff
+            except ValueError:
+                return False
+                
+        metadata_dir = self.config.backup_dir / "metadata"
+        names = sorted(path.stem for path in metadata_dir.glob("*.json"))
+        
+        # Pai de cada backup (None para completos), como em _load_chain
+        parents = {}
+        for position, name in enumerate(names):
+            metadata = self._load_backup_metadata(name)
+            if not metadata or metadata.get("type") == "full":
+                parents[name] = None
+            else:
+                parents[name] = metadata.get("parent") or (names[position - 1] if position else None)
+                
+        keep = set()
+        for name in names:
+            if expired(name):
+                continue
+            while name is not None and name not in keep:
+                keep.add(name)
+                name = parents.get(name)
+                
+        for name in names:
+            if name in keep or not expired(name):
+                continue
+            # Manifesto antes dos dados: se parar no meio, sobra só um
+            # diretório sem manifesto, removido na próxima limpeza
+            logger.info(f"Removendo backup antigo: {name}")
+            self.catalog.remove(name)
+            (metadata_dir / f"{name}.json").unlink(missing_ok=True)
+            for backup_type in ["incremental", "full"]:
+                path = self.config.backup_dir / backup_type / name
+                if path.exists():
+                    shutil.rmtree(path)
             
-            for path in backup_dir.glob("*"):
-                try:
-                    timestamp = datetime.datetime.strptime(path.name, "%Y%m%d_%H%M%S")
-                    if now - timestamp > retention:
-                        logger.info(f"Removendo backup antigo: {path}")
-                        shutil.rmtree(path)
-                except ValueError:
-                    continue
+        # Diretórios sem manifesto (backups interrompidos) não têm dependentes
+        for backup_type in ["incremental", "full"]:
+            for path in (self.config.backup_dir / backup_type).glob("*"):
+                if path.is_dir() and path.name not in parents and expired(path.name):
+                    logger.info(f"Removendo backup antigo sem manifesto: {path}")
+                    shutil.rmtree(path)
                     
     def restore_backup(
         self,
@@ -446,6 +1053,9 @@ class QuantumBackupManager:
         """
         Restaura um backup.
         
+        Cada worker decodifica seus arquivos em fluxo direto para o destino,
+        verificando o hash no mesmo passo, sem cópias temporárias.
+        
         Args:
             timestamp: Data/hora do backup (último backup se None)
             target_dir: Diretório de destino (base_path se None)
@@ -458,8 +1068,8 @@ class QuantumBackupManager:
                 raise ValueError("Backup não encontrado")
                 
             # Define diretório de destino
-            target_dir = target_dir or self.config.base_path
-            backup_dir = self.config.backup_dir / metadata["type"] / metadata["timestamp"]
+            target_dir = Path(target_dir or self.config.base_path)
+            backup_dir = self._backup_path(metadata)
             
             # Filtra arquivos
             if files:
@@ -472,89 +1082,480 @@ class QuantumBackupManager:
                 return
                 
             # Restaura arquivos em paralelo
-            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-                futures = []
-                
-                for rel_path, info in restore_files.items():
-                    src = backup_dir / rel_path
-                    dst = target_dir / rel_path
-                    
-                    # Cria diretórios necessários
-                    dst.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Restaura arquivo
-                    futures.append(executor.submit(self._restore_file, src, dst, info))
-                    
-                # Aguarda conclusão
-                for future in futures:
-                    try:
-                        future.result()
-                    except Exception as e:
-                        logger.error(f"Erro ao restaurar arquivo: {e}")
-                        
-            logger.info(f"Restauração concluída: {len(restore_files)} arquivos")
+            created_dirs = set()
+            jobs = (
+                (batch, backup_dir, target_dir, metadata.get("format"), created_dirs)
+                for batch in self._batches(restore_files.items())
+            )
+            restored = sum(self._run_batches(self._restore_batch, jobs))
+            
+            if restored < len(restore_files):
+                logger.error(f"{len(restore_files) - restored} arquivos não foram restaurados")
+            logger.info(f"Restauração concluída: {restored} arquivos")
             
         except Exception as e:
             logger.error(f"Erro ao restaurar backup: {e}")
             raise
             
-    def _restore_file(self, src: Path, dst: Path, info: Dict[str, Any]):
+    def _backup_path(self, metadata: Dict[str, Any]) -> Path:
+        """Diretório de um backup a partir dos seus metadados."""
+        return self.config.backup_dir / metadata["type"] / metadata["timestamp"]
+        
+    def _load_chain(self, timestamp: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Restaura um arquivo.
+        Carrega a cadeia de um backup: o completo de base e os incrementais.
         
         Args:
-            src: Arquivo fonte (backup)
-            dst: Arquivo destino
-            info: Informações do arquivo
+            timestamp: Ponto no tempo (%Y%m%d_%H%M%S); usa o backup mais
+                recente até esse instante (último backup se None)
+            
+        Returns:
+            Metadados da cadeia, do backup completo ao mais recente
         """
-        try:
-            # Cria arquivo temporário
-            temp = dst.with_suffix(".tmp")
+        metadata_dir = self.config.backup_dir / "metadata"
+        names = sorted(path.stem for path in metadata_dir.glob("*.json"))
+        if timestamp:
+            names = [name for name in names if name <= timestamp]
+        if not names:
+            raise ValueError("Backup não encontrado")
+            
+        chain = []
+        current = names[-1]
+        
+        while True:
+            metadata = self._load_backup_metadata(current)
+            if not metadata:
+                raise ValueError(f"Backup {current} da cadeia não encontrado")
+                
+            chain.append(metadata)
+            if metadata["type"] == "full":
+                break
+                
+            parent = metadata.get("parent")
+            if parent is None:
+                # Incrementais antigos não registram o pai: usa o backup anterior
+                position = names.index(current)
+                if position == 0:
+                    raise ValueError(f"Cadeia de {current} sem backup completo")
+                parent = names[position - 1]
+            current = parent
+            
+        chain.reverse()
+        return chain
+        
+    def resolve_chain(
+        self,
+        timestamp: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[int, Dict[str, Any]]]]:
+        """
+        Calcula o estado da árvore em um ponto no tempo.
+        
+        Args:
+            timestamp: Ponto no tempo (último backup se None)
             
-            # Copia arquivo
-            shutil.copy2(src, temp)
+        Returns:
+            Cadeia de metadados e, para cada caminho, a posição na cadeia do
+            backup com a versão mais recente e as informações dessa versão
+        """
+        chain = self._load_chain(timestamp)
+        state = {}
+        
+        for position, metadata in enumerate(chain):
+            for rel_path in metadata.get("deleted", []):
+                state.pop(rel_path, None)
+            for rel_path, info in metadata["files"].items():
+                state[rel_path] = (position, info)
+                
+        return chain, state
+        
+    def _group_by_backup(
+        self,
+        chain: List[Dict[str, Any]],
+        state: Dict[str, Tuple[int, Dict[str, Any]]]
+    ) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        """Separa o estado resolvido pelo backup da cadeia que guarda cada item."""
+        groups = [[] for _ in chain]
+        for rel_path, (position, info) in state.items():
+            groups[position].append((rel_path, info))
+        return groups
+        
+    def restore_point_in_time(
+        self,
+        timestamp: Optional[str] = None,
+        target_dir: Optional[Path] = None,
+        files: Optional[List[str]] = None
+    ):
+        """
+        Restaura a árvore como estava em um ponto no tempo.
+        
+        A cadeia (completo + incrementais) é resolvida antes da restauração,
+        então cada arquivo é restaurado uma única vez, já na versão mais
+        recente, em uma passada paralela sobre todos os backups da cadeia.
+        
+        Args:
+            timestamp: Ponto no tempo (último backup se None)
+            target_dir: Diretório de destino (base_path se None)
+            files: Lista de arquivos para restaurar (todos se None)
+        """
+        try:
+            chain, state = self.resolve_chain(timestamp)
+            target_dir = Path(target_dir or self.config.base_path)
             
-            # Descriptografa
-            if self.fernet:
-                self._decrypt_file(temp)
+            if files:
+                state = {f: state[f] for f in files if f in state}
                 
-            # Descomprime
-            self._decompress_file(temp, dst)
+            if not state:
+                logger.info("Nenhum arquivo para restaurar")
+                return
+                
+            created_dirs = set()
+            jobs = (
+                (batch, self._backup_path(metadata), target_dir, metadata.get("format"), created_dirs)
+                for metadata, items in zip(chain, self._group_by_backup(chain, state))
+                for batch in self._batches(items)
+            )
+            restored = sum(self._run_batches(self._restore_batch, jobs))
             
-            # Remove arquivo temporário
-            temp.unlink()
+            if restored < len(state):
+                logger.error(f"{len(state) - restored} arquivos não foram restaurados")
+            logger.info(
+                f"Restauração de {chain[-1]['timestamp']} concluída: {restored} arquivos "
+                f"de {len(chain)} backups"
+            )
             
-            # Restaura permissões
-            os.chmod(dst, info["mode"])
-            os.utime(dst, (time.time(), info["mtime"]))
+        except Exception as e:
+            logger.error(f"Erro ao restaurar backup: {e}")
+            raise
             
-            # Verifica integridade
-            if self._hash_file(dst) != info["hash"]:
-                raise ValueError("Falha na verificação de integridade")
+    def consolidate_chain(self, timestamp: Optional[str] = None) -> BackupMetadata:
+        """
+        Gera um backup completo sintético a partir de uma cadeia.
+        
+        Os contêineres da versão mais recente de cada arquivo são copiados
+        como estão (arquivos próprios por cópia, itens empacotados por faixa
+        de segmento), sem reler a origem nem recomprimir.
+        
+        Args:
+            timestamp: Ponto no tempo da cadeia (último backup se None)
+            
+        Returns:
+            Metadados do novo backup completo
+        """
+        start_time = time.time()
+        chain, state = self.resolve_chain(timestamp)
+        
+        if any(metadata.get("format") != FORMAT_NAME for metadata in chain):
+            raise ValueError(f"Consolidação exige backups no formato {FORMAT_NAME}")
+            
+        timestamp = self._new_timestamp()
+        backup_dir = self.config.backup_dir / "full" / timestamp
+        
+        try:
+            logger.info(f"Consolidando cadeia de {len(chain)} backups até {chain[-1]['timestamp']}")
+            backup_dir.mkdir(parents=True)
+            packer = SegmentPacker(
+                backup_dir / "segments", self.config.segment_size, self.io_scheduler.open
+            )
+            
+            created_dirs = set()
+            jobs = (
+                (batch, self._backup_path(metadata), backup_dir, packer, created_dirs)
+                for metadata, items in zip(chain, self._group_by_backup(chain, state))
+                for batch in self._batches(items)
+            )
+            files = dict(self._run_batches(self._copy_batch, jobs))
+            packer.close()
+            
+            dictionaries = {}
+            for metadata in chain:
+                dictionaries.update(metadata.get("dictionaries", {}))
                 
+            metadata = BackupMetadata(
+                timestamp=timestamp,
+                files=files,
+                total_size=sum(info["size"] for info in files.values()),
+                compressed_size=sum(info["stored_size"] for info in files.values()),
+                duration=time.time() - start_time,
+                type="full",
+                dictionaries=dictionaries
+            )
+            self._save_metadata(metadata)
+            
+            logger.info(
+                f"Backup completo sintético {timestamp} criado em {metadata.duration:.2f}s\n"
+                f"Arquivos: {len(files)}"
+            )
+            return metadata
+            
         except Exception as e:
-            logger.error(f"Erro ao restaurar {src}: {e}")
-            if temp.exists():
-                temp.unlink()
-            if dst.exists():
-                dst.unlink()
+            logger.error(f"Erro ao consolidar cadeia: {e}")
+            if backup_dir.exists():
+                shutil.rmtree(backup_dir)
             raise
             
-    def _decompress_file(self, src: Path, dst: Path):
+    def _copy_batch(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        src_dir: Path,
+        backup_dir: Path,
+        packer: SegmentPacker,
+        created_dirs: Set[Path]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
         """
-        Descomprime um arquivo.
+        Copia os contêineres de um lote para o backup consolidado.
         
         Args:
-            src: Arquivo fonte
-            dst: Arquivo destino
+            items: Caminhos relativos e informações dos itens
+            src_dir: Diretório do backup de origem
+            backup_dir: Diretório do novo backup
+            packer: Empacotador de segmentos do novo backup
+            created_dirs: Diretórios já criados no novo backup (compartilhado)
+            
+        Returns:
+            Caminho relativo e informações de cada item no novo backup
+        """
+        results = []
+        handles = {}
+        
+        try:
+            for rel_path, info in items:
+                src = self._stored_path(src_dir, rel_path, info)
+                info = dict(info)
+                
+                if "segment" in info:
+                    f_in = self._open_stored(handles, src)
+                    f_in.seek(info["offset"])
+                    data = f_in.read(info["stored_size"])
+                    if len(data) != info["stored_size"]:
+                        raise ValueError(f"Segmento truncado: {src}")
+                    info["segment"], info["offset"] = packer.append(data)
+                else:
+                    dst = backup_dir / rel_path
+                    if dst.parent not in created_dirs:
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        created_dirs.add(dst.parent)
+                    with self.io_scheduler.slot(), \
+                            self.io_scheduler.open(src, "rb") as f_in, \
+                            self.io_scheduler.open(dst, "wb") as f_out:
+                        shutil.copyfileobj(f_in, f_out, self.config.chunk_size)
+                    
+                results.append((rel_path, info))
+        finally:
+            for f in handles.values():
+                f.close()
+                
+        return results
+        
+    def _batches(
+        self,
+        items: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Agrupa itens de um backup em lotes para os workers.
+        
+        Os itens são ordenados por (segmento, offset), então cada lote lê um
+        trecho contíguo do mesmo segmento com um único arquivo aberto.
+        
+        Args:
+            items: Caminhos relativos e informações dos itens
+            
+        Yields:
+            Lotes de até PACK_BATCH_FILES itens ou chunk_size bytes armazenados
+        """
+        batch = []
+        batch_bytes = 0
+        
+        for rel_path, info in sorted(
+            items, key=lambda item: (item[1].get("segment", ""), item[1].get("offset", 0))
+        ):
+            batch.append((rel_path, info))
+            batch_bytes += info.get("stored_size", info["size"])
+            if len(batch) >= PACK_BATCH_FILES or batch_bytes >= self.config.chunk_size:
+                yield batch
+                batch = []
+                batch_bytes = 0
+                
+        if batch:
+            yield batch
+            
+    def _run_batches(self, func: Callable[..., List[Any]], jobs: Iterable[tuple]) -> Iterator[Any]:
+        """
+        Executa func(*job) no pool para cada job.
+        
+        No máximo 2 * max_workers lotes ficam em andamento, então a memória
+        não cresce com o número de arquivos do backup.
+        
+        Args:
+            func: Função que processa um lote e retorna um resultado por item
+            jobs: Argumentos de cada chamada
+            
+        Yields:
+            Resultado de cada item, na ordem de conclusão dos lotes
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.config.max_workers, initializer=self.io_scheduler.init_worker
+        ) as executor:
+            pending = set()
+            
+            for job in jobs:
+                pending.add(executor.submit(func, *job))
+                if len(pending) >= self.config.max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                        
+            for future in pending:
+                yield from future.result()
+                
+    def _stored_path(self, backup_dir: Path, rel_path: str, info: Dict[str, Any]) -> Path:
+        """
+        Localiza o arquivo que guarda um item do backup.
+        
+        Args:
+            backup_dir: Diretório do backup
+            rel_path: Caminho relativo do item
+            info: Informações do item
+            
+        Returns:
+            Segmento (itens empacotados) ou arquivo próprio do item
+        """
+        if "segment" in info:
+            return backup_dir / "segments" / info["segment"]
+        return backup_dir / rel_path
+        
+    def _open_stored(self, handles: Dict[Path, BinaryIO], path: Path) -> BinaryIO:
+        """
+        Abre um arquivo do backup, mantendo aberto só o último usado pelo lote.
+        
+        Args:
+            handles: Arquivos abertos do lote (fechados pelo chamador)
+            path: Arquivo retornado por _stored_path
+            
+        Returns:
+            Arquivo aberto em modo binário
+        """
+        f = handles.get(path)
+        if f is None:
+            for old in handles.values():
+                old.close()
+            handles.clear()
+            f = handles[path] = self.io_scheduler.open(path, "rb")
+        return f
+        
+    def _decode_item(
+        self,
+        f_in: BinaryIO,
+        info: Dict[str, Any],
+        fmt: Optional[str],
+        dst: Optional[BinaryIO] = None
+    ) -> str:
+        """
+        Decodifica um item em fluxo, de arquivo próprio ou de segmento.
+        
+        Args:
+            f_in: Arquivo aberto por _open_stored
+            info: Informações do item
+            fmt: Formato do backup (None para o formato antigo)
+            dst: Destino do conteúdo (apenas calcula o hash se None)
+            
+        Returns:
+            Hash SHA-256 do conteúdo original
+        """
+        if fmt != FORMAT_NAME:
+            return self._decode_legacy(f_in, dst)
+            
+        offset = info.get("offset", 0)
+        length = info["stored_size"] if "segment" in info else None
+        decompressor = self._decompressor(info.get("dictionary"))
+        
+        _, digest = decode_stream(f_in, dst, self.key, offset, length, decompressor)
+        return digest
+        
+    def _decode_legacy(self, f_in: BinaryIO, dst: Optional[BinaryIO] = None) -> str:
+        """
+        Decodifica um arquivo do formato antigo (zstd + Fernet).
+        
+        O token Fernet só pode ser aberto inteiro em memória; a descompressão
+        e o hash seguem em fluxo, sem arquivos temporários.
+        
+        Args:
+            f_in: Arquivo do backup
+            dst: Destino do conteúdo (apenas calcula o hash se None)
+            
+        Returns:
+            Hash SHA-256 do conteúdo original
+        """
+        if self.fernet:
+            f_in = io.BytesIO(self.fernet.decrypt(f_in.read()))
+            
+        hasher = hashlib.sha256()
+        reader = zstd.ZstdDecompressor().stream_reader(f_in)
+        
+        while chunk := reader.read(self.config.chunk_size):
+            hasher.update(chunk)
+            if dst is not None:
+                dst.write(chunk)
+                
+        return hasher.hexdigest()
+        
+    def _restore_batch(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        backup_dir: Path,
+        target_dir: Path,
+        fmt: Optional[str],
+        created_dirs: Set[Path]
+    ) -> List[bool]:
+        """
+        Restaura um lote de arquivos.
+        
+        Args:
+            items: Caminhos relativos e informações dos arquivos
+            backup_dir: Diretório do backup
+            target_dir: Diretório de destino
+            fmt: Formato do backup (None para o formato antigo)
+            created_dirs: Diretórios de destino já criados (compartilhado)
+            
+        Returns:
+            True para cada arquivo restaurado e íntegro
         """
-        dctx = zstd.ZstdDecompressor()
+        results = []
+        handles = {}
         
-        with open(src, "rb") as f_in, open(dst, "wb") as f_out:
-            decompressor = dctx.stream_reader(f_in)
-            while chunk := decompressor.read(self.config.chunk_size):
-                f_out.write(chunk)
+        try:
+            for rel_path, info in items:
+                dst = target_dir / rel_path
+                written = False
                 
+                try:
+                    if dst.parent not in created_dirs:
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        created_dirs.add(dst.parent)
+                        
+                    f_in = self._open_stored(handles, self._stored_path(backup_dir, rel_path, info))
+                    with self.io_scheduler.slot(), self.io_scheduler.open(dst, "wb") as f_out:
+                        written = True
+                        digest = self._decode_item(f_in, info, fmt, f_out)
+                        
+                    if digest != info["hash"]:
+                        raise ValueError("Falha na verificação de integridade")
+                        
+                    # Restaura permissões
+                    os.chmod(dst, info["mode"])
+                    os.utime(dst, (time.time(), info["mtime"]))
+                    results.append(True)
+                    
+                except Exception as e:
+                    logger.error(f"Erro ao restaurar {rel_path}: {e}")
+                    if written and dst.exists():
+                        dst.unlink()
+                    results.append(False)
+        finally:
+            for f in handles.values():
+                f.close()
+                
+        return results
+        
     def _load_backup_metadata(self, timestamp: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Carrega os metadados de um backup.
@@ -585,12 +1586,19 @@ class QuantumBackupManager:
             logger.error(f"Erro ao carregar metadados: {e}")
             return None
             
-    def verify_backup(self, timestamp: Optional[str] = None) -> bool:
+    def verify_backup(self, timestamp: Optional[str] = None, fast: bool = False) -> bool:
         """
         Verifica a integridade de um backup.
         
+        A verificação completa descriptografa e descomprime cada item em
+        fluxo direto para o hash do original. A verificação rápida apenas
+        compara o hash dos bytes armazenados com o stored_hash gravado no
+        backup; itens sem stored_hash (backups antigos) são verificados por
+        completo.
+        
         Args:
             timestamp: Data/hora do backup (último backup se None)
+            fast: Se True, verifica apenas os hashes armazenados
             
         Returns:
             True se o backup está íntegro
@@ -601,106 +1609,127 @@ class QuantumBackupManager:
             if not metadata:
                 raise ValueError("Backup não encontrado")
                 
-            backup_dir = self.config.backup_dir / metadata["type"] / metadata["timestamp"]
-            verified = True
+            backup_dir = self._backup_path(metadata)
             
             # Verifica arquivos em paralelo
-            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-                futures = []
-                
-                for rel_path, info in metadata["files"].items():
-                    path = backup_dir / rel_path
-                    if not path.exists():
-                        logger.error(f"Arquivo não encontrado: {rel_path}")
-                        verified = False
-                        continue
-                        
-                    futures.append(executor.submit(self._verify_file, path, info))
-                    
-                # Aguarda conclusão
-                for future in futures:
-                    try:
-                        if not future.result():
-                            verified = False
-                    except Exception as e:
-                        logger.error(f"Erro ao verificar arquivo: {e}")
-                        verified = False
-                        
-            return verified
+            jobs = (
+                (batch, backup_dir, metadata.get("format"), fast)
+                for batch in self._batches(metadata["files"].items())
+            )
+            return all(list(self._run_batches(self._verify_batch, jobs)))
             
         except Exception as e:
             logger.error(f"Erro ao verificar backup: {e}")
             return False
             
-    def _verify_file(self, path: Path, info: Dict[str, Any]) -> bool:
+    def _verify_batch(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        backup_dir: Path,
+        fmt: Optional[str],
+        fast: bool = False
+    ) -> List[bool]:
         """
-        Verifica a integridade de um arquivo.
+        Verifica um lote de arquivos.
         
         Args:
-            path: Caminho do arquivo
-            info: Informações do arquivo
+            items: Caminhos relativos e informações dos arquivos
+            backup_dir: Diretório do backup
+            fmt: Formato do backup (None para o formato antigo)
+            fast: Se True, compara apenas os hashes armazenados
             
         Returns:
-            True se o arquivo está íntegro
+            True para cada arquivo íntegro
         """
+        results = []
+        handles = {}
+        
         try:
-            # Cria arquivo temporário
-            temp = path.with_suffix(".tmp")
-            
-            # Copia arquivo
-            shutil.copy2(path, temp)
-            
-            # Descriptografa
-            if self.fernet:
-                self._decrypt_file(temp)
-                
-            # Descomprime
-            dst = temp.with_suffix(".dec")
-            self._decompress_file(temp, dst)
-            
-            # Verifica hash
-            if self._hash_file(dst) != info["hash"]:
-                logger.error(f"Hash inválido: {path}")
-                return False
+            for rel_path, info in items:
+                try:
+                    f_in = self._open_stored(handles, self._stored_path(backup_dir, rel_path, info))
+                    
+                    with self.io_scheduler.slot():
+                        if fast and "stored_hash" in info:
+                            length = info["stored_size"] if "segment" in info else None
+                            valid = hash_stored(
+                                f_in, info.get("offset", 0), length, self.config.chunk_size
+                            ) == info["stored_hash"]
+                        else:
+                            valid = self._decode_item(f_in, info, fmt) == info["hash"]
+                        
+                    if not valid:
+                        logger.error(f"Hash inválido: {rel_path}")
+                    results.append(valid)
+                    
+                except FileNotFoundError:
+                    logger.error(f"Arquivo não encontrado: {rel_path}")
+                    results.append(False)
+                except Exception as e:
+                    logger.error(f"Erro ao verificar {rel_path}: {e}")
+                    results.append(False)
+        finally:
+            for f in handles.values():
+                f.close()
                 
-            # Remove arquivos temporários
-            temp.unlink()
-            dst.unlink()
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erro ao verificar {path}: {e}")
-            if temp.exists():
-                temp.unlink()
-            if dst.exists():
-                dst.unlink()
-            return False
-            
-    def list_backups(self) -> List[Dict[str, Any]]:
+        return results
+        
+    def list_backups(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Lista todos os backups disponíveis.
+        Lista os backups disponíveis, do mais recente ao mais antigo.
+        
+        A listagem vem do catálogo; apenas manifestos novos ou alterados
+        desde a última sincronização são abertos.
         
+        Args:
+            limit: Número máximo de backups
+            
         Returns:
-            Lista de metadados dos backups
+            Resumo de cada backup (metadados sem a lista de arquivos)
         """
         try:
-            backups = []
-            metadata_dir = self.config.backup_dir / "metadata"
-            
-            for path in sorted(metadata_dir.glob("*.json"), reverse=True):
-                try:
-                    with open(path, "r") as f:
-                        metadata = json.load(f)
-                        backups.append(metadata)
-                except Exception as e:
-                    logger.error(f"Erro ao carregar {path}: {e}")
-                    
-            return backups
+            self.catalog.sync(self.config.backup_dir / "metadata", self._catalog_entry)
+            return self.catalog.list_backups(limit)
             
         except Exception as e:
             logger.error(f"Erro ao listar backups: {e}")
             return []
+            
+    def find_backups(self, rel_path: str) -> List[Dict[str, Any]]:
+        """
+        Lista os backups que contêm um arquivo.
+        
+        Args:
+            rel_path: Caminho relativo a base_path
+            
+        Returns:
+            Backup, timestamp, tamanho e hash de cada versão guardada
+        """
+        self.catalog.sync(self.config.backup_dir / "metadata", self._catalog_entry)
+        return self.catalog.backups_containing(rel_path)
+        
+    def bytes_by_day(self, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Soma os bytes dos backups por dia.
+        
+        Args:
+            since: Primeiro dia (YYYY-MM-DD)
+            until: Último dia (YYYY-MM-DD)
+            
+        Returns:
+            Dia, número de backups, bytes originais e armazenados
+        """
+        self.catalog.sync(self.config.backup_dir / "metadata", self._catalog_entry)
+        return self.catalog.bytes_by_day(since, until)
+        
+    def rebuild_catalog(self) -> int:
+        """
+        Recria o catálogo a partir dos manifestos JSON.
+        
+        Returns:
+            Número de backups indexados
+        """
+        return self.catalog.rebuild(self.config.backup_dir / "metadata", self._catalog_entry)
 
 def create_backup_config(
     base_path: Union[str, Path],
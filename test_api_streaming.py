@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Streaming da API (SSE)
+===============================
+
+Verifica, com o provedor simulado (sem rede), que as rotas de geração com
+"stream": true enviam eventos "token" seguidos de um evento "usage" final,
+e que a desconexão do cliente encerra o stream do provedor (aclose).
+
+Uso:
+    python test_api_streaming.py
+    python -m pytest test_api_streaming.py
+"""
+
+import sys
+import json
+import asyncio
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from modules.integration.api_adapter import APIAdapter
+from modules.integration.model_manager import ModelConfig, StreamChunk
+from modules.integration.models.fake import FakeModel
+
+logger = logging.getLogger("TEST_API_STREAMING")
+
+REPLY = "Olá da EVA & GUARANI"
+REPEAT = 50000  # resposta longa demais para caber nos buffers da conexão
+
+
+class TrackingFakeModel(FakeModel):
+    """
+    Provedor simulado que registra quantos trechos enviou e se o stream foi fechado.
+
+    Com chunk_delay 0 os trechos saem sem nenhum await no provedor: a
+    desconexão só é percebida no handler, e o stream só é fechado se o
+    handler chamar aclose.
+    """
+
+    def __init__(self, config: ModelConfig):
+        super().__init__(config)
+        self.sent = 0
+        self.closed = asyncio.Event()
+
+    async def generate_stream(self, prompt: str, **kwargs):
+        try:
+            if self.chunk_delay:
+                async for chunk in super().generate_stream(prompt, **kwargs):
+                    self.sent += 1
+                    yield chunk
+            else:
+                for word in self._words():
+                    self.sent += 1
+                    yield StreamChunk(text=word + " ")
+        finally:
+            self.closed.set()
+
+
+def make_adapter(**options) -> APIAdapter:
+    adapter = APIAdapter(warm_up=False)
+    config = ModelConfig(name="fake", provider="fake", options={"reply": REPLY, "chunk_delay": 0.001, **options})
+    adapter.model_manager.models["fake"] = TrackingFakeModel(config)
+    adapter.model_manager.default_model = "fake"
+    return adapter
+
+
+def parse_events(body: str) -> list:
+    """Eventos SSE (nome, dados) na ordem recebida."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def check_events(events: list) -> dict:
+    """Tokens formam a resposta e o último evento é o uso; devolve o evento final."""
+    names = [name for name, _ in events]
+    assert names[-1] == "usage", f"Último evento deveria ser usage: {names}"
+    assert set(names[:-1]) == {"token"}, f"Antes do usage só deveria haver tokens: {names}"
+    assert "".join(data["text"] for _, data in events[:-1]) == REPLY
+    final = events[-1][1]
+    assert final["model"] == "fake"
+    assert final["usage"]["completion_tokens"] == len(REPLY.split(" "))
+    return final
+
+
+async def _generate():
+    adapter = make_adapter()
+    async with TestClient(TestServer(adapter.app)) as client:
+        response = await client.post("/api/generate", json={"prompt": "oi", "stream": True})
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/event-stream")
+        check_events(parse_events(await response.text()))
+
+
+async def _session_message():
+    adapter = make_adapter()
+    async with TestClient(TestServer(adapter.app)) as client:
+        response = await client.post("/api/sessions", json={"model": "fake"})
+        session_id = (await response.json())["session_id"]
+
+        response = await client.post(
+            f"/api/sessions/{session_id}/messages", json={"content": "oi", "stream": True}
+        )
+        assert response.status == 200
+        final = check_events(parse_events(await response.text()))
+        assert final["session_id"] == session_id
+        assert final["response"]["content"] == REPLY
+
+        # A resposta transmitida fica salva na sessão
+        session = await (await client.get(f"/api/sessions/{session_id}")).json()
+        assert [message["role"] for message in session["messages"]] == ["user", "assistant"]
+
+
+async def _client_disconnect():
+    adapter = make_adapter(repeat=REPEAT, chunk_delay=0)
+    model = adapter.model_manager.models["fake"]
+
+    # O stream precisa ser fechado pelo próprio handler (aclose), não pela
+    # coleta de lixo do gerador depois que ele termina
+    closed_by_handler = []
+    stream_generation = adapter._stream_generation
+
+    async def checked_stream_generation(*args, **kwargs):
+        try:
+            return await stream_generation(*args, **kwargs)
+        finally:
+            closed_by_handler.append(model.closed.is_set())
+
+    adapter._stream_generation = checked_stream_generation
+    async with TestClient(TestServer(adapter.app)) as client:
+        response = await client.post("/api/generate", json={"prompt": "oi", "stream": True})
+        tokens = 0
+        async for line in response.content:
+            if line.startswith(b"event: token"):
+                tokens += 1
+                if tokens == 3:
+                    break
+        response.close()
+
+        await asyncio.wait_for(model.closed.wait(), timeout=5)
+        for _ in range(100):
+            if closed_by_handler:
+                break
+            await asyncio.sleep(0.05)
+        assert closed_by_handler == [True], "O handler terminou sem fechar o stream do provedor"
+        total = len(REPLY.split(" ")) * REPEAT
+        assert model.sent < total, f"O provedor enviou todos os {total} trechos após a desconexão"
+
+
+def test_generate_stream_emits_tokens_then_usage():
+    """POST /api/generate com stream: tokens e, por último, o uso."""
+    asyncio.run(_generate())
+
+
+def test_session_message_stream_emits_tokens_then_usage():
+    """POST /api/sessions/{id}/messages com stream: tokens, uso e resposta salva."""
+    asyncio.run(_session_message())
+
+
+def test_client_disconnect_closes_provider_stream():
+    """A desconexão do cliente fecha o stream do provedor antes do fim."""
+    asyncio.run(_client_disconnect())
+
+
+def main():
+    """Executa os testes."""
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s][%(name)s][%(levelname)s] %(message)s')
+    tests = [
+        test_generate_stream_emits_tokens_then_usage,
+        test_session_message_stream_emits_tokens_then_usage,
+        test_client_disconnect_closes_provider_stream,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            logger.info(f"OK: {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            logger.error(f"FALHA: {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
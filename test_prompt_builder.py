@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Construtor de Prompts das Sessões
+==========================================
+
+Verifica que o PromptBuilder processa só as mensagens novas a cada turno
+(trabalho por turno constante, sem reconstruir o histórico) e que o
+prompt respeita o orçamento de tokens, em uma sessão longa.
+
+Uso:
+    python test_prompt_builder.py
+    python -m pytest test_prompt_builder.py
+"""
+
+import sys
+import uuid
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from modules.integration.prompt_builder import PromptBuilder, TokenCounter, render_message
+
+logger = logging.getLogger("TEST_PROMPT_BUILDER")
+
+TURNS = 3000
+BUDGET = 2000
+
+
+class CountingCounter(TokenCounter):
+    """Contador que registra quantos caracteres foram contados."""
+
+    def __init__(self):
+        super().__init__()
+        self.chars = 0
+
+    def count(self, text: str) -> int:
+        self.chars += len(text)
+        return super().count(text)
+
+
+def message(role: str, turn: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "role": role,
+        "content": f"Mensagem {turn} da conversa quântica sobre consciência e ética. " * 3,
+    }
+
+
+def run_session(turns: int = TURNS, budget: int = BUDGET):
+    """Sessão longa; devolve o construtor, o histórico e os caracteres contados por turno."""
+    counter = CountingCounter()
+    builder = PromptBuilder(budget, counter)
+    messages = [{"id": "system", "role": "system", "content": "Você é EVA & GUARANI."}]
+    per_turn = []
+
+    for turn in range(1, turns + 1):
+        messages.append(message("user" if turn % 2 else "assistant", turn))
+        before = counter.chars
+        prompt = builder.sync(messages)
+        per_turn.append(counter.chars - before)
+
+        assert builder.tokens <= budget, f"Turno {turn}: {builder.tokens} tokens > orçamento {budget}"
+        assert prompt.endswith(render_message(messages[-1]) + "[Assistente]: ")
+        assert prompt.startswith(render_message(messages[0]))
+
+    return builder, messages, per_turn
+
+
+def test_per_turn_work_is_flat():
+    """Cada turno conta só a mensagem nova (e a nota de omissão), nunca o histórico."""
+    _, messages, per_turn = run_session()
+    largest_message = max(len(render_message(m)) for m in messages)
+    note = len("[Sistema]: 99999 mensagens anteriores foram omitidas.\n\n")
+
+    # A nota é recontada a cada mensagem retirada da janela (poucas por turno)
+    limit = largest_message + 3 * note
+    worst = max(per_turn)
+    assert worst <= limit, (
+        f"Um turno contou {worst} caracteres; o limite é uma mensagem mais as notas ({limit})"
+    )
+
+    # O custo do fim da sessão é o mesmo do início (depois de atingir o orçamento)
+    early = sum(per_turn[100:600]) / 500
+    late = sum(per_turn[-500:]) / 500
+    assert late <= early * 1.1, f"Custo por turno cresceu: {early:.0f} -> {late:.0f} caracteres"
+    logger.info(f"Caracteres contados por turno: início {early:.0f}, fim {late:.0f}, máximo {worst}")
+
+
+def test_budget_and_rebuild_agree():
+    """O prompt incremental é o mesmo de uma reconstrução a partir do histórico."""
+    builder, messages, _ = run_session(turns=800)
+    assert builder.omitted > 0, "A sessão deveria ter excedido o orçamento"
+
+    fresh = PromptBuilder(BUDGET, TokenCounter())
+    assert fresh.sync(messages) == builder.prompt()
+    assert fresh.tokens == builder.tokens <= BUDGET
+    assert f"{builder.omitted} mensagens anteriores foram omitidas" in builder.prompt()
+
+
+def main():
+    """Executa os testes."""
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s][%(name)s][%(levelname)s] %(message)s')
+    tests = [test_per_turn_work_is_flat, test_budget_and_rebuild_agree]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            logger.info(f"OK: {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            logger.error(f"FALHA: {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())